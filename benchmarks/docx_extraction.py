@@ -0,0 +1,158 @@
+"""
+DOCX extraction throughput / memory: python-docx's object model reading
+`doc.paragraphs` (the old extract_text_from_docx) vs the streaming iterparse
+extractor in services/docx_text.py, with and without a character budget.
+
+The input is a generated CV built like the common templates: contact
+details in the page header, a two-column layout table (education | experience)
+and a skills table, repeated --repeat times to make it long. Each mode runs
+in a fresh subprocess; the RSS column is how far the peak resident size rose
+above what the process used after imports and reading the file (Linux only).
+"table cells" counts the skill-level cells that made it into the text,
+which is where the old extractor lost content.
+
+    python -m benchmarks.docx_extraction
+    python -m benchmarks.docx_extraction --repeat 2000 --runs 5
+    python -m benchmarks.docx_extraction --docx some_cv.docx
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# employee-parser's MAX_RESUME_CHARS, the larger of the two endpoint budgets
+BUDGET_CHARS = 24000
+SKILL_LEVELS = ("Python", "Expert"), ("FastAPI", "Advanced"), ("Docker", "Advanced"), ("AWS", "Intermediate")
+MODES = ("python-docx", "streaming", "streaming+budget")
+
+
+def make_table_cv(repeat: int) -> bytes:
+    from docx import Document
+    from benchmarks.fakes import RESUME_LINES
+
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Roe | jane.roe@example.com | +92 300 0000000"
+    for _ in range(repeat):
+        for line in RESUME_LINES[:4]:
+            doc.add_paragraph(line)
+        layout = doc.add_table(rows=1, cols=2)
+        layout.cell(0, 0).text = "EDUCATION"
+        layout.cell(0, 0).add_paragraph("BSc Computer Science, State University, 2017")
+        layout.cell(0, 1).text = "EXPERIENCE"
+        for line in RESUME_LINES[4:8]:
+            layout.cell(0, 1).add_paragraph(line)
+        skills = doc.add_table(rows=len(SKILL_LEVELS), cols=2)
+        for row, (skill, level) in enumerate(SKILL_LEVELS):
+            skills.cell(row, 0).text = skill
+            skills.cell(row, 1).text = level
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def run_legacy(data: bytes) -> str:
+    from docx import Document
+
+    doc = Document(io.BytesIO(data))
+    return "\n".join([para.text for para in doc.paragraphs])
+
+
+def run_streaming(data: bytes, max_chars: int = None) -> str:
+    from services.docx_text import extract_docx_text
+
+    return extract_docx_text(io.BytesIO(data), max_chars)
+
+
+def _status_kib(field: str) -> int:
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+
+def reset_peak_rss() -> int:
+    """Restarts the peak RSS count from the current size (Linux); returns that size in KiB."""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    return _status_kib("VmRSS")
+
+
+def measure(mode: str, path: str, runs: int) -> dict:
+    """Runs one mode in this process and returns its stats."""
+    import docx  # noqa: F401  (import cost is not part of the comparison)
+    import services.docx_text  # noqa: F401
+
+    with open(path, "rb") as f:
+        data = f.read()
+    baseline_kib = reset_peak_rss()
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        if mode == "python-docx":
+            text = run_legacy(data)
+        else:
+            text = run_streaming(data, BUDGET_CHARS if mode == "streaming+budget" else None)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    return {
+        "mode": mode,
+        "input_kib": round(len(data) / 1024, 1),
+        "seconds": round(best, 4),
+        "mb_per_sec": round(len(data) / 1e6 / best, 2) if best else None,
+        "peak_rss_growth_mb": round((_status_kib("VmHWM") - baseline_kib) / 1024, 1),
+        "chars": len(text),
+        "table_cells": sum(text.count(level) for _, level in SKILL_LEVELS),
+    }
+
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--docx", help="benchmark this file instead of the generated CV")
+    cli.add_argument("--repeat", type=int, default=500, help="copies of the CV body in the generated file")
+    cli.add_argument("--runs", type=int, default=3, help="best of N per mode")
+    cli.add_argument("--output", help="write results as JSON to this file")
+    cli.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    cli.add_argument("--path", help=argparse.SUPPRESS)
+    args = cli.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.path, args.runs)))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = args.docx
+        if not path:
+            path = os.path.join(folder, "cv.docx")
+            with open(path, "wb") as f:
+                f.write(make_table_cv(args.repeat))
+
+        results = []
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.docx_extraction", "--mode", mode, "--path", path, "--runs", str(args.runs)],
+                cwd=ROOT, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"input: {results[0]['input_kib']} KiB DOCX, best of {args.runs}\n")
+    print(f"{'mode':<17} {'sec':>8} {'MB/s':>7} {'RSS growth MB':>14} {'chars':>9} {'table cells':>12}")
+    for r in results:
+        print(
+            f"{r['mode']:<17} {r['seconds']:>8} {r['mb_per_sec']:>7} {r['peak_rss_growth_mb']:>14} "
+            f"{r['chars']:>9} {r['table_cells']:>12}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Prompt tokens and latency per /enrich call: the old single prompt (the CV as
+indented JSON, role rules repeated in every call) vs the split prompt
+(routers/enrich.py): per-context guidance cached by selected_fields, plus a
+per-CV prompt with the compact, pruned CV.
+
+--requests enrichments are spread over --contexts distinct role / industry /
+level / tone combinations. The fake LLM's latency grows with the prompt and
+the answer (--overhead-ms + --prefill-ms per prompt token + --decode-ms per
+answer token), so shorter prompts and answers show up as time saved. Token
+counts include the guidance calls, amortized over the requests.
+
+A second table compares one CV against --compare contexts as separate
+/enrich calls (concurrent) and as one /enrich/batch request, with the
+guidance already cached.
+
+    python -m benchmarks.enrich
+    python -m benchmarks.enrich --requests 500 --contexts 20 --prefill-ms 1
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+# The fake LLM has no rate limits; don't let the gateway's Groq defaults throttle it
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
+
+from benchmarks.fakes import make_fake_llm, fake_response_for, PARSER_RESPONSE, EMPLOYEE_RESPONSE  # noqa: E402
+
+ROLES = ["backend-developer", "frontend-developer", "data-scientist", "devops-engineer", "professor"]
+INDUSTRIES = ["technology", "healthcare", "finance", "education"]
+LEVELS = ["entry-level", "mid-level", "senior-level"]
+TONES = ["formal", "technical"]
+
+# The prompt /enrich used before the split, for comparison
+LEGACY_TEMPLATE = """
+You are a **professional resume analyst and recruiter assistant**.
+Your job is to carefully study the parsed resume (in JSON format) and the user's selected context — including *role, industry, experience level,* and *tone*.
+
+⚙️ Your responsibilities:
+- Identify **what's missing** from the resume for the given context.
+- Suggest **only relevant additions** (no unrelated domains).
+- Do **not** suggest generic "learn X" advice. Only content that can appear **in the resume**.
+- Be **role-specific**. Example:
+  - If the role = "Frontend Developer", do NOT suggest backend tools.
+  - If the role = "Backend Developer", focus on APIs, databases, scalability, etc.
+  - If the industry = "Healthcare", mention compliance, patient data handling, etc.
+  - If experience = "Entry Level", suggest academic/research projects, not management skills.
+  - If experience = "Senior Level", emphasize leadership and achievements.
+
+Return a **strict JSON object only** with:
+{{
+  "summary_improvement": "An improved or missing summary section (if applicable)",
+  "missing_sections": ["Projects", "Certifications", ...],
+  "missing_details": ["Add quantifiable achievements in your experience section", ...],
+  "suggested_additions": ["Add project on building dashboard using React + REST APIs", ...],
+  "tone_recommendation": "Formal/Technical/etc — how the tone should appear for this role"
+}}
+
+Parsed CV (JSON):
+{parsed_data}
+
+User Context:
+{selected_fields}
+"""
+
+
+# ----------------------------
+# WORKLOAD
+# ----------------------------
+def make_cvs() -> list:
+    """Parser outputs as /enrich receives them: with contacts, empty fields and bookkeeping keys."""
+    resume = {
+        **PARSER_RESPONSE,
+        "publications": [],
+        "awards": [],
+        "contact_confidence": {"email": 1.0, "phone": 0.9, "github": 1.0, "linkedin": 1.0},
+        "incomplete_sections": [],
+    }
+    employee = {
+        **EMPLOYEE_RESPONSE,
+        "patents": [],
+        "contact_confidence": {"email": 1.0, "phone": 0.8, "scholar": 1.0},
+    }
+    return [resume, employee]
+
+
+def make_contexts(count: int, rng: random.Random) -> list:
+    combos = [
+        {"role": role, "industry": industry, "experience_level": level, "tone": tone}
+        for role in ROLES for industry in INDUSTRIES for level in LEVELS for tone in TONES
+    ]
+    return rng.sample(combos, min(count, len(combos)))
+
+
+class CountingAnswers:
+    """`respond` for make_fake_llm: the canned answers; counts calls and tokens."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.answer_tokens = 0
+
+    def __call__(self, prompt_text: str) -> str:
+        from services.llm import estimate_tokens
+
+        answer = fake_response_for(prompt_text)
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt_text)
+        self.answer_tokens += estimate_tokens(answer)
+        return answer
+
+
+def make_latency(args):
+    from services.llm import estimate_tokens
+
+    def latency(prompt_text, answer):
+        return (
+            args.overhead_ms
+            + args.prefill_ms * estimate_tokens(prompt_text)
+            + args.decode_ms * estimate_tokens(answer)
+        ) / 1000
+
+    return latency
+
+
+# ----------------------------
+# RUNS
+# ----------------------------
+async def enrich_legacy(llm, request) -> dict:
+    from langchain_core.prompts import PromptTemplate
+    from services.llm import invoke_llm
+    from services.json_repair import parse_llm_json
+
+    template = PromptTemplate(input_variables=["parsed_data", "selected_fields"], template=LEGACY_TEMPLATE)
+    response = await invoke_llm(template | llm, {
+        "parsed_data": json.dumps(request.parsed_data, indent=2),
+        "selected_fields": json.dumps(request.selected_fields, indent=2),
+    })
+    suggestions, _ = parse_llm_json(response.content)
+    return suggestions
+
+
+async def enrich_split(request) -> dict:
+    from routers import enrich
+
+    response = await enrich.enrich_cv(request)
+    return json.loads(response.body)["suggestions"]
+
+
+async def run(mode: str, args) -> dict:
+    from routers import enrich
+    from services.cache import TTLCache
+
+    rng = random.Random(args.seed)
+    cvs = make_cvs()
+    contexts = make_contexts(args.contexts, rng)
+    answers = CountingAnswers()
+    enrich.llm = make_fake_llm(make_latency(args), respond=answers)
+    enrich.context_cache = TTLCache(enrich.ENRICH_CONTEXT_ITEMS, enrich.ENRICH_CONTEXT_TTL)
+
+    latencies = []
+    for _ in range(args.requests):
+        request = enrich.EnrichRequest(parsed_data=rng.choice(cvs), selected_fields=rng.choice(contexts))
+        started = time.perf_counter()
+        if mode == "single":
+            suggestions = await enrich_legacy(enrich.llm, request)
+        else:
+            suggestions = await enrich_split(request)
+        latencies.append(time.perf_counter() - started)
+        assert set(suggestions) == set(enrich.SCHEMA), suggestions
+    return {"answers": answers, "latencies": latencies}
+
+
+async def run_compare(mode: str, args) -> dict:
+    from routers import enrich
+
+    rng = random.Random(args.seed)
+    cv = make_cvs()[0]
+    contexts = make_contexts(args.compare, rng)
+    for selected_fields in contexts:
+        await enrich.get_guidance(selected_fields)
+    answers = CountingAnswers()
+    enrich.llm = make_fake_llm(make_latency(args), respond=answers)
+
+    started = time.perf_counter()
+    if mode == "separate":
+        await asyncio.gather(*(
+            enrich_split(enrich.EnrichRequest(parsed_data=cv, selected_fields=fields)) for fields in contexts
+        ))
+    else:
+        response = await enrich.enrich_cv_batch(enrich.EnrichBatchRequest(parsed_data=cv, selected_fields=contexts))
+        results = json.loads(response.body)["results"]
+        assert all(set(result["suggestions"]) == set(enrich.SCHEMA) for result in results), results
+    return {"answers": answers, "seconds": time.perf_counter() - started}
+
+
+async def main(args):
+    print(
+        f"{args.requests} enrichments over {args.contexts} contexts; fake LLM: {args.overhead_ms:g}ms "
+        f"+ {args.prefill_ms:g}ms/prompt token + {args.decode_ms:g}ms/answer token\n"
+    )
+    print(f"{'prompt':8s} {'calls':>6s} {'prompt tok':>11s} {'answer tok':>11s} {'mean ms':>8s} {'p50 ms':>7s} {'p95 ms':>7s}")
+    for mode in ("single", "split"):
+        stats = await run(mode, args)
+        answers, latencies = stats["answers"], sorted(stats["latencies"])
+        print(
+            f"{mode:8s} {answers.calls:6d} {answers.prompt_tokens / args.requests:11.0f} "
+            f"{answers.answer_tokens / args.requests:11.0f} {statistics.mean(latencies) * 1000:8.0f} "
+            f"{latencies[len(latencies) // 2] * 1000:7.0f} {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.0f}"
+        )
+    print("\nprompt / answer tok: per enrichment, guidance calls included")
+
+    print(f"\none CV against {args.compare} contexts (guidance cached)\n")
+    print(f"{'mode':8s} {'calls':>6s} {'prompt tok':>11s} {'answer tok':>11s} {'wall ms':>8s}")
+    for mode in ("separate", "batch"):
+        stats = await run_compare(mode, args)
+        answers = stats["answers"]
+        print(
+            f"{mode:8s} {answers.calls:6d} {answers.prompt_tokens:11d} "
+            f"{answers.answer_tokens:11d} {stats['seconds'] * 1000:8.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--requests", type=int, default=100)
+    cli.add_argument("--contexts", type=int, default=10, help="distinct selected_fields combinations")
+    cli.add_argument("--compare", type=int, default=6, help="contexts for the separate vs batch comparison")
+    cli.add_argument("--overhead-ms", type=float, default=60, help="fixed cost per LLM call")
+    cli.add_argument("--prefill-ms", type=float, default=0.2, help="per prompt token")
+    cli.add_argument("--decode-ms", type=float, default=2, help="per answer token")
+    cli.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(cli.parse_args())))
@@ -0,0 +1,207 @@
+"""
+Deterministic stand-ins for benchmarks: a fake chat model with configurable
+latency, and generated DOCX / PDF resume fixtures.
+"""
+import io
+import re
+import time
+import json
+import asyncio
+
+# ----------------------------
+# FAKE LLM
+# ----------------------------
+PARSER_RESPONSE = {
+    "name": "Jane Roe",
+    "email": "jane.roe@example.com",
+    "phone": "+1 555 0100",
+    "skills": ["Python", "FastAPI", "PostgreSQL", "Docker"],
+    "summary": "Backend engineer with 6 years of experience.",
+    "education": [{"degree": "BSc Computer Science", "institution": "State University", "year": "2017"}],
+    "experience": [
+        {"role": "Senior Backend Engineer", "company": "Acme Corp", "years": "2021-2024"},
+        {"role": "Backend Engineer", "company": "Globex", "years": "2017-2021"},
+    ],
+    "projects": [{"name": "Resume Parser", "domain": "HR Tech", "description": "LLM-based CV parsing", "link": ""}],
+    "certifications": ["AWS Certified Developer"],
+    "location": "Lahore, Pakistan",
+    "github": "github.com/janeroe",
+    "linkedin": "linkedin.com/in/janeroe",
+    "title": "Senior Backend Engineer",
+}
+
+EMPLOYEE_RESPONSE = {
+    "name": "Dr. Jane Roe",
+    "email": "jane.roe@university.edu",
+    "phone": "+92 300 0000000",
+    "citations": "1200",
+    "impactFactor": "85.4",
+    "scholar": "scholar.google.com/citations?user=janeroe",
+    "education": [{"degree": "PhD Computer Science", "institution": "State University", "year": "2012"}],
+    "experience": [{"role": "Professor", "company": "State University", "years": "2012-present"}],
+    "achievements": ["Best Paper Award 2019"],
+    "bookAuthorship": [{"title": "Applied Machine Learning", "publisher": "Springer"}],
+    "journalGuestEditor": [{"title": "Special Issue on NLP", "publisher": "IEEE", "section": "Access"}],
+    "researchPublications": [{"title": "Parsing CVs with LLMs", "journal": "IEEE Access", "year": "2023"}],
+    "mssupervised": [{"studentName": "Ali Khan", "thesisTitle": "Resume Ranking", "year": "2022"}],
+    "phdstudentsupervised": [{"studentName": "Sara Ahmed", "thesisTitle": "Document AI", "year": "2023"}],
+    "researchProjects": [{"title": "HEC NRPU", "description": "Document understanding"}],
+    "professionalActivities": [{"heading": "Reviewer", "desc": "IEEE TPAMI", "year": "2021"}],
+    "professionalTraining": [{"title": "Deep Learning", "description": "Summer school", "year": "2018"}],
+    "technicalSkills": [{"category": "Languages", "details": "Python, C++"}],
+    "membershipsAndOtherAssociations": [{"heading": "IEEE", "desc": "Senior Member", "year": "2020"}],
+    "reference": [{"prof": "Prof. John Doe", "designation": "Dean", "mail": "john@university.edu", "phone": ""}],
+}
+
+ENRICH_RESPONSE = {
+    "summary_improvement": "Backend engineer focused on scalable APIs.",
+    "missing_sections": ["Certifications"],
+    "missing_details": ["Add quantifiable achievements in your experience section"],
+    "suggested_additions": ["Add a project on building a rate-limited API gateway"],
+    "tone_recommendation": "Formal",
+}
+
+ENRICH_CONTEXT_RESPONSE = {
+    "expected_sections": ["Summary", "Experience", "Projects", "Skills", "Certifications"],
+    "key_skills": ["Python", "REST APIs", "PostgreSQL", "Docker", "Cloud deployment"],
+    "emphasis": ["Scalability and reliability results", "Ownership of production services"],
+    "avoid": ["Frontend frameworks", "Unrelated coursework"],
+    "tone_recommendation": "Formal",
+}
+
+
+def _prompt_to_text(prompt) -> str:
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    return str(prompt)
+
+
+def fake_response_for(prompt_text: str) -> str:
+    """Picks the canned answer matching the prompt template that was used."""
+    if prompt_text.lstrip().startswith("Your previous answer"):
+        # Re-ask prompts (services/validation.py) list the fields they want as "- field: reason"
+        answers = {**ENRICH_CONTEXT_RESPONSE, **ENRICH_RESPONSE, **EMPLOYEE_RESPONSE, **PARSER_RESPONSE}
+        wanted = re.findall(r"^- (\w+): ", prompt_text, re.MULTILINE)
+        payload = {key: answers[key] for key in wanted if key in answers}
+    elif "one entry per context ID" in prompt_text:
+        # /enrich/batch: one suggestions object per "C<n>: ..." context line
+        suggestions = {key: value for key, value in ENRICH_RESPONSE.items() if f'"{key}":' in prompt_text}
+        payload = {context_id: suggestions for context_id in re.findall(r"^(C\d+): ", prompt_text, re.MULTILINE)}
+    elif "summary_improvement" in prompt_text:
+        # Only the fields the prompt's structure lists (the tone may come from the guidance)
+        payload = {key: value for key, value in ENRICH_RESPONSE.items() if f'"{key}":' in prompt_text}
+    elif '"key_skills":' in prompt_text:
+        payload = ENRICH_CONTEXT_RESPONSE
+    elif any(f'"{key}":' in prompt_text for key in EMPLOYEE_RESPONSE):
+        # Employee prompts (whole or per chunk) list the JSON keys they want
+        payload = {key: value for key, value in EMPLOYEE_RESPONSE.items() if f'"{key}":' in prompt_text}
+    else:
+        payload = PARSER_RESPONSE
+    return "```json\n" + json.dumps(payload, indent=2) + "\n```"
+
+
+def make_fake_llm(latency: float = 0.2, chunk_chars: int = 16, respond=fake_response_for):
+    """
+    A Runnable that can replace ChatGroq in `template | llm` chains. It
+    returns a fixed JSON answer for the prompt's template, streamed in
+    `chunk_chars` pieces spread evenly over `latency` seconds (asyncio.sleep
+    on the async path), so invoke takes `latency` and streams can be timed.
+    `respond(prompt_text) -> answer` replaces the canned answers (it may
+    raise, to fake an API error); `latency` may be a function of the prompt
+    text and the answer returning the seconds for each call.
+    """
+    from langchain_core.messages import AIMessageChunk
+    from langchain_core.runnables import RunnableGenerator
+
+    def _pieces(prompt):
+        prompt_text = _prompt_to_text(prompt)
+        text = respond(prompt_text)
+        pieces = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        seconds = latency(prompt_text, text) if callable(latency) else latency
+        return pieces, seconds / len(pieces)
+
+    def _sync(inputs):
+        for prompt in inputs:
+            pieces, delay = _pieces(prompt)
+            for piece in pieces:
+                time.sleep(delay)
+                yield AIMessageChunk(content=piece)
+
+    async def _async(inputs):
+        async for prompt in inputs:
+            pieces, delay = _pieces(prompt)
+            for piece in pieces:
+                await asyncio.sleep(delay)
+                yield AIMessageChunk(content=piece)
+
+    return RunnableGenerator(_sync, _async)
+
+
+# ----------------------------
+# GENERATED FIXTURES
+# ----------------------------
+RESUME_LINES = [
+    "Jane Roe",
+    "Senior Backend Engineer | Lahore, Pakistan",
+    "jane.roe@example.com | +1 555 0100 | github.com/janeroe | linkedin.com/in/janeroe",
+    "SUMMARY",
+    "Backend engineer with 6 years of experience building Python APIs.",
+    "EXPERIENCE",
+    "Senior Backend Engineer, Acme Corp, 2021-2024",
+    "Designed a rate-limited LLM gateway serving 2M requests per day.",
+    "Backend Engineer, Globex, 2017-2021",
+    "Built PostgreSQL-backed microservices with FastAPI and Docker.",
+    "EDUCATION",
+    "BSc Computer Science, State University, 2017",
+    "SKILLS",
+    "Python, FastAPI, PostgreSQL, Docker, Redis, AWS",
+    "PROJECTS",
+    "Resume Parser - HR Tech - LLM-based CV parsing",
+    "CERTIFICATIONS",
+    "AWS Certified Developer",
+]
+
+
+def make_docx_bytes(repeat: int = 1) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for _ in range(repeat):
+        for line in RESUME_LINES:
+            doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf_bytes(pages: int = 1) -> bytes:
+    """Builds a minimal text-layer PDF (Helvetica, one resume per page) without extra dependencies."""
+    def escape(text):
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = []
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i in range(pages):
+        lines = "\n".join(f"({escape(line)}) Tj T*" for line in RESUME_LINES)
+        stream = f"BT /F1 11 Tf 14 TL 50 780 Td\n{lines}\nET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,126 @@
+"""
+Image-upload OCR benchmark: a phone photo of a CV straight into Tesseract vs
+the NumPy clean-up in services/imaging.py (grayscale, downscale to
+OCR_IMAGE_DPI, adaptive threshold, deskew) followed by Tesseract.
+
+The photo is the JPEG embedded in the bundled WhatsApp sample PDF. --scale
+enlarges it to what a phone camera actually delivers (3x is ~12 MP) and
+--rotate tilts it the way a hand-held shot usually is; both are saved as a
+JPEG first, so decoding is part of the timing just like for a real upload.
+
+    python -m benchmarks.image_ocr
+    python -m benchmarks.image_ocr --scale 3 --rotate 2.5 --runs 5
+    python -m benchmarks.image_ocr --image photo.jpg
+
+Needs tesseract on PATH for the OCR columns; without it only the
+preprocessing is timed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_PDF = os.path.join(ROOT, "temp_WhatsApp Image 2025-10-02 at 11.22.22_861968bb.pdf")
+
+
+def sample_photo(scale: float, rotate: float) -> bytes:
+    """The sample's embedded JPEG, enlarged by `scale` and tilted by `rotate` degrees."""
+    from PyPDF2 import PdfReader
+    from PIL import Image
+
+    page = PdfReader(SAMPLE_PDF).pages[0]
+    xobjects = page["/Resources"]["/XObject"].get_object()
+    image = Image.open(io.BytesIO(xobjects["/X0"].get_object().get_data())).convert("RGB")
+    if scale != 1:
+        image = image.resize((round(image.width * scale), round(image.height * scale)), Image.Resampling.BICUBIC)
+    if rotate:
+        image = image.rotate(rotate, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=(255, 255, 255))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def run_raw(photo: bytes, ocr: bool) -> dict:
+    """What the API would do without preprocessing: decode in full color, OCR as is."""
+    from PIL import Image, ImageOps
+
+    started = time.perf_counter()
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(photo))).convert("RGB")
+    prepared = time.perf_counter()
+    text = _ocr(image) if ocr else None
+    return _stats("raw", image, started, prepared, text)
+
+
+def run_preprocessed(photo: bytes, ocr: bool) -> dict:
+    from services.imaging import open_image, preprocess_for_ocr
+
+    started = time.perf_counter()
+    image = preprocess_for_ocr(open_image(photo))
+    prepared = time.perf_counter()
+    text = _ocr(image, image.info["dpi"][0]) if ocr else None
+    return _stats("preprocessed", image, started, prepared, text)
+
+
+def _ocr(image, dpi: int = None) -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(image, config=f"--dpi {dpi}" if dpi else "")
+
+
+def _stats(mode: str, image, started: float, prepared: float, text) -> dict:
+    finished = time.perf_counter()
+    return {
+        "mode": mode,
+        "pixels": image.width * image.height,
+        "prepare_ms": round((prepared - started) * 1000, 1),
+        "ocr_ms": round((finished - prepared) * 1000, 1) if text is not None else None,
+        "chars": len(text.strip()) if text is not None else None,
+    }
+
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--image", help="benchmark this photo instead of the bundled sample")
+    cli.add_argument("--scale", type=float, default=3.0, help="enlarge the sample (3 = ~12 MP phone photo)")
+    cli.add_argument("--rotate", type=float, default=0.0, help="tilt the sample by this many degrees")
+    cli.add_argument("--runs", type=int, default=3, help="best of N per mode")
+    cli.add_argument("--output", help="write results as JSON to this file")
+    args = cli.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            photo = f.read()
+    else:
+        photo = sample_photo(args.scale, args.rotate)
+
+    ocr = shutil.which("tesseract") is not None
+    if not ocr:
+        print("⚠️ tesseract not on PATH: timing preprocessing only\n")
+
+    results = []
+    for run in (run_raw, run_preprocessed):
+        runs = [run(photo, ocr) for _ in range(args.runs)]
+        results.append(min(runs, key=lambda r: r["prepare_ms"] + (r["ocr_ms"] or 0)))
+
+    print(f"photo: {len(photo) / 1024:.0f} KiB JPEG, best of {args.runs}\n")
+    print(f"{'mode':<13} {'pixels':>10} {'prepare ms':>11} {'OCR ms':>9} {'total ms':>9} {'chars':>7}")
+    for r in results:
+        total = r["prepare_ms"] + (r["ocr_ms"] or 0)
+        print(
+            f"{r['mode']:<13} {r['pixels']:>10} {r['prepare_ms']:>11} {r['ocr_ms'] if ocr else '-':>9} "
+            f"{round(total, 1):>9} {r['chars'] if ocr else '-':>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
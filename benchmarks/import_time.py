@@ -0,0 +1,156 @@
+"""
+Startup cost of the API: `python -X importtime -c "import main"` in a fresh
+interpreter, plus the time until /healthz and /readyz first answer.
+
+Each run starts a new process (no warm imports), and the fastest of --runs
+is kept. The report lists the total import time of `main`, the packages
+that cost the most (self time summed per top-level package) and any module from
+LAZY_MODULES that got imported at startup anyway; those are meant to load
+on first use or in the background warm-up (services/warmup.py).
+
+The cold start is measured in-process through FastAPI's TestClient (startup
+events included), from launching the interpreter to the first 200 from
+/healthz (liveness) and from /readyz (warm-up done).
+
+Results are saved as JSON; benchmarks/import_time.json is the baseline kept
+with the repo. Pass it (or any earlier run) with --compare to see the
+change, and --max-seconds to fail when `import main` gets slower than that.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --compare benchmarks/import_time.json
+    python -m benchmarks.import_time --output benchmarks/import_time.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy SDKs that must not be imported by `import main`
+LAZY_MODULES = ("PyPDF2", "pdf2image", "docx", "pytesseract", "langchain_groq", "groq", "langchain_ollama", "ollama")
+
+CHILD_ENV = {
+    "GROQ_API_KEY": "benchmark-key",
+    "RESULT_CACHE_ENABLED": "0",
+}
+
+# Runs in the child: serve through TestClient and report when probes first pass
+COLD_START = """
+import json, time
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    marks = {}
+    while "readyz" not in marks:
+        # 404: an older tree without the probes, where serving at all counts
+        if "healthz" not in marks and client.get("/healthz").status_code in (200, 404):
+            marks["healthz"] = time.time()
+        if client.get("/readyz").status_code in (200, 404):
+            marks["readyz"] = time.time()
+        else:
+            time.sleep(0.01)
+print(json.dumps(marks))
+"""
+
+
+def _env() -> dict:
+    return {**os.environ, **CHILD_ENV}
+
+
+# ----------------------------
+# IMPORT TIME
+# ----------------------------
+def parse_importtime(stderr: str) -> list:
+    """(module, self_us, cumulative_us) for each `-X importtime` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_imports() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    packages = {}
+    for name, self_us, _ in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    main_us = next(cumulative for name, _, cumulative in rows if name == "main")
+    imported = {name.split(".")[0] for name, _, _ in rows}
+    return {
+        "import_main_seconds": main_us / 1e6,
+        "modules": len(rows),
+        # The 25 costliest packages are enough to spot a new heavy import
+        "packages": dict(sorted(((package, round(us / 1e6, 4)) for package, us in packages.items()), key=lambda item: -item[1])[:25]),
+        "eager_lazy_modules": sorted(imported.intersection(LAZY_MODULES)),
+    }
+
+
+def measure_cold_start() -> dict:
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START], cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return {f"{probe}_seconds": round(at - started, 4) for probe, at in marks.items()}
+
+
+# ----------------------------
+# REPORT
+# ----------------------------
+def main(args):
+    runs = [measure_imports() for _ in range(args.runs)]
+    best = min(runs, key=lambda run: run["import_main_seconds"])
+    report = {**best, **min((measure_cold_start() for _ in range(args.runs)), key=lambda r: r["readyz_seconds"])}
+
+    print(f"import main: {report['import_main_seconds']:.3f}s ({report['modules']} modules, best of {args.runs})")
+    print(f"first /healthz 200: {report['healthz_seconds']:.3f}s after process start")
+    print(f"first /readyz 200:  {report['readyz_seconds']:.3f}s (warm-up done)\n")
+    print(f"{'package':28s} {'seconds':>8s}")
+    top = sorted(report["packages"].items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for package, seconds in top:
+        print(f"{package:28s} {seconds:8.3f}")
+
+    status = 0
+    if report["eager_lazy_modules"]:
+        print("\n⚠️ Imported at startup, should load lazily:", ", ".join(report["eager_lazy_modules"]))
+        status = 1
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nvs {args.compare}:")
+        for key in ("import_main_seconds", "healthz_seconds", "readyz_seconds"):
+            if key in baseline:
+                delta = report[key] - baseline[key]
+                print(f"  {key:22s} {baseline[key]:7.3f}s -> {report[key]:7.3f}s ({delta:+.3f}s)")
+
+    if args.max_seconds and report["import_main_seconds"] > args.max_seconds:
+        print(f"\n❌ import main took {report['import_main_seconds']:.3f}s, over the {args.max_seconds:g}s budget")
+        status = 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--runs", type=int, default=3)
+    cli.add_argument("--top", type=int, default=12, help="packages to list")
+    cli.add_argument("--output", help="save the report as JSON")
+    cli.add_argument("--compare", help="a previous --output to compare against")
+    cli.add_argument("--max-seconds", type=float, help="fail if `import main` takes longer")
+    sys.exit(main(cli.parse_args()))
@@ -0,0 +1,253 @@
+"""
+Regression corpus, fuzzer and benchmark for services/json_repair.py.
+
+1. Regression corpus: known broken LLM outputs and the value each must parse to.
+2. Fuzz: the fake LLM payloads, serialized at random, then corrupted the
+   ways models do (fences, prose, smart / single quotes, trailing commas,
+   raw newlines, Python literals, truncation). Every variant must parse;
+   variants that lose no content must parse back to the original payload.
+3. Benchmark: the shared parser vs the two clean_json_output functions it
+   replaced ("legacy parser" / "legacy employee"): p50 time and success
+   rate per corruption kind.
+
+Exits non-zero if a corpus case or a fuzz case fails.
+
+    python -m benchmarks.json_repair
+    python -m benchmarks.json_repair --fuzz 2000 --seed 7 --repeat 500
+"""
+import os
+import re
+import ast
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+from benchmarks.fakes import PARSER_RESPONSE, EMPLOYEE_RESPONSE, ENRICH_RESPONSE  # noqa: E402
+from services.json_repair import parse_llm_json  # noqa: E402
+
+
+# ----------------------------
+# LEGACY IMPLEMENTATIONS (before the shared parser)
+# ----------------------------
+def legacy_parser_clean(text: str):
+    text = text.replace("```json", "").replace("```", "").strip()
+    text = re.sub(r'^[^{]*', '', text)
+    text = re.sub(r'[^}]*$', '', text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return {"error": "Invalid JSON output from LLM", "raw_output": text}
+
+
+def legacy_employee_clean(text: str):
+    try:
+        text = text.replace("```json", "").replace("```", "").strip()
+        text = re.sub(r'^[^{]*', '', text)
+        text = re.sub(r'[^}]*$', '', text)
+        text = (
+            text.replace("“", '"')
+                .replace("”", '"')
+                .replace("’", "'")
+                .replace("\n", " ")
+                .replace("\r", " ")
+        )
+        text = re.sub(r",\s*}", "}", text)
+        text = re.sub(r",\s*]", "]", text)
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            return ast.literal_eval(text)
+        except Exception:
+            return {"error": "Invalid JSON output from LLM", "raw_output": text}
+
+
+def shared_parse(text: str):
+    try:
+        return parse_llm_json(text)[0]
+    except ValueError:
+        return {"error": "Invalid JSON output from LLM"}
+
+
+IMPLEMENTATIONS = {"legacy parser": legacy_parser_clean, "legacy employee": legacy_employee_clean, "shared": shared_parse}
+
+
+# ----------------------------
+# REGRESSION CORPUS
+# ----------------------------
+CORPUS = [
+    ("fenced", '```json\n{"name": "Jane", "skills": ["Python"]}\n```', {"name": "Jane", "skills": ["Python"]}),
+    ("prose around", 'Here is the JSON:\n{"a": 1}\nLet me know if you need more.', {"a": 1}),
+    ("trailing commas", '{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+    ("doubled commas", '{"a": [1,, 2], , "b": 3}', {"a": [1, 2], "b": 3}),
+    ("missing commas", '{"a": 1\n"b": [1 2 "x"]\n"c": {"d": true} "e": null}', {"a": 1, "b": [1, 2, "x"], "c": {"d": True}, "e": None}),
+    ("missing colon", '{"a" 1, "b" "x"}', {"a": 1, "b": "x"}),
+    ("smart quotes", '{“name”: “Jane Roe”, “title”: “Engineer”}', {"name": "Jane Roe", "title": "Engineer"}),
+    ("smart quotes inside", '{"q": "He said “hi” twice"}', {"q": "He said “hi” twice"}),
+    ("single quotes", "{'name': 'Jane', 'skills': ['Python', 'SQL']}", {"name": "Jane", "skills": ["Python", "SQL"]}),
+    ("apostrophe", "{'summary': 'Jane's CV', 'x': 'it\\'s'}", {"summary": "Jane's CV", "x": "it's"}),
+    ("python literals", "{'a': True, 'b': False, 'c': None}", {"a": True, "b": False, "c": None}),
+    ("raw newlines", '{"summary": "line one\nline two\ttabbed\r"}', {"summary": "line one\nline two\ttabbed\r"}),
+    ("inner quotes", '{"title": "The "Best" Paper", "year": "2020"}', {"title": 'The "Best" Paper', "year": "2020"}),
+    ("bad escapes", '{"path": "C:\\Users\\Jane", "re": "\\d+"}', {"path": "C:\\Users\\Jane", "re": "\\d+"}),
+    ("unicode escape", '{"name": "Jos\\u00e9"}', {"name": "José"}),
+    ("unquoted keys", '{name: "Jane", years_active: 5}', {"name": "Jane", "years_active": 5}),
+    ("comments", '{"a": 1, // note\n"b": /* inline */ 2}', {"a": 1, "b": 2}),
+    ("bad numbers", '{"years": 2017-2021, "id": 007, "n": -1.5e3}', {"years": "2017-2021", "id": "007", "n": -1500.0}),
+    ("wrong closer", '{"a": [1, 2}, "b": {"c": 1]}', {"a": [1, 2], "b": {"c": 1}}),
+    ("truncated string", '{"a": 1, "summary": "Backend engin', {"a": 1, "summary": "Backend engin"}),
+    ("truncated array", '{"skills": ["Python", "Fast', {"skills": ["Python", "Fast"]}),
+    ("truncated nested", '{"experience": [{"role": "Dev", "company": "Acme"}, {"role": "Lead"', {"experience": [{"role": "Dev", "company": "Acme"}, {"role": "Lead"}]}),
+    ("truncated after key", '{"a": 1, "b"', {"a": 1, "b": None}),
+    ("truncated after colon", '{"a": 1, "b": ', {"a": 1, "b": None}),
+    ("truncated after comma", '{"a": [1, 2, ', {"a": [1, 2]}),
+    ("truncated escape", '{"a": "x\\', {"a": "x\\"}),
+    ("text after object", '{"a": 1} and {"b": 2}', {"a": 1}),
+]
+
+
+def run_corpus() -> int:
+    failures = 0
+    for name, text, expected in CORPUS:
+        got = shared_parse(text)
+        if got != expected:
+            failures += 1
+            print(f"  ❌ {name}: {text!r}\n     expected {expected!r}\n     got      {got!r}")
+    print(f"corpus: {len(CORPUS) - failures}/{len(CORPUS)} cases pass")
+    return failures
+
+
+# ----------------------------
+# FUZZ
+# ----------------------------
+PAYLOADS = (PARSER_RESPONSE, EMPLOYEE_RESPONSE, ENRICH_RESPONSE)
+
+
+def _fence(text, rng):
+    return rng.choice(["```json\n", "```\n", "Here is the JSON:\n", ""]) + text + rng.choice(["\n```", "\n```\nHope this helps!", ""])
+
+
+def _trailing_commas(text, rng):
+    return re.sub(r"(\s*)([}\]])", lambda m: ("," if rng.random() < 0.5 else "") + m.group(1) + m.group(2), text)
+
+
+def _smart_quotes(text, rng):
+    # Delimiters only: quotes next to structure become curly
+    text = re.sub(r'(?<=[{\[,:\s])"', "“", text)
+    return re.sub(r'"(?=\s*[:,}\]])', "”", text)
+
+
+def _raw_newlines(payload, rng):
+    """Breaks string values across lines; returns (raw text, the payload the text now holds)."""
+    def wrap(value):
+        if isinstance(value, dict):
+            return {k: wrap(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [wrap(v) for v in value]
+        if isinstance(value, str) and " " in value and rng.random() < 0.7:
+            return value.replace(" ", "\n", 1)
+        return value
+
+    expected = wrap(payload)
+    return json.dumps(expected, indent=rng.choice([None, 2])).replace("\\n", "\n"), expected
+
+
+def _python_repr(text, rng):
+    return str(json.loads(text))
+
+
+CORRUPTIONS = {
+    "valid": lambda text, rng: text,
+    "fence": _fence,
+    "trailing commas": _trailing_commas,
+    "smart quotes": _smart_quotes,
+    "python repr": _python_repr,
+}
+
+
+def fuzz_cases(count: int, seed: int) -> list:
+    """[(kind, payload, text, lossless)]: `lossless` variants must parse back to `payload`."""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        payload = rng.choice(PAYLOADS)
+        text = json.dumps(payload, indent=rng.choice([None, 2, 4]), ensure_ascii=rng.random() < 0.5)
+        kind = rng.choice(list(CORRUPTIONS) + ["raw newlines", "truncated"])
+        if kind == "raw newlines":
+            text, payload = _raw_newlines(payload, rng)
+            cases.append((kind, payload, text, True))
+        elif kind == "truncated":
+            text = _fence(text, rng)
+            start = text.index("{") + 1
+            text = text[: rng.randrange(start, len(text))]
+            cases.append((kind, payload, text, False))
+        else:
+            text = CORRUPTIONS[kind](text, rng)
+            cases.append((kind, payload, _fence(text, rng) if rng.random() < 0.5 else text, True))
+    return cases
+
+
+def run_fuzz(cases: list) -> int:
+    failures = 0
+    for kind, payload, text, lossless in cases:
+        got = shared_parse(text)
+        ok = got == payload if lossless else isinstance(got, dict) and "error" not in got
+        if not ok:
+            failures += 1
+            if failures <= 5:
+                print(f"  ❌ fuzz [{kind}]: {text[:160]!r}\n     got {str(got)[:160]!r}")
+    print(f"fuzz: {len(cases) - failures}/{len(cases)} cases pass")
+    return failures
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def p50_us(func, texts: list, repeat: int) -> float:
+    timings = []
+    for text in texts[:repeat]:
+        started = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6
+
+
+def benchmark(cases: list, repeat: int):
+    by_kind = {}
+    for kind, payload, text, lossless in cases:
+        by_kind.setdefault(kind, []).append((payload, text, lossless))
+
+    names = list(IMPLEMENTATIONS)
+    print("\n" + f"{'corruption':16s}" + "".join(f"{name:>26s}" for name in names))
+    for kind, items in sorted(by_kind.items()):
+        texts = [text for _, text, _ in items]
+        row = f"{kind:16s}"
+        for name in names:
+            func = IMPLEMENTATIONS[name]
+            ok = sum(
+                (func(text) == payload) if lossless else ("error" not in func(text))
+                for payload, text, lossless in items
+            )
+            row += f"{p50_us(func, texts, repeat):10.1f} µs {ok / len(items):6.0%} ok   "
+        print(row)
+
+
+def main(args):
+    failures = run_corpus()
+    cases = fuzz_cases(args.fuzz, args.seed)
+    failures += run_fuzz(cases)
+    benchmark(cases, args.repeat)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--fuzz", type=int, default=1000, help="number of fuzz cases")
+    cli.add_argument("--seed", type=int, default=1)
+    cli.add_argument("--repeat", type=int, default=200, help="timed calls per implementation and corruption kind")
+    sys.exit(main(cli.parse_args()))
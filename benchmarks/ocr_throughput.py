@@ -0,0 +1,102 @@
+"""
+OCR throughput / memory benchmark on the bundled scanned sample.
+
+Compares the old "render every page, then OCR one by one" approach with the
+streaming, windowed OCR in services/extraction.py. Each mode runs in a fresh
+subprocess so peak RSS numbers don't bleed into each other.
+
+    python -m benchmarks.ocr_throughput
+    python -m benchmarks.ocr_throughput --pdf some_scan.pdf --dpi 150 --max-memory-mb 64
+
+Needs poppler (pdftoppm) and tesseract on PATH.
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_PDF = os.path.join(ROOT, "temp_WhatsApp Image 2025-10-02 at 11.22.22_861968bb.pdf")
+
+
+def run_legacy(pdf_path: str) -> str:
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(pdf_path)
+    return "\n".join(pytesseract.image_to_string(img) for img in images)
+
+
+def run_streaming(pdf_path: str) -> str:
+    from services.extraction import ocr_pdf
+
+    return ocr_pdf(pdf_path)
+
+
+def measure(mode: str, pdf_path: str) -> dict:
+    """Runs one mode in this process and returns its stats."""
+    from pdf2image import pdfinfo_from_path
+
+    pages = pdfinfo_from_path(pdf_path)["Pages"]
+    started = time.perf_counter()
+    text = run_legacy(pdf_path) if mode == "legacy" else run_streaming(pdf_path)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is KiB on Linux
+    return {
+        "mode": mode,
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 3) if elapsed else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "chars": len(text.strip()),
+    }
+
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--pdf", default=SAMPLE_PDF)
+    cli.add_argument("--dpi", type=int, help="OCR_DPI for the streaming mode")
+    cli.add_argument("--threads", type=int, help="OCR_THREADS for the streaming mode")
+    cli.add_argument("--max-memory-mb", type=int, help="OCR_MAX_MEMORY_MB for the streaming mode")
+    cli.add_argument("--output", help="write results as JSON to this file")
+    cli.add_argument("--mode", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    args = cli.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.pdf)))
+        return
+
+    env = dict(os.environ)
+    for flag, name in ((args.dpi, "OCR_DPI"), (args.threads, "OCR_THREADS"), (args.max_memory_mb, "OCR_MAX_MEMORY_MB")):
+        if flag is not None:
+            env[name] = str(flag)
+
+    results = []
+    for mode in ("legacy", "streaming"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.ocr_throughput", "--mode", mode, "--pdf", args.pdf],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<10} {'pages':>5} {'sec':>8} {'pages/s':>8} {'peak RSS MB':>12} {'child RSS MB':>13} {'chars':>7}")
+    for r in results:
+        print(
+            f"{r['mode']:<10} {r['pages']:>5} {r['seconds']:>8} {r['pages_per_sec']:>8} "
+            f"{r['peak_rss_mb']:>12} {r['peak_child_rss_mb']:>13} {r['chars']:>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Success rate and LLM cost per successful parse: whole-request retries vs
+targeted re-asks (services/validation.py).
+
+A fake LLM breaks --failure-rate of its answers the way small models do
+(truncated JSON, a section left empty, a list returned as a string, no JSON
+at all). Each parse is then run two ways:
+
+  retry   REASK_ENABLED off: a bad result is retried from scratch by the
+          client (upload, extraction, full prompt), up to --attempts times
+  re-ask  REASK_ENABLED on: broken fields are re-asked inside the request;
+          the client still retries whole requests that come back bad
+
+and the table shows how many parses succeeded, LLM calls and estimated
+tokens (prompt + answer) per successful parse.
+
+    python -m benchmarks.reask
+    python -m benchmarks.reask --parses 200 --failure-rate 0.5
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+# The fake LLM has no rate limits; don't let the gateway's Groq defaults throttle it
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
+
+from benchmarks.fakes import make_fake_llm, make_docx_bytes, fake_response_for  # noqa: E402
+
+
+# ----------------------------
+# FLAKY FAKE LLM
+# ----------------------------
+def _truncate(payload, rng):
+    text = json.dumps(payload, indent=2)
+    return text[: rng.randrange(len(text) // 3, len(text) * 2 // 3)]
+
+
+def _empty_section(payload, rng):
+    lists = [key for key, value in payload.items() if isinstance(value, list)]
+    return json.dumps({**payload, rng.choice(lists): []}) if lists else json.dumps(payload)
+
+
+def _list_as_string(payload, rng):
+    lists = [key for key, value in payload.items() if isinstance(value, list)]
+    if not lists:
+        return json.dumps(payload)
+    key = rng.choice(lists)
+    return json.dumps({**payload, key: ", ".join(json.dumps(item) for item in payload[key])})
+
+
+def _no_json(payload, rng):
+    return "I'm sorry, I could not find enough information in this resume to answer in JSON."
+
+
+FAILURES = (_truncate, _empty_section, _list_as_string, _no_json)
+
+
+class FlakyAnswers:
+    """`respond` for make_fake_llm: the canned answer, broken at random; counts calls and tokens."""
+
+    def __init__(self, failure_rate: float, seed: int):
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.tokens = 0
+
+    def __call__(self, prompt_text: str) -> str:
+        from services.llm import estimate_tokens
+
+        answer = fake_response_for(prompt_text)
+        if self.rng.random() < self.failure_rate:
+            payload = json.loads(answer.strip("`").removeprefix("json"))
+            answer = self.rng.choice(FAILURES)(payload, self.rng)
+        self.calls += 1
+        self.tokens += estimate_tokens(prompt_text) + estimate_tokens(answer)
+        return answer
+
+
+# ----------------------------
+# RUNS
+# ----------------------------
+def is_good(result: dict, module, resume_text: str) -> bool:
+    from services.validation import schema_problems, present_fields
+
+    if "error" in result:
+        return False
+    required = present_fields(resume_text, module.FIELD_SECTIONS)
+    return not schema_problems(result, module.SCHEMA, required)
+
+
+async def run(module, pipeline, reask: bool, args) -> dict:
+    from services import validation
+    from services.extraction import extract_text_from_docx
+
+    validation.REASK_ENABLED = reask
+    answers = FlakyAnswers(args.failure_rate, args.seed)
+    module.llm = make_fake_llm(0, respond=answers)
+    file_bytes = make_docx_bytes(1)
+    resume_text = extract_text_from_docx(file_bytes)
+
+    successes = 0
+    for _ in range(args.parses):
+        for _ in range(args.attempts):
+            result, _, _ = await pipeline("cv.docx", file_bytes)
+            if is_good(result, module, resume_text):
+                successes += 1
+                break
+    return {"successes": successes, "calls": answers.calls, "tokens": answers.tokens}
+
+
+async def main(args):
+    from routers import parser, employeeParser
+
+    print(
+        f"{args.parses} parses, {args.failure_rate:.0%} of answers broken, up to {args.attempts} client attempts\n"
+    )
+    print(f"{'route':18s} {'mode':7s} {'success':>8s} {'calls/ok':>9s} {'tokens/ok':>10s}")
+    for route, module, pipeline in (
+        ("/parse-resume", parser, parser.run_parse_pipeline),
+        ("/employee-parser", employeeParser, employeeParser.run_employee_pipeline),
+    ):
+        for mode, reask in (("retry", False), ("re-ask", True)):
+            stats = await run(module, pipeline, reask, args)
+            ok = max(stats["successes"], 1)
+            print(
+                f"{route:18s} {mode:7s} {stats['successes'] / args.parses:8.1%} "
+                f"{stats['calls'] / ok:9.2f} {stats['tokens'] / ok:10.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--parses", type=int, default=100)
+    cli.add_argument("--failure-rate", type=float, default=0.3)
+    cli.add_argument("--attempts", type=int, default=3, help="whole-request attempts per parse (client retries)")
+    cli.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(cli.parse_args())))
@@ -0,0 +1,120 @@
+"""
+Tail latency and availability of /parse-resume with LLM routing
+(services/routing.py): Groq only vs failover vs hedging to a local model.
+
+Both backends are fakes. The primary answers in about --latency seconds,
+but --tail-rate of its calls take --tail-factor times longer and
+--error-rate of them fail; the secondary (a local model) is steady at
+--secondary-latency. The "outage" scenario fails every primary call.
+
+For each scenario and routing mode the table shows the success rate,
+latency percentiles and how many calls also went to the secondary.
+
+    python -m benchmarks.routing
+    python -m benchmarks.routing --parses 400 --tail-rate 0.1
+"""
+import os
+import sys
+import random
+import asyncio
+import argparse
+import statistics
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+# The fake LLM has no rate limits; don't let the gateway's Groq defaults throttle it
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
+os.environ.setdefault("LLM_CONCURRENCY", "64")
+
+from benchmarks.fakes import make_fake_llm, make_docx_bytes, fake_response_for  # noqa: E402
+
+
+class PrimaryOutage(Exception):
+    pass
+
+
+def make_primary(args, error_rate: float, rng: random.Random):
+    def latency(prompt_text, answer):
+        tail = rng.random() < args.tail_rate
+        return args.latency * (args.tail_factor if tail else 1) * rng.uniform(0.8, 1.2)
+
+    def respond(prompt_text):
+        if rng.random() < error_rate:
+            raise PrimaryOutage("primary backend unavailable")
+        return fake_response_for(prompt_text)
+
+    return make_fake_llm(latency, respond=respond)
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run(mode: str, error_rate: float, args) -> dict:
+    from routers import parser
+    from services.routing import RoutedLLM
+
+    rng = random.Random(args.seed)
+    secondary = make_fake_llm(args.secondary_latency) if mode != "primary" else None
+    parser.llm = RoutedLLM(
+        make_primary(args, error_rate, rng), secondary, mode, "parse-resume",
+        min_samples=args.warmup, hedge_after=args.latency * 2,
+    )
+    file_bytes = make_docx_bytes(1)
+    limit = asyncio.Semaphore(args.concurrency)
+    timings = []
+
+    async def parse_one():
+        async with limit:
+            started = time.perf_counter()
+            try:
+                result, status, _ = await parser.run_parse_pipeline("cv.docx", file_bytes)
+                ok = status == 200 and "error" not in result
+            except Exception:
+                ok = False
+            timings.append((ok, time.perf_counter() - started))
+
+    await asyncio.gather(*(parse_one() for _ in range(args.parses)))
+    latencies = [seconds for ok, seconds in timings if ok]
+    stats = parser.llm.stats
+    return {
+        "success": len(latencies) / args.parses,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 95) if latencies else 0.0,
+        "p99": percentile(latencies, 99) if latencies else 0.0,
+        "secondary": (stats["hedges"] + stats["failovers"]) / args.parses,
+    }
+
+
+async def main(args):
+    print(
+        f"{args.parses} parses, primary ~{args.latency:.2f}s ({args.tail_rate:.0%} take x{args.tail_factor:g}), "
+        f"secondary {args.secondary_latency:.2f}s\n"
+    )
+    print(f"{'scenario':9s} {'mode':9s} {'success':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'secondary':>10s}")
+    for scenario, error_rate in (("normal", args.error_rate), ("outage", 1.0)):
+        for mode in ("primary", "fallback", "hedged"):
+            r = await run(mode, error_rate, args)
+            print(
+                f"{scenario:9s} {mode:9s} {r['success']:8.1%} {r['p50'] * 1000:6.0f}ms {r['p95'] * 1000:6.0f}ms "
+                f"{r['p99'] * 1000:6.0f}ms {r['secondary']:10.1%}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--parses", type=int, default=200)
+    cli.add_argument("--concurrency", type=int, default=20)
+    cli.add_argument("--latency", type=float, default=0.2, help="primary latency, seconds")
+    cli.add_argument("--tail-rate", type=float, default=0.05)
+    cli.add_argument("--tail-factor", type=float, default=8)
+    cli.add_argument("--error-rate", type=float, default=0.02)
+    cli.add_argument("--secondary-latency", type=float, default=0.3)
+    cli.add_argument("--warmup", type=int, default=20, help="primary latencies needed before the percentile threshold is used")
+    cli.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(cli.parse_args())))
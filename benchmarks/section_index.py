@@ -0,0 +1,110 @@
+"""
+Micro-benchmark: the employee parser's section preprocessing, old vs new.
+
+"legacy" is the previous pair of functions (whole-text whitespace collapse +
+lazy IGNORECASE regexes, run once per function); "index" is one
+SectionIndex scan shared by both steps (services/sections.py). Inputs are
+generated academic CVs of increasing size, with publications followed by the
+M.S. and PhD supervision lists, where both versions must give the same output.
+
+    python -m benchmarks.section_index
+    python -m benchmarks.section_index --sizes 15000,100000 --repeat 50
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sections import SectionIndex  # noqa: E402
+
+
+# ----------------------------
+# LEGACY IMPLEMENTATION (before the section index)
+# ----------------------------
+def legacy_remove_research_publications(text: str) -> str:
+    clean_text = re.sub(r'\s+', ' ', text)
+    pattern = r'(RESEARCH\s*PUBLICATIONS.*?)(M\.?S\.?\s*STUDENTS?\s*SUPERVISED|PhD\s*STUDENTS?\s*SUPERVISED|$)'
+    result = re.sub(pattern, r'\2', clean_text, flags=re.IGNORECASE)
+    return result.strip()
+
+
+def legacy_extract_supervision_sections(text: str):
+    ms_section = ""
+    phd_section = ""
+    clean_text = re.sub(r'\s+', ' ', text)
+    clean_text = clean_text.replace("Ph.D.", "PhD").replace("M. S.", "M.S.").replace("M S", "M.S.")
+    ms_match = re.search(r'(M\.?S\.?\s*STUDENTS?\s*SUPERVISED.*?)(PhD\s*STUDENTS?\s*SUPERVISED|$)', clean_text, re.IGNORECASE)
+    if ms_match:
+        ms_section = ms_match.group(1).strip()
+    phd_match = re.search(r'(PhD\s*STUDENTS?\s*SUPERVISED.*)', clean_text, re.IGNORECASE)
+    if phd_match:
+        phd_section = phd_match.group(1).strip()
+    return ms_section, phd_section
+
+
+def run_legacy(text: str):
+    cleaned = legacy_remove_research_publications(text)
+    return (cleaned,) + legacy_extract_supervision_sections(cleaned)
+
+
+def run_index(text: str):
+    from routers.employeeParser import remove_research_publications, extract_supervision_sections
+
+    sections = SectionIndex(text)
+    return (remove_research_publications(sections),) + extract_supervision_sections(sections)
+
+
+# ----------------------------
+# INPUTS
+# ----------------------------
+def make_academic_cv(size: int) -> str:
+    """An academic CV of about `size` characters; publications take ~60% of it."""
+    head = "Dr. Jane Roe\nProfessor of Computer Science\njane.roe@university.edu\n\nEDUCATION\nPhD Computer Science, State University, 2010\n\nEXPERIENCE\n"
+    head += "".join(f"Professor, University {i}, {2010 + i}-{2011 + i}\n" for i in range(10))
+    pubs = []
+    ms = []
+    phd = []
+    i = 0
+    body = len(head)
+    while body < size:
+        pubs.append(f"{i + 1}. J. Roe et al., \"Parsing curricula vitae with language models, part {i}\", IEEE Access, vol. {i % 12}, pp. {i}-{i + 9}, 2023.\n")
+        if i % 3 == 0:
+            ms.append(f"Student {i}, \"Thesis on document understanding {i}\", {2015 + i % 8}\n")
+        if i % 5 == 0:
+            phd.append(f"Scholar {i}, \"Dissertation on information extraction {i}\", {2016 + i % 7}\n")
+        body += len(pubs[-1]) + (len(ms[-1]) if i % 3 == 0 else 0) + (len(phd[-1]) if i % 5 == 0 else 0)
+        i += 1
+    return (
+        head
+        + "\nRESEARCH PUBLICATIONS\n" + "".join(pubs)
+        + "\nM.S. STUDENTS SUPERVISED\n" + "".join(ms)
+        + "\nPhD STUDENTS SUPERVISED\n" + "".join(phd)
+    )
+
+
+def time_it(func, text: str, repeat: int) -> float:
+    func(text)  # warm-up (imports, regex cache)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(args):
+    print(f"{'chars':>9}  {'legacy ms':>10}  {'index ms':>10}  {'speedup':>8}  same output")
+    for size in (int(s) for s in args.sizes.split(",")):
+        text = make_academic_cv(size)
+        legacy = time_it(run_legacy, text, args.repeat)
+        index = time_it(run_index, text, args.repeat)
+        same = run_legacy(text) == run_index(text)
+        print(f"{len(text):>9}  {legacy * 1000:>10.3f}  {index * 1000:>10.3f}  {legacy / index:>7.1f}x  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--sizes", default="15000,50000,200000")
+    cli.add_argument("--repeat", type=int, default=20)
+    sys.exit(main(cli.parse_args()))
@@ -0,0 +1,112 @@
+"""
+Time-to-first-field of the SSE endpoints vs the blocking ones.
+
+Calls each endpoint in-process with a fake LLM that streams its answer over
+--llm-latency seconds, and reports the blocking response time next to the
+streaming endpoint's first `field` event and final `result` event. The app is
+driven as a raw ASGI callable, because test clients buffer the whole body.
+
+    python -m benchmarks.streaming
+    python -m benchmarks.streaming --llm-latency 2 --repeat 5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+# The fake LLM has no rate limits; don't let the gateway's Groq defaults throttle it
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
+
+from benchmarks.fakes import make_fake_llm, make_docx_bytes, PARSER_RESPONSE  # noqa: E402
+
+
+async def call(app, request) -> dict:
+    """Runs one httpx.Request through the ASGI app; returns status and per-chunk arrival times."""
+    body = request.read()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": request.method,
+        "scheme": "http",
+        "path": request.url.path,
+        "raw_path": request.url.raw_path,
+        "query_string": request.url.query,
+        "root_path": "",
+        "headers": [(k.lower(), v) for k, v in request.headers.raw],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()  # no disconnect
+
+    started = time.perf_counter()
+    result = {"status": None, "chunks": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            result["chunks"].append((time.perf_counter() - started, message["body"].decode()))
+
+    await app(scope, receive, send)
+    result["total"] = time.perf_counter() - started
+    return result
+
+
+def first_event(chunks: list, event: str):
+    for elapsed, text in chunks:
+        if f"event: {event}\n" in text:
+            return elapsed
+    return None
+
+
+def requests_for(route: str):
+    import httpx
+
+    if route == "/enrich":
+        payload = {"parsed_data": PARSER_RESPONSE, "selected_fields": {"role": "backend-developer", "tone": "formal"}}
+        return httpx.Request("POST", f"http://bench{route}", json=payload), httpx.Request("POST", f"http://bench{route}/stream", json=payload)
+    files = {"file": ("cv.docx", make_docx_bytes(1), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+    return httpx.Request("POST", f"http://bench{route}", files=files), httpx.Request("POST", f"http://bench{route}/stream", files=files)
+
+
+async def main(args):
+    from main import app
+    from routers import parser, employeeParser, enrich
+
+    fake_llm = make_fake_llm(args.llm_latency)
+    for module in (parser, employeeParser, enrich):
+        module.llm = fake_llm
+
+    print(f"{'route':18s} {'blocking':>10s} {'first field':>12s} {'result':>10s}  first field / blocking")
+    for route in ("/parse-resume", "/employee-parser", "/enrich"):
+        blocking, first, final = [], [], []
+        for _ in range(args.repeat):
+            plain, stream = requests_for(route)
+            blocking.append((await call(app, plain))["total"])
+            streamed = await call(app, stream)
+            first.append(first_event(streamed["chunks"], "field"))
+            final.append(first_event(streamed["chunks"], "result") or first_event(streamed["chunks"], "error"))
+        b, f, r = (statistics.median(values) * 1000 for values in (blocking, first, final))
+        print(f"{route:18s} {b:8.1f}ms {f:10.1f}ms {r:8.1f}ms  {f / b:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--llm-latency", type=float, default=1.0)
+    cli.add_argument("--repeat", type=int, default=3)
+    sys.exit(asyncio.run(main(cli.parse_args())))
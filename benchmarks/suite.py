@@ -0,0 +1,273 @@
+"""
+Offline benchmark suite for the parsing pipeline.
+
+Runs every stage on a fixed corpus (the two bundled temp_*.pdf samples plus
+generated PDF / DOCX resumes) with ChatGroq swapped for a deterministic fake,
+so runs need no API key or network and are comparable across commits:
+
+    extract_pdf / extract_docx   services.extraction, with the routers' budgets
+    compress_resume_text         services.compression on each extracted text
+    extract_contact_fields       services.contacts rules on each extracted text
+    clean_json_output            both routers' implementations
+    normalize_resume             routers.parser
+    /parse-resume, /employee-parser   full endpoints through FastAPI's TestClient
+    /parse-resume?mode=contact   the rule-based (no-LLM) contact mode
+    /employee-parser?mode=chunked   map-reduce mode (parallel per-section LLM calls)
+
+Reports p50 / p95 latency, throughput and peak memory per stage and saves
+them to JSON. Pass a previous run with --compare to print the p50 deltas.
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --iterations 20 --llm-latency 0.2 --compare bench.json
+    python -m benchmarks.suite --stages extract_pdf,normalize
+"""
+import os
+import sys
+import json
+import math
+import time
+import platform
+import resource
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+# The fake LLM has no rate limits; don't let the gateway's Groq defaults throttle it
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
+# Keep the job queue the app starts up out of the working tree
+os.environ.setdefault("JOBS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-jobs-"), "jobs.sqlite3"))
+
+from benchmarks.fakes import (  # noqa: E402
+    PARSER_RESPONSE,
+    EMPLOYEE_RESPONSE,
+    make_fake_llm,
+    fake_response_for,
+    make_docx_bytes,
+    make_pdf_bytes,
+)
+
+SAMPLE_PDFS = {
+    "sample_book_225p": "temp_Pakistan_Affairs_Studies_Notes_Book_for.pdf",
+    "sample_scan_2p": "temp_WhatsApp Image 2025-10-02 at 11.22.22_861968bb.pdf",
+}
+
+
+# ----------------------------
+# CORPUS
+# ----------------------------
+def build_corpus() -> list:
+    """Returns [(name, kind, bytes)] for the bundled samples and generated fixtures."""
+    corpus = []
+    for name, filename in SAMPLE_PDFS.items():
+        path = os.path.join(ROOT, filename)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                corpus.append((name, "pdf", f.read()))
+        else:
+            print(f"⚠️ Sample missing, skipped: {filename}")
+    corpus.append(("generated_1p", "pdf", make_pdf_bytes(pages=1)))
+    corpus.append(("generated_10p", "pdf", make_pdf_bytes(pages=10)))
+    corpus.append(("generated", "docx", make_docx_bytes(repeat=1)))
+    corpus.append(("generated_x20", "docx", make_docx_bytes(repeat=20)))
+    return corpus
+
+
+# ----------------------------
+# MEASUREMENT
+# ----------------------------
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(func, iterations: int, warmup: int = 1) -> dict:
+    """
+    Times `func()` over `iterations` runs (after `warmup` untimed runs), then
+    runs it once more under tracemalloc for the peak Python allocation.
+    Timing runs are kept separate because tracemalloc slows allocation-heavy code.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "throughput_per_s": round(iterations / total, 2) if total else None,
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def max_rss_mb() -> dict:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+# ----------------------------
+# STAGES
+# ----------------------------
+def stage_cases(corpus: list, client) -> list:
+    """Returns [(stage, case, func, extra)] for everything the suite measures."""
+    from services.extraction import extract_text_from_pdf, extract_text_from_docx
+    from services.compression import compress_resume_text
+    from services.contacts import extract_contact_fields, RULES as CONTACT_RULES
+    from routers import parser, employeeParser
+
+    parser_raw = fake_response_for("")
+    employee_raw = fake_response_for("phdstudentsupervised")
+    cases = []
+
+    for name, kind, data in corpus:
+        if kind == "pdf":
+            cases.append(("extract_pdf", name, lambda data=data: extract_text_from_pdf(data, max_chars=parser.MAX_RESUME_CHARS), {"input_bytes": len(data)}))
+        else:
+            cases.append(("extract_docx", name, lambda data=data: extract_text_from_docx(data, max_chars=parser.MAX_RESUME_CHARS), {"input_bytes": len(data)}))
+
+    for name, kind, data in corpus:
+        extract = extract_text_from_pdf if kind == "pdf" else extract_text_from_docx
+        text = extract(data, max_chars=parser.MAX_RESUME_CHARS)
+        _, stats = compress_resume_text(text, parser.MAX_PROMPT_TOKENS)
+        cases.append(("compress_resume_text", name, lambda text=text: compress_resume_text(text, parser.MAX_PROMPT_TOKENS), {"tokens": stats}))
+        found = sorted(extract_contact_fields(text, tuple(CONTACT_RULES)))
+        cases.append(("extract_contact_fields", name, lambda text=text: extract_contact_fields(text, tuple(CONTACT_RULES)), {"found": found}))
+
+    cases.append(("clean_json_output", "parser", lambda: parser.clean_json_output(parser_raw), {}))
+    cases.append(("clean_json_output", "employee", lambda: employeeParser.clean_json_output(employee_raw), {}))
+    cases.append(("normalize_resume", "parser", lambda: parser.normalize_resume(dict(PARSER_RESPONSE)), {}))
+
+    for route in ("/parse-resume", "/parse-resume?mode=contact", "/employee-parser", "/employee-parser?mode=chunked"):
+        for name, kind, data in corpus:
+            filename = f"{name}.{kind}"
+            mime = "application/pdf" if kind == "pdf" else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            statuses = set()
+
+            def call(route=route, filename=filename, data=data, mime=mime, statuses=statuses):
+                response = client.post(route, files={"file": (filename, data, mime)})
+                statuses.add(response.status_code)
+
+            cases.append((route, name, call, {"input_bytes": len(data), "status_codes": statuses}))
+    return cases
+
+
+def run_suite(args) -> dict:
+    from fastapi.testclient import TestClient
+    from main import app
+    from routers import parser, employeeParser
+
+    fake_llm = make_fake_llm(args.llm_latency)
+    parser.llm = fake_llm
+    employeeParser.llm = fake_llm
+
+    corpus = build_corpus()
+    wanted = [s.strip() for s in args.stages.split(",")] if args.stages else None
+    results = {}
+
+    with TestClient(app) as client:
+        for stage, case, func, extra in stage_cases(corpus, client):
+            key = f"{stage}[{case}]"
+            if wanted and not any(w in key for w in wanted):
+                continue
+            endpoint = stage.startswith("/")
+            iterations = args.endpoint_iterations if endpoint else args.iterations
+            stats = measure(func, iterations)
+            if "input_bytes" in extra:
+                stats["input_bytes"] = extra["input_bytes"]
+            if "tokens" in extra:
+                stats["tokens_before"] = extra["tokens"]["tokens_before"]
+                stats["tokens_after"] = extra["tokens"]["tokens_after"]
+            if "status_codes" in extra:
+                stats["status_codes"] = sorted(extra["status_codes"])
+            results[key] = stats
+            print(
+                f"{key:50s} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+                f"{stats['throughput_per_s']:8.2f}/s  peak {stats['peak_alloc_kb']:9.1f} KB"
+                + (f"  status {stats['status_codes']}" if endpoint else "")
+            )
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "llm_latency_s": args.llm_latency,
+            "iterations": args.iterations,
+            "endpoint_iterations": args.endpoint_iterations,
+            "max_rss_mb": max_rss_mb(),
+        },
+        "stages": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+# ----------------------------
+# COMPARISON
+# ----------------------------
+def compare(previous: dict, current: dict):
+    print(f"\np50 vs {previous['meta'].get('commit') or 'previous run'} ({previous['meta'].get('timestamp')}):")
+    for key, stats in current["stages"].items():
+        old = previous["stages"].get(key)
+        if not old:
+            print(f"  {key:45s} (new)")
+            continue
+        delta = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        print(f"  {key:45s} {old['p50_ms']:9.2f} -> {stats['p50_ms']:9.2f} ms  ({delta:+.1f}%)")
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--iterations", type=int, default=10, help="timed runs per in-process stage")
+    cli.add_argument("--endpoint-iterations", type=int, default=5, help="timed runs per endpoint case")
+    cli.add_argument("--llm-latency", type=float, default=0.1, help="seconds the fake LLM takes per call")
+    cli.add_argument("--stages", default="", help="comma-separated substrings to select stages")
+    cli.add_argument("--output", help="write results to this JSON file")
+    cli.add_argument("--compare", help="previous results JSON to compare against")
+    args = cli.parse_args()
+
+    report = run_suite(args)
+    print(f"\nmax RSS: {report['meta']['max_rss_mb']['self']} MB (server), "
+          f"{report['meta']['max_rss_mb']['children']} MB (extraction workers)")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results saved to {args.output}")
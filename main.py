@@ -1,22 +1,86 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from routers import parser  # import your parser router
-from routers import parser, enrich, employeeParser
+from routers import parser, enrich, employeeParser, jobs
+from services.concurrency import shutdown_process_pool
+from services.cache import result_cache
+from services.llm import llm_gateway
+from services.routing import routing_snapshot
+from services.uploads import UploadSizeLimitMiddleware, MAX_UPLOAD_BYTES, MULTIPART_OVERHEAD
+from services.batch import MAX_BATCH_BYTES
+from services.warmup import warmup
+from services.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 app = FastAPI(title="TaaS Grid Resume Parser API")
 
+# Reject oversized uploads from their Content-Length, before the body is read
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/parse-resume": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+        "/employee-parser": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+        "/parse-resume/stream": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+        "/employee-parser/stream": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+        "/parse-resume/batch": MAX_BATCH_BYTES,
+        "/employee-parser/batch": MAX_BATCH_BYTES,
+        "/jobs": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+    },
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Cache", "X-Cache-Tier", "X-Prompt-Tokens", "X-Prompt-Tokens-Saved"],
 )
 
+# Outermost: per-request stage timings -> Server-Timing header + /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(parser.router)
 app.include_router(enrich.router)
 app.include_router(employeeParser.router)
+app.include_router(jobs.router)
+
+@app.on_event("startup")
+async def startup():
+    jobs.job_workers.start()
+    # Heavy libraries and LLM clients load in the background; see /readyz
+    warmup.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await warmup.stop()
+    await jobs.job_workers.stop()
+    shutdown_process_pool()
+
 @app.get("/")
 def home():
     return {"message": "✅ TaaS Grid Backend is running properly"}
+
+# Liveness: the process is up and serving
+@app.get("/healthz")
+def healthz():
+    return {"status": "alive"}
+
+# Readiness: warm-up has finished, so requests won't pay for loading
+@app.get("/readyz")
+def readyz():
+    return JSONResponse(content=warmup.snapshot(), status_code=200 if warmup.ready else 503)
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {**result_cache.snapshot(), "enrich_context": enrich.context_cache.snapshot()}
+
+@app.get("/llm/stats")
+def llm_stats():
+    return {**llm_gateway.snapshot(), "routes": routing_snapshot()}
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
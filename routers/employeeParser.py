@@ -148,17 +148,28 @@
 
 import os
 import json
-import re
-import ast
-from fastapi import APIRouter, UploadFile, File
+import asyncio
+from contextlib import nullcontext
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Query
 from fastapi.responses import JSONResponse
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
-from docx import Document
-import pytesseract
+from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
+from services.extraction import extractor_for
+from services.llm import invoke_llm, INTERACTIVE
+from services.routing import get_routed_llm, track_backends, answered_by_primary
+from services.cache import ResultCache, result_cache, prompt_version, cache_headers
+from services.uploads import read_upload, upload_kind, UploadRejected, UNSUPPORTED_FILE_TYPE
+from services.batch import expand_batch, ndjson_batch_response
+from services.compression import compress_resume_text, COMPRESSION_VERSION
+from services.docx_text import DOCX_TEXT_VERSION
+from services.sections import SectionIndex
+from services.chunking import plan_chunks, merge_chunk_results
+from services.contacts import extract_contact_fields, confident_fields, merge_contact_fields, CONTACT_RULES_VERSION
+from services.streaming import stream_llm_events, sse_response, sse_event
+from services.json_repair import clean_json_output
+from services.validation import reask_fields, present_fields
+from services.metrics import run_extraction, timed, record_cache_lookup, record_prompt_compression, record_chunked_parse
 
 # ----------------------------
 # Load environment variables
@@ -166,160 +177,117 @@ from dotenv import load_dotenv
 load_dotenv()
 router = APIRouter()
 
-# ----------------------------
-# Initialize LLM
-# ----------------------------
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
-
-# ----------------------------
-# TEXT EXTRACTION HELPERS
-# ----------------------------
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    try:
-        reader = PdfReader(file_path)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
-    except Exception:
-        pass
-
-    # OCR fallback if PDF text extraction fails
-    if not text.strip():
-        try:
-            images = convert_from_path(file_path)
-            ocr_text = "\n".join(pytesseract.image_to_string(img) for img in images)
-            text += ocr_text
-        except Exception as e:
-            print("⚠️ OCR failed:", e)
-    return text.strip()
-
-
-def extract_text_from_docx(file_path: str) -> str:
-    """Extracts text from DOCX resumes."""
-    try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
-    except Exception as e:
-        print("⚠️ DOCX extraction failed:", e)
-        return ""
+# Extraction stops once it has MAX_RESUME_CHARS of raw text; compression then
+# fits the cleaned text into MAX_PROMPT_TOKENS for the LLM
+MAX_RESUME_CHARS = 24000
+MAX_PROMPT_TOKENS = 3750
 
+# Chunked mode reads much more of the CV and splits it into CHUNK_TOKENS-sized
+# sub-prompts that run in parallel (see run_chunked_pipeline)
+MAX_CHUNKED_CHARS = 150000
+MAX_CHUNKED_TOKENS = 30000
+CHUNK_TOKENS = 2500
 
 # ----------------------------
-# CLEAN & FIX JSON OUTPUT
+# Initialize LLM
 # ----------------------------
-def clean_json_output(text: str):
-    """
-    Cleans and normalizes LLM output into valid JSON.
-    Handles malformed structures, smart quotes, and trailing commas.
-    """
-    try:
-        text = text.replace("```json", "").replace("```", "").strip()
-        text = re.sub(r'^[^{]*', '', text)
-        text = re.sub(r'[^}]*$', '', text)
-        text = (
-            text.replace("“", '"')
-                .replace("”", '"')
-                .replace("’", "'")
-                .replace("\n", " ")
-                .replace("\r", " ")
-        )
-        text = re.sub(r",\s*}", "}", text)
-        text = re.sub(r",\s*]", "]", text)
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        print("⚠️ JSON decode error:", e)
-        try:
-            return ast.literal_eval(text)
-        except Exception as inner_e:
-            print("⚠️ Fallback parse failed:", inner_e)
-            return {"error": "Invalid JSON output from LLM", "raw_output": text}
-
+MODEL_NAME = "llama-3.1-8b-instant"
+# Groq, with failover / hedging to a local model per services/routing.py
+llm = get_routed_llm("employee-parser", MODEL_NAME, temperature=0)
 
 # ----------------------------
 # SECTION PREPROCESSORS
 # ----------------------------
-def remove_research_publications(text: str) -> str:
+def remove_research_publications(sections) -> str:
     """
-    Removes 'Research Publications', 'Books', or 'Conferences' sections
-    to prevent confusion with supervision sections.
+    Removes the 'Research Publications' section to prevent confusion with
+    supervision sections. `sections` is the resume text or its SectionIndex.
     """
-    clean_text = re.sub(r'\s+', ' ', text)
-    pattern = r'(RESEARCH\s*PUBLICATIONS.*?)(M\.?S\.?\s*STUDENTS?\s*SUPERVISED|PhD\s*STUDENTS?\s*SUPERVISED|$)'
-    result = re.sub(pattern, r'\2', clean_text, flags=re.IGNORECASE)
-    return result.strip()
+    index = sections if isinstance(sections, SectionIndex) else SectionIndex(sections)
+    return index.without("publications")
+
 
+def _normalize_degrees(text: str) -> str:
+    return text.replace("Ph.D.", "PhD").replace("M. S.", "M.S.")
 
-def extract_supervision_sections(text: str):
+
+def extract_supervision_sections(sections):
     """
     Extracts M.S. and PhD supervision sections separately for better accuracy.
+    `sections` is the resume text or its SectionIndex.
     """
-    ms_section = ""
-    phd_section = ""
-
-    clean_text = re.sub(r'\s+', ' ', text)
-    clean_text = (
-        clean_text.replace("Ph.D.", "PhD")
-        .replace("M. S.", "M.S.")
-        .replace("M S", "M.S.")
-    )
-
-    ms_match = re.search(
-        r'(M\.?S\.?\s*STUDENTS?\s*SUPERVISED.*?)(PhD\s*STUDENTS?\s*SUPERVISED|$)',
-        clean_text,
-        re.IGNORECASE,
-    )
-    if ms_match:
-        ms_section = ms_match.group(1).strip()
-
-    phd_match = re.search(
-        r'(PhD\s*STUDENTS?\s*SUPERVISED.*)',
-        clean_text,
-        re.IGNORECASE,
-    )
-    if phd_match:
-        phd_section = phd_match.group(1).strip()
-
+    index = sections if isinstance(sections, SectionIndex) else SectionIndex(sections)
+    ms_section = _normalize_degrees(index.section("ms_supervised"))
+    phd_section = _normalize_degrees(index.section("phd_supervised"))
     return ms_section, phd_section
 
 
 # ----------------------------
 # PROMPT TEMPLATE (STRICT + GUIDED)
 # ----------------------------
+# JSON structure asked from the LLM, key -> example value. Contact fields the
+# rules in services/contacts.py already found with high confidence are left out.
+STRUCTURE = {
+    "name": '""',
+    "email": '""',
+    "phone": '""',
+    "citations": '""',
+    "impactFactor": '""',
+    "scholar": '""',
+    "education": '[{"degree": "", "institution": "", "year": ""}]',
+    "experience": '[{"role": "", "company": "", "years": ""}]',
+    "achievements": '[""]',
+    "bookAuthorship": '[{"title": "", "publisher": ""}]',
+    "journalGuestEditor": '[{"title": "", "publisher": "", "section": ""}]',
+    "researchPublications": '[{"title": "", "journal": "", "year": ""}]',
+    "mssupervised": '[{"studentName": "", "thesisTitle": "", "year": ""}]',
+    "phdstudentsupervised": '[{"studentName": "", "thesisTitle": "", "year": ""}]',
+    "researchProjects": '[{"title": "", "description": ""}]',
+    "professionalActivities": '[{"heading": "", "desc": "", "year": ""}]',
+    "professionalTraining": '[{"title": "", "description": "", "year": ""}]',
+    "technicalSkills": '[{"category": "", "details": ""}]',
+    "membershipsAndOtherAssociations": '[{"heading": "", "desc": "", "year": ""}]',
+    "reference": '[{"prof": "", "designation": "", "mail": "", "phone": ""}]',
+}
+CONTACT_FIELDS = ("name", "email", "phone", "scholar")
+# The same structure as parsed values, for validating answers (services/validation.py)
+SCHEMA = {key: json.loads(example) for key, example in STRUCTURE.items()}
+# Resume sections (services/sections.py) each key is read from. The prompt
+# lets the model leave out empty keys, so a missing key is only re-asked when
+# its section exists; keys without an entry come from the header.
+FIELD_SECTIONS = {
+    "education": ("education",),
+    "experience": ("experience",),
+    "achievements": ("awards",),
+    "bookAuthorship": ("books",),
+    "journalGuestEditor": ("guest_editor",),
+    "researchPublications": ("publications", "conferences"),
+    "mssupervised": ("ms_supervised",),
+    "phdstudentsupervised": ("phd_supervised",),
+    "researchProjects": ("projects",),
+    "professionalActivities": ("activities",),
+    "professionalTraining": ("training",),
+    "technicalSkills": ("skills",),
+    "membershipsAndOtherAssociations": ("memberships",),
+    "reference": ("references",),
+}
+REASK_TASK = "Extract these fields from the resume text below."
+
+
+def json_structure(skip=(), keys=None) -> str:
+    """The STRUCTURE block of the prompt, for `keys` (default: all) minus `skip`."""
+    lines = [f'  "{key}": {STRUCTURE[key]}' for key in (keys or STRUCTURE) if key not in skip]
+    return "{\n" + ",\n".join(lines) + "\n}"
+
+
 template = PromptTemplate(
-    input_variables=["resume_text"],
+    input_variables=["json_structure", "resume_text"],
     template="""
 Extract structured information from the resume text below.
 
 Return **only valid JSON** with the following structure:
 
-{{
-  "name": "",
-  "email": "",
-  "phone": "",
-  "citations": "",
-  "impactFactor": "",
-  "scholar": "",
-  "education": [{{"degree": "", "institution": "", "year": ""}}],
-  "experience": [{{"role": "", "company": "", "years": ""}}],
-  "achievements": [""],
-  "bookAuthorship": [{{"title": "", "publisher": ""}}],
-  "journalGuestEditor": [{{"title": "", "publisher": "", "section": ""}}],
-  "researchPublications": [{{"title": "", "journal": "", "year": ""}}],
-  "mssupervised": [{{"studentName": "", "thesisTitle": "", "year": ""}}],
-  "phdstudentsupervised": [{{"studentName": "", "thesisTitle": "", "year": ""}}],
-  "researchProjects": [{{"title": "", "description": ""}}],
-  "professionalActivities": [{{"heading": "", "desc": "", "year": ""}}],
-  "professionalTraining": [{{"title": "", "description": "", "year": ""}}],
-  "technicalSkills": [{{"category": "", "details": ""}}],
-  "membershipsAndOtherAssociations": [{{"heading": "", "desc": "", "year": ""}}],
-  "reference": [{{"prof": "", "designation": "", "mail": "", "phone": ""}}]
-}}
+{json_structure}
 
 Rules:
 1. Ignore any research publication titles when listing student supervision.
@@ -332,44 +300,111 @@ Resume Text:
 {resume_text}
 """
 )
+TEMPLATE_VERSION = (
+    f"{prompt_version(template, json_structure())}-c{COMPRESSION_VERSION}-{MAX_PROMPT_TOKENS}-r{CONTACT_RULES_VERSION}-d{DOCX_TEXT_VERSION}"
+)
 
 # ----------------------------
-# PARSING ENDPOINT
+# CHUNKED (MAP-REDUCE) PROMPT
 # ----------------------------
-@router.post("/employee-parser")
-async def parse_resume(file: UploadFile = File(...)):
-    try:
-        # Validate file type
-        if not (file.filename.lower().endswith(".pdf") or file.filename.lower().endswith(".docx")):
-            return JSONResponse(
-                content={"error": "Unsupported file type. Please upload PDF or DOCX only."},
-                status_code=400,
-            )
+# Sections that get their own chunks, and the keys their sub-prompt asks for.
+# Everything else goes to the "profile" chunks, which ask for the remaining keys.
+PROFILE = "profile"
+SECTION_GROUPS = {
+    "publications": "publications",
+    "conferences": "publications",
+    "books": "books",
+    "guest_editor": "books",
+    "ms_supervised": "supervision",
+    "phd_supervised": "supervision",
+    "supervision": "supervision",
+    "projects": "projects",
+}
+GROUP_KEYS = {
+    "publications": ("researchPublications",),
+    "books": ("bookAuthorship", "journalGuestEditor"),
+    "supervision": ("mssupervised", "phdstudentsupervised"),
+    "projects": ("researchProjects",),
+}
+# List items found in two chunks (window overlap) are merged on these fields
+DEDUPE_BY = {
+    "researchPublications": ("title",),
+    "bookAuthorship": ("title",),
+    "journalGuestEditor": ("title",),
+    "mssupervised": ("studentName",),
+    "phdstudentsupervised": ("studentName",),
+    "researchProjects": ("title",),
+}
+
+chunk_template = PromptTemplate(
+    input_variables=["section", "json_structure", "resume_text"],
+    template="""
+Extract structured information from one part ({section}) of a longer resume.
 
-        temp_path = f"temp_{file.filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
+Return **only valid JSON** with the following structure:
 
-        # Extract resume text
-        if file.filename.lower().endswith(".pdf"):
-            resume_text = extract_text_from_pdf(temp_path)
-        else:
-            resume_text = extract_text_from_docx(temp_path)
+{json_structure}
 
-        if not resume_text.strip():
-            os.remove(temp_path)
-            return JSONResponse(
-                content={"error": "No readable text found. Try uploading a text-based resume."},
-                status_code=400,
-            )
+Rules:
+1. Only use the text below; leave out anything that is not in it.
+2. List every entry you find; do not summarize or skip entries.
+3. M.S. and PhD students go to their own arrays, following the section headings.
+4. Return **only JSON**, with no explanations or markdown.
 
-        # Limit & preprocess text
-        resume_text = resume_text[:15000]
-        resume_text = remove_research_publications(resume_text)
-        ms_text, phd_text = extract_supervision_sections(resume_text)
+Resume Text:
+{resume_text}
+"""
+)
+CHUNKED_VERSION = (
+    f"{prompt_version(chunk_template, json_structure())}-c{COMPRESSION_VERSION}-{MAX_CHUNKED_TOKENS}"
+    f"-{CHUNK_TOKENS}-r{CONTACT_RULES_VERSION}-d{DOCX_TEXT_VERSION}"
+)
+
+
+def chunk_keys(group: str, groups: set) -> tuple:
+    """Keys asked from a chunk: its group's keys, or for profile chunks every key no other chunk covers."""
+    if group != PROFILE:
+        return GROUP_KEYS[group]
+    covered = {key for other in groups if other != PROFILE for key in GROUP_KEYS[other]}
+    return tuple(key for key in STRUCTURE if key not in covered)
 
-        # Add section markers for clarity
-        resume_input = f"""
+
+# ----------------------------
+# PARSING PIPELINES
+# ----------------------------
+async def prepare_employee(filename: str, file_bytes: bytes):
+    """
+    Everything before the LLM call: cache lookup, extraction, contact rules
+    and section preprocessing. Returns (early, request): `early` is the final
+    (content, status_code, cache_tier) when no LLM call is needed (cache hit,
+    no text), otherwise None and `request` holds the prompt inputs.
+    """
+    # Same file + same prompt + same model -> skip extraction and LLM entirely
+    cache_key = ResultCache.make_key(file_bytes, "employee-parser", TEMPLATE_VERSION, MODEL_NAME)
+    cached, tier = await result_cache.aget(cache_key)
+    record_cache_lookup(tier)
+    if cached is not None:
+        return (cached, 200, tier), None
+
+    # Extract resume text straight from the uploaded bytes (no temp files)
+    resume_text = await run_extraction(extractor_for(filename), file_bytes, MAX_RESUME_CHARS)
+
+    if not resume_text.strip():
+        return ({"error": "No readable text found. Try uploading a text-based resume."}, 400, None), None
+
+    # Compress to the token budget & preprocess text (counted as extraction work)
+    with timed("extract"):
+        contacts = extract_contact_fields(resume_text, CONTACT_FIELDS)
+        resume_text, compression = compress_resume_text(resume_text, MAX_PROMPT_TOKENS)
+        sections = SectionIndex(resume_text)  # one heading scan shared by both steps
+        resume_text = remove_research_publications(sections)
+        ms_text, phd_text = extract_supervision_sections(sections)
+        # Same text with its lines kept: headings are only found at line starts
+        checked_text = sections.without("publications", collapse=False)
+    record_prompt_compression(compression)
+
+    # Add section markers for clarity
+    resume_input = f"""
 {resume_text}
 
 --- START OF M.S. SUPERVISED SECTION ---
@@ -378,17 +413,224 @@ async def parse_resume(file: UploadFile = File(...)):
 --- START OF PhD SUPERVISED SECTION ---
 {phd_text}
 """
+    inputs = {"json_structure": json_structure(confident_fields(contacts)), "resume_text": resume_input}
+    return None, {
+        "cache_key": cache_key, "contacts": contacts, "inputs": inputs,
+        "resume_text": checked_text, "backends": track_backends(),
+    }
 
-        # Run the model
-        chain = template | llm
-        structured_response = chain.invoke({"resume_text": resume_input}).content
-        print("🧩 Raw LLM output preview:", structured_response[:300])
 
+async def finish_employee(structured_response: str, request: dict, priority: int = INTERACTIVE) -> dict:
+    """
+    JSON repair of the LLM's answer, a re-ask for keys that are missing or
+    malformed, then contact merge; caches good results.
+    """
+    print("🧩 Raw LLM output preview:", structured_response[:300])
+    with timed("postprocess"):
         structured_data = clean_json_output(structured_response)
+        resume_text = request["resume_text"]
+        required = present_fields(resume_text, FIELD_SECTIONS)
+
+    structured_data = await reask_fields(
+        llm, structured_data, SCHEMA, resume_text, REASK_TASK,
+        FIELD_SECTIONS, required, skip=confident_fields(request["contacts"]), priority=priority,
+    )
+
+    with timed("postprocess"):
+        if "error" not in structured_data:
+            merge_contact_fields(structured_data, request["contacts"])
+            # Incomplete answers and answers from the fallback backend are served, not cached
+            if "incomplete_fields" not in structured_data and answered_by_primary(request["backends"]):
+                await result_cache.aset(request["cache_key"], structured_data)
+    return structured_data
+
+
+async def run_employee_pipeline(filename: str, file_bytes: bytes, llm_slot=None, priority: int = INTERACTIVE):
+    """
+    Cache lookup -> extraction -> section preprocessing -> LLM -> JSON repair
+    for one upload that has already been read and validated. Shared by the
+    single and batch endpoints. Returns (content, status_code, cache_tier).
+    """
+    early, request = await prepare_employee(filename, file_bytes)
+    if early is not None:
+        return early
+
+    # Run the model
+    chain = template | llm
+    with timed("llm"):
+        async with llm_slot or nullcontext():
+            structured_response = (await invoke_llm(chain, request["inputs"], priority)).content
+
+    structured_data = await finish_employee(structured_response, request, priority)
+    return structured_data, 200, None
+
+
+async def run_chunked_pipeline(filename: str, file_bytes: bytes, llm_slot=None, priority: int = INTERACTIVE):
+    """
+    Map-reduce variant of run_employee_pipeline for long CVs: the text is
+    split by section (and long sections into overlapping token windows), all
+    chunks are sent to the LLM at once with section-specific sub-prompts, and
+    the results are merged in chunk order with publications and students
+    deduplicated. Wall time is about one chunk's latency.
+    """
+    cache_key = ResultCache.make_key(file_bytes, "employee-parser-chunked", CHUNKED_VERSION, MODEL_NAME)
+    cached, tier = await result_cache.aget(cache_key)
+    record_cache_lookup(tier)
+    if cached is not None:
+        return cached, 200, tier
+
+    resume_text = await run_extraction(extractor_for(filename), file_bytes, MAX_CHUNKED_CHARS)
+
+    if not resume_text.strip():
+        return {"error": "No readable text found. Try uploading a text-based resume."}, 400, None
+
+    with timed("extract"):
+        contacts = extract_contact_fields(resume_text, CONTACT_FIELDS)
+        resume_text, compression = compress_resume_text(resume_text, MAX_CHUNKED_TOKENS)
+        chunks = plan_chunks(resume_text, SECTION_GROUPS, CHUNK_TOKENS, PROFILE)
+    record_prompt_compression(compression)
+
+    groups = {group for group, _ in chunks}
+    skip = confident_fields(contacts)
+    chain = chunk_template | llm
+    backends = track_backends()
+
+    async def map_chunk(group: str, text: str) -> str:
+        inputs = {
+            "section": group,
+            "json_structure": json_structure(skip, chunk_keys(group, groups)),
+            "resume_text": _normalize_degrees(text),
+        }
+        return (await invoke_llm(chain, inputs, priority)).content
+
+    async def check_chunk(group: str, text: str, response: str) -> dict:
+        # A chunk with broken or missing keys gets one re-ask of just those keys
+        with timed("postprocess"):
+            result = clean_json_output(response)
+            text = _normalize_degrees(text)
+            schema = {key: SCHEMA[key] for key in chunk_keys(group, groups)}
+            required = present_fields(text, FIELD_SECTIONS)
+        return await reask_fields(llm, result, schema, text, REASK_TASK, FIELD_SECTIONS, required, skip, priority)
+
+    # Map: every chunk in flight at once (the LLM gateway still applies rate limits)
+    with timed("llm"):
+        async with llm_slot or nullcontext():
+            responses = await asyncio.gather(*(map_chunk(group, text) for group, text in chunks))
+    record_chunked_parse(len(chunks))
+    results = await asyncio.gather(
+        *(check_chunk(group, text, response) for (group, text), response in zip(chunks, responses))
+    )
+
+    # Reduce
+    with timed("postprocess"):
+        parsed, failed = [], set()
+        for (group, _), result in zip(chunks, results):
+            if not isinstance(result, dict) or "error" in result:
+                failed.add(group)
+                continue
+            # Still missing fields after its re-ask: merged, but the section is incomplete
+            if result.pop("incomplete_fields", None):
+                failed.add(group)
+            parsed.append(result)
+        failed = sorted(failed)
+        if not parsed:
+            # Every chunk failed: there is nothing to serve
+            return results[0], 502, None
+        structured_data = merge_contact_fields(merge_chunk_results(parsed, DEDUPE_BY), contacts)
+        if failed:
+            structured_data["incomplete_sections"] = failed
+
+    if not failed and answered_by_primary(backends):
+        await result_cache.aset(cache_key, structured_data)
+    return structured_data, 200, None
+
+
+PIPELINES = {"full": run_employee_pipeline, "chunked": run_chunked_pipeline}
+
+
+# ----------------------------
+# PARSING ENDPOINTS
+# ----------------------------
+@router.post("/employee-parser")
+async def parse_resume(file: UploadFile = File(...), mode: str = Query("full", pattern="^(full|chunked)$")):
+    """`mode=chunked` parses long CVs with parallel per-section LLM calls instead of one truncated prompt."""
+    try:
+        # Validate file type
+        kind = upload_kind(file.filename)
+        if kind is None:
+            return JSONResponse(
+                content={"error": UNSUPPORTED_FILE_TYPE},
+                status_code=400,
+            )
+
+        # Stream the upload in chunks: wrong magic bytes -> 415, over size/page limits -> 413
+        try:
+            file_bytes = await read_upload(file, kind)
+        except UploadRejected as e:
+            return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+
+        content, status_code, tier = await PIPELINES[mode](file.filename, file_bytes)
+        headers = cache_headers(tier) if status_code == 200 else None
+        return JSONResponse(content=content, status_code=status_code, headers=headers)
+
+    except Exception as e:
+        print("❌ Unexpected Error:", e)
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.post("/employee-parser/stream")
+async def parse_resume_stream(file: UploadFile = File(...)):
+    """
+    Streaming /employee-parser: server-sent events for each field (and each
+    array entry) as the model writes it, then a `result` event with the same
+    body as /employee-parser. Upload and extraction errors are plain JSON errors.
+    """
+    try:
+        kind = upload_kind(file.filename)
+        if kind is None:
+            return JSONResponse(
+                content={"error": UNSUPPORTED_FILE_TYPE},
+                status_code=400,
+            )
 
-        os.remove(temp_path)
-        return JSONResponse(content=structured_data)
+        try:
+            file_bytes = await read_upload(file, kind)
+        except UploadRejected as e:
+            return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+
+        early, request = await prepare_employee(file.filename, file_bytes)
+        if early is not None:
+            content, status_code, tier = early
+            if status_code != 200:
+                return JSONResponse(content=content, status_code=status_code)
+            return sse_response(iter([sse_event("result", content)]), headers=cache_headers(tier))
+
+        events = stream_llm_events(
+            template | llm,
+            request["inputs"],
+            lambda text: finish_employee(text, request),
+            initial=confident_fields(request["contacts"]),
+        )
+        return sse_response(events, headers=cache_headers(None))
 
     except Exception as e:
         print("❌ Unexpected Error:", e)
         return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.post("/employee-parser/batch")
+async def parse_resume_batch(
+    files: List[UploadFile] = File(...), mode: str = Query("full", pattern="^(full|chunked)$")
+):
+    """
+    Parses many PDF/DOCX CVs (or ZIP archives of them) in one request.
+    Streams one NDJSON line per file, in completion order.
+    """
+    try:
+        items = await expand_batch(files)
+    except UploadRejected as e:
+        return JSONResponse(
+            content={"error": e.message},
+            status_code=e.status_code,
+        )
+    return ndjson_batch_response(items, PIPELINES[mode])
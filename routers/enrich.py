@@ -1,23 +1,40 @@
 import os
 import json
+import asyncio
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
+from services.llm import invoke_llm, estimate_tokens
+from services.routing import get_routed_llm, track_backends, answered_by_primary
+from services.cache import TTLCache, prompt_version
+from services.json_repair import parse_llm_json
+from services.validation import reask_fields
+from services.streaming import stream_llm_events, sse_response
+from services.metrics import timed, record_json_repair
 
 load_dotenv()
 router = APIRouter()
 
+# The role guidance depends only on selected_fields, so it is generated once
+# per context and kept for ENRICH_CONTEXT_TTL seconds (LRU beyond ENRICH_CONTEXT_ITEMS)
+ENRICH_CONTEXT_TTL = int(os.getenv("ENRICH_CONTEXT_TTL", str(24 * 3600)))
+ENRICH_CONTEXT_ITEMS = int(os.getenv("ENRICH_CONTEXT_ITEMS", "512"))
+# Long free-text values in the CV are cut to this many characters in the prompt
+MAX_CV_VALUE_CHARS = 400
+# /enrich/batch: contexts per request, and the estimated tokens (prompt plus
+# answers) of one LLM call; contexts are packed into calls up to that budget
+MAX_ENRICH_CONTEXTS = int(os.getenv("MAX_ENRICH_CONTEXTS", "20"))
+ENRICH_BATCH_TOKENS = int(os.getenv("ENRICH_BATCH_TOKENS", "6000"))
+ENRICH_ANSWER_TOKENS = 250  # a typical suggestions object
+
 # ----------------------------
 # Initialize LangChain model
 # ----------------------------
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.4,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
+MODEL_NAME = "llama-3.1-8b-instant"
+# Groq, with failover / hedging to a local model per services/routing.py
+llm = get_routed_llm("enrich", MODEL_NAME, temperature=0.4)
 
 # ----------------------------
 # Input Schema
@@ -26,71 +43,412 @@ class EnrichRequest(BaseModel):
     parsed_data: dict
     selected_fields: dict  # {"role": "frontend-developer", "industry": "technology", "experience_level": "mid-level", "tone": "formal"}
 
+
+class EnrichBatchRequest(BaseModel):
+    parsed_data: dict
+    selected_fields: list[dict]  # one context per comparison, as in EnrichRequest
+
 # ----------------------------
-# Smarter Prompt Template
+# Prompt Templates
 # ----------------------------
-template = PromptTemplate(
-    input_variables=["parsed_data", "selected_fields"],
+# 1. Context guidance: what a resume for this role / industry / level / tone
+#    needs. Shared by every CV with the same selected_fields (cached).
+context_template = PromptTemplate(
+    input_variables=["selected_fields"],
     template="""
-You are a **professional resume analyst and recruiter assistant**.  
-Your job is to carefully study the parsed resume (in JSON format) and the user's selected context — including *role, industry, experience level,* and *tone*.
+You are a **professional recruiter assistant**.
+Describe what a strong resume looks like for the user's selected context — *role, industry, experience level,* and *tone*.
 
-⚙️ Your responsibilities:
-- Identify **what's missing** from the resume for the given context.
-- Suggest **only relevant additions** (no unrelated domains).
-- Do **not** suggest generic "learn X" advice. Only content that can appear **in the resume**.
-- Be **role-specific**. Example:
-  - If the role = "Frontend Developer", do NOT suggest backend tools.
+⚙️ Be **role-specific**. Example:
+  - If the role = "Frontend Developer", do NOT include backend tools.
   - If the role = "Backend Developer", focus on APIs, databases, scalability, etc.
   - If the industry = "Healthcare", mention compliance, patient data handling, etc.
-  - If experience = "Entry Level", suggest academic/research projects, not management skills.
+  - If experience = "Entry Level", expect academic/research projects, not management skills.
   - If experience = "Senior Level", emphasize leadership and achievements.
 
 Return a **strict JSON object only** with:
 {{
-  "summary_improvement": "An improved or missing summary section (if applicable)",
-  "missing_sections": ["Projects", "Certifications", ...],
-  "missing_details": ["Add quantifiable achievements in your experience section", ...],
-  "suggested_additions": ["Add project on building dashboard using React + REST APIs", ...],
+  "expected_sections": ["Summary", "Experience", "Projects", ...],
+  "key_skills": ["Skills and tools recruiters look for in this context", ...],
+  "emphasis": ["What the experience and projects should highlight", ...],
+  "avoid": ["Unrelated domains or content to leave out", ...],
   "tone_recommendation": "Formal/Technical/etc — how the tone should appear for this role"
 }}
 
-Parsed CV (JSON):
-{parsed_data}
-
 User Context:
 {selected_fields}
 """
 )
 
+# 2. Per-CV suggestions, given the cached guidance
+template = PromptTemplate(
+    input_variables=["guidance", "json_structure", "parsed_data"],
+    template="""
+You are a **professional resume analyst and recruiter assistant**.
+Compare the parsed resume with the recruiter guidance for the user's context.
+
+⚙️ Your responsibilities:
+- Identify **what's missing** from the resume compared to the guidance.
+- Suggest **only relevant additions** (nothing from the guidance's "avoid" list).
+- Do **not** suggest generic "learn X" advice. Only content that can appear **in the resume**.
+
+Return a **strict JSON object only** with:
+{json_structure}
+
+Guidance:
+{guidance}
+
+Parsed CV (JSON, empty fields left out):
+{parsed_data}
+"""
+)
+
+# 3. Per-CV suggestions for several contexts in one call (/enrich/batch)
+batch_template = PromptTemplate(
+    input_variables=["contexts", "json_structure", "parsed_data"],
+    template="""
+You are a **professional resume analyst and recruiter assistant**.
+Compare the parsed resume with the recruiter guidance for **each** of the user's contexts below, separately.
+
+⚙️ Your responsibilities, for every context:
+- Identify **what's missing** from the resume compared to that context's guidance.
+- Suggest **only relevant additions** (nothing from its "avoid" list, nothing meant for another context).
+- Do **not** suggest generic "learn X" advice. Only content that can appear **in the resume**.
+
+Return a **strict JSON object only**, with one entry per context ID:
+{{
+  "<context ID>": {json_structure},
+  ...
+}}
+
+Contexts (ID: guidance):
+{contexts}
+
+Parsed CV (JSON, empty fields left out):
+{parsed_data}
+"""
+)
+
+# Answer fields of the per-CV prompt, key -> example value. tone_recommendation
+# comes from the guidance and is only asked here when the guidance lacks it.
+STRUCTURE = {
+    "summary_improvement": '"An improved or missing summary section (if applicable)"',
+    "missing_sections": '["Projects", "Certifications", ...]',
+    "missing_details": '["Add quantifiable achievements in your experience section", ...]',
+    "suggested_additions": '["Add project on building dashboard using React + REST APIs", ...]',
+    "tone_recommendation": '"Formal/Technical/etc — how the tone should appear for this role"',
+}
+
+# Shape of the answers asked for above, for validating them (services/validation.py)
+SCHEMA = {
+    "summary_improvement": "",
+    "missing_sections": [""],
+    "missing_details": [""],
+    "suggested_additions": [""],
+    "tone_recommendation": "",
+}
+CONTEXT_SCHEMA = {
+    "expected_sections": [""],
+    "key_skills": [""],
+    "emphasis": [""],
+    "avoid": [""],
+    "tone_recommendation": "",
+}
+REASK_TASK = "Suggest resume improvements for the parsed CV, following the guidance below."
+CONTEXT_REASK_TASK = "Describe what a strong resume looks like for the user context below."
+CONTEXT_VERSION = prompt_version(context_template)
+
+context_cache = TTLCache(ENRICH_CONTEXT_ITEMS, ENRICH_CONTEXT_TTL)
+_pending_contexts = {}  # context key -> task generating its guidance
+
+
+def json_structure(keys) -> str:
+    return "{\n" + ",\n".join(f'  "{key}": {STRUCTURE[key]}' for key in keys) + "\n}"
+
+
+# ----------------------------
+# COMPACT CV
+# ----------------------------
+# Contact details don't change the suggestions: the prompt only says which
+# ones the CV has. Bookkeeping keys from the parsers are dropped.
+CONTACT_KEYS = ("email", "phone", "github", "linkedin", "scholar", "location")
+DROPPED_KEYS = ("contact_confidence", "ai_enrichment", "incomplete_sections", "incomplete_fields", "link", "mail")
+
+
+def _prune(value):
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items() if key not in DROPPED_KEYS}
+        return {key: item for key, item in pruned.items() if item not in ("", None, [], {})}
+    if isinstance(value, list):
+        pruned = [_prune(item) for item in value]
+        return [item for item in pruned if item not in ("", None, [], {})]
+    if isinstance(value, str):
+        value = value.strip()
+        return value if len(value) <= MAX_CV_VALUE_CHARS else value[:MAX_CV_VALUE_CHARS] + "…"
+    return value
+
+
+def compact_cv(parsed_data: dict) -> str:
+    """The CV as one-line JSON: empty values, contact details and parser bookkeeping left out."""
+    contacts = [key for key in CONTACT_KEYS if parsed_data.get(key)]
+    cv = _prune({key: value for key, value in parsed_data.items() if key not in CONTACT_KEYS})
+    if contacts:
+        cv["contact_details"] = contacts
+    return json.dumps(cv, ensure_ascii=False, separators=(",", ":"))
+
+
 # ----------------------------
-# API Endpoint
+# CONTEXT GUIDANCE (cached)
+# ----------------------------
+def context_key(selected_fields: dict) -> str:
+    normalized = {str(key).strip().lower(): str(value).strip().lower() for key, value in selected_fields.items()}
+    return f"{MODEL_NAME}:{CONTEXT_VERSION}:{json.dumps(normalized, sort_keys=True)}"
+
+
+async def _generate_guidance(key: str, selected_fields: dict) -> dict:
+    context = json.dumps(selected_fields, ensure_ascii=False, separators=(",", ":"))
+    backends = track_backends()  # runs as its own task, so this doesn't touch the caller's set
+    with timed("llm"):
+        response = await invoke_llm(context_template | llm, {"selected_fields": context})
+    try:
+        guidance, _ = parse_llm_json(response.content)
+    except ValueError:
+        guidance = None
+    if not isinstance(guidance, dict):
+        guidance = {"error": "Model returned invalid JSON."}
+    guidance = await reask_fields(
+        llm, guidance, CONTEXT_SCHEMA, f"User Context:\n{context}", CONTEXT_REASK_TASK,
+        required=CONTEXT_SCHEMA, allow_empty=True,
+    )
+    if "error" in guidance:
+        # Suggestions can still be made without it; just don't keep it
+        print("⚠️ Enrich guidance failed for", context)
+        return {}
+    complete = "incomplete_fields" not in guidance
+    guidance = {key: guidance[key] for key in CONTEXT_SCHEMA if key in guidance}
+    if complete and answered_by_primary(backends):
+        context_cache.set(key, guidance)
+    return guidance
+
+
+async def get_guidance(selected_fields: dict) -> dict:
+    """
+    Guidance for a context from the cache, or from one LLM call. Concurrent
+    requests for the same uncached context share that call.
+    """
+    key = context_key(selected_fields)
+    guidance = context_cache.get(key)
+    if guidance is not None:
+        return guidance
+    task = _pending_contexts.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate_guidance(key, selected_fields))
+        _pending_contexts[key] = task
+        task.add_done_callback(lambda _: _pending_contexts.pop(key, None))
+    return await asyncio.shield(task)
+
+
+# ----------------------------
+# PER-CV SUGGESTIONS
+# ----------------------------
+def guidance_text(selected_fields: dict, guidance: dict) -> str:
+    """The guidance as the per-CV prompts show it (the context itself if its guidance failed)."""
+    tips = {key: value for key, value in guidance.items() if key != "tone_recommendation"}
+    return json.dumps(tips or selected_fields, ensure_ascii=False, separators=(",", ":"))
+
+
+def enrich_inputs(request: EnrichRequest, guidance: dict) -> dict:
+    keys = [key for key in STRUCTURE if key not in guidance]
+    return {
+        "guidance": guidance_text(request.selected_fields, guidance),
+        "json_structure": json_structure(keys),
+        "parsed_data": compact_cv(request.parsed_data),
+    }
+
+
+def parse_answer(content: str):
+    with timed("postprocess"):
+        try:
+            answer, repaired = parse_llm_json(content)
+        except ValueError:
+            answer, repaired = None, False
+        if not isinstance(answer, dict):
+            record_json_repair("failed")
+            return {"error": "Model returned invalid JSON."}
+        if repaired:
+            record_json_repair("repaired")
+    return answer
+
+
+async def check_suggestions(enriched: dict, guidance: dict, guidance_prompt: str, cv: str) -> dict:
+    """
+    Re-asks once for missing or malformed suggestion fields and adds the
+    context's tone. Raises a 500 if the suggestions are still unusable.
+    """
+    schema = {key: shape for key, shape in SCHEMA.items() if key not in guidance}
+    context = f"Guidance:\n{guidance_prompt}\n\nParsed CV (JSON):\n{cv}"
+    enriched = await reask_fields(llm, enriched, schema, context, REASK_TASK, required=schema, allow_empty=True)
+    if "error" in enriched:
+        raise HTTPException(status_code=500, detail="Model returned invalid JSON.")
+
+    # Same fields, in the same order, whether or not the tone came from the guidance
+    sources = {**enriched, **guidance}
+    return {key: sources[key] for key in SCHEMA if key in sources}
+
+
+async def finish_enrich(content: str, request: EnrichRequest, inputs: dict, guidance: dict) -> dict:
+    """
+    Parses the model's suggestions (re-asking once for missing or malformed
+    fields), adds the context's tone and merges them into the CV.
+    """
+    enriched = await check_suggestions(parse_answer(content), guidance, inputs["guidance"], inputs["parsed_data"])
+
+    # Merge intelligently
+    combined_data = {**request.parsed_data}
+
+    # If user already has similar keys, enrich rather than overwrite
+    combined_data["ai_enrichment"] = enriched
+
+    return {
+        "status": "success",
+        "combined_cv": combined_data,
+        "suggestions": enriched
+    }
+
+
+# ----------------------------
+# SEVERAL CONTEXTS PER CALL
+# ----------------------------
+def pack_contexts(contexts: list, base_tokens: int, budget: int) -> list:
+    """
+    Groups (context_id, guidance_prompt) pairs into calls: each call holds the
+    prompt and CV (`base_tokens`) once, plus each context's guidance and
+    answer, up to `budget` tokens. A call always gets at least one context.
+    """
+    groups, group, used = [], [], base_tokens
+    for context_id, prompt in contexts:
+        cost = estimate_tokens(prompt) + ENRICH_ANSWER_TOKENS
+        if group and used + cost > budget:
+            groups.append(group)
+            group, used = [], base_tokens
+        group.append((context_id, prompt))
+        used += cost
+    if group:
+        groups.append(group)
+    return groups
+
+
+async def enrich_group(group: list, guidances: dict, cv: str) -> dict:
+    """One LLM call for a group of contexts; returns {context_id: suggestions or HTTPException}."""
+    keys = [key for key in STRUCTURE if any(key not in guidances[context_id] for context_id, _ in group)]
+    inputs = {
+        "contexts": "\n".join(f"{context_id}: {prompt}" for context_id, prompt in group),
+        "json_structure": json_structure(keys).replace("\n", "\n  "),
+        "parsed_data": cv,
+    }
+    with timed("llm"):
+        response = await invoke_llm(batch_template | llm, inputs)
+    answer = parse_answer(response.content)
+
+    async def check(context_id: str, prompt: str):
+        enriched = answer.get(context_id)
+        if not isinstance(enriched, dict):
+            # Missing from the answer (or nothing parsed): the re-ask asks for all of it
+            enriched = {"error": "Model returned no suggestions for this context."}
+        try:
+            return await check_suggestions(enriched, guidances[context_id], prompt, cv)
+        except HTTPException as e:
+            return e
+
+    results = await asyncio.gather(*(check(context_id, prompt) for context_id, prompt in group))
+    return {context_id: result for (context_id, _), result in zip(group, results)}
+
+
+# ----------------------------
+# API Endpoints
 # ----------------------------
 @router.post("/enrich")
 async def enrich_cv(request: EnrichRequest):
     try:
+        guidance = await get_guidance(request.selected_fields)
         chain = template | llm
-        response = chain.invoke({
-            "parsed_data": json.dumps(request.parsed_data, indent=2),
-            "selected_fields": json.dumps(request.selected_fields, indent=2)
-        })
+        inputs = enrich_inputs(request, guidance)
+        with timed("llm"):
+            response = await invoke_llm(chain, inputs)
 
-        try:
-            enriched = json.loads(response.content)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=500, detail="Model returned invalid JSON.")
+        content = await finish_enrich(response.content, request, inputs, guidance)
+        return JSONResponse(content=content)
 
-        # Merge intelligently
-        combined_data = {**request.parsed_data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error enriching CV: {str(e)}")
+
+
+@router.post("/enrich/stream")
+async def enrich_cv_stream(request: EnrichRequest):
+    """
+    Streaming /enrich: server-sent events for each suggestion field as the
+    model writes it, then a `result` event with the same body as /enrich.
+    The tone recommendation comes from the context guidance, so it is sent first.
+    """
+    try:
+        guidance = await get_guidance(request.selected_fields)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error enriching CV: {str(e)}")
+    inputs = enrich_inputs(request, guidance)
+    initial = {key: guidance[key] for key in ("tone_recommendation",) if key in guidance}
+    events = stream_llm_events(
+        template | llm, inputs, lambda content: finish_enrich(content, request, inputs, guidance), initial=initial
+    )
+    return sse_response(events)
+
+
+@router.post("/enrich/batch")
+async def enrich_cv_batch(request: EnrichBatchRequest):
+    """
+    Suggestions for one CV against several contexts (roles, levels...).
+    The CV is sent once per LLM call, with as many contexts as fit in
+    ENRICH_BATCH_TOKENS; identical contexts are answered once. Each result
+    has the context, its status code and `suggestions` shaped as in /enrich
+    (or `error`), in request order.
+    """
+    if not request.selected_fields:
+        raise HTTPException(status_code=400, detail="No contexts in selected_fields.")
+    if len(request.selected_fields) > MAX_ENRICH_CONTEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many contexts ({len(request.selected_fields)}); the limit is {MAX_ENRICH_CONTEXTS}.",
+        )
 
-        # If user already has similar keys, enrich rather than overwrite
-        combined_data["ai_enrichment"] = enriched
+    try:
+        keys = [context_key(selected_fields) for selected_fields in request.selected_fields]
+        unique = {}  # context key -> (context ID, selected_fields), first occurrence wins
+        for key, selected_fields in zip(keys, request.selected_fields):
+            unique.setdefault(key, (f"C{len(unique) + 1}", selected_fields))
+
+        guidance_list = await asyncio.gather(*(get_guidance(fields) for _, fields in unique.values()))
+        guidances = {context_id: guidance for (context_id, _), guidance in zip(unique.values(), guidance_list)}
+        contexts = [
+            (context_id, guidance_text(fields, guidances[context_id])) for context_id, fields in unique.values()
+        ]
 
-        return JSONResponse(content={
-            "status": "success",
-            "combined_cv": combined_data,
-            "suggestions": enriched
-        })
+        cv = compact_cv(request.parsed_data)
+        base_tokens = estimate_tokens(batch_template.template) + estimate_tokens(cv)
+        answers = {}
+        for group_answers in await asyncio.gather(
+            *(enrich_group(group, guidances, cv) for group in pack_contexts(contexts, base_tokens, ENRICH_BATCH_TOKENS))
+        ):
+            answers.update(group_answers)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error enriching CV: {str(e)}")
+
+    results = []
+    for index, (key, selected_fields) in enumerate(zip(keys, request.selected_fields)):
+        answer = answers[unique[key][0]]
+        result = {"index": index, "selected_fields": selected_fields}
+        if isinstance(answer, HTTPException):
+            result.update(status_code=answer.status_code, error=answer.detail)
+        else:
+            result.update(status_code=200, suggestions=answer)
+        results.append(result)
+    return JSONResponse(content={"status": "success", "results": results})
@@ -0,0 +1,70 @@
+import asyncio
+from fastapi import APIRouter, UploadFile, File, Form, Query
+from fastapi.responses import JSONResponse
+from services.uploads import read_upload, upload_kind, UploadRejected, UNSUPPORTED_FILE_TYPE
+from services.jobs import job_store, JobWorkers, JOB_WORKERS
+from routers.parser import run_parse_pipeline
+from routers.employeeParser import run_employee_pipeline
+
+router = APIRouter()
+
+# ----------------------------
+# Job kinds -> existing pipelines
+# ----------------------------
+PIPELINES = {
+    "parse-resume": run_parse_pipeline,
+    "employee-parser": run_employee_pipeline,
+}
+
+job_workers = JobWorkers(job_store, PIPELINES, JOB_WORKERS)
+
+MAX_WAIT_SECONDS = 60
+
+
+def job_response(job: dict, status_code: int = 200):
+    return JSONResponse(content=job, status_code=status_code)
+
+
+# ----------------------------
+# API Endpoints
+# ----------------------------
+@router.post("/jobs")
+async def submit_job(file: UploadFile = File(...), kind: str = Form("parse-resume")):
+    """
+    Queues a CV for parsing and returns immediately with a job id.
+    `kind` is "parse-resume" (default) or "employee-parser".
+    """
+    if kind not in PIPELINES:
+        return JSONResponse(content={"error": f"Unknown job kind. Use one of: {', '.join(PIPELINES)}."}, status_code=400)
+
+    file_kind = upload_kind(file.filename)
+    if file_kind is None:
+        return JSONResponse(content={"error": UNSUPPORTED_FILE_TYPE}, status_code=400)
+
+    try:
+        file_bytes = await read_upload(file, file_kind)
+    except UploadRejected as e:
+        return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+
+    job_id = await asyncio.to_thread(job_store.submit, kind, file.filename, file_bytes)
+    return JSONResponse(
+        content={"id": job_id, "status": "queued", "kind": kind},
+        status_code=202,
+        headers={"Location": f"/jobs/{job_id}"},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS)):
+    """
+    Returns the job's status and, once finished, its result. With `wait`,
+    long-polls for up to that many seconds for the job to finish.
+    """
+    if wait:
+        job = await job_workers.wait_for(job_id, wait)
+    else:
+        job = await asyncio.to_thread(job_store.get, job_id)
+
+    if job is None:
+        return JSONResponse(content={"error": "Job not found."}, status_code=404)
+    return job_response(job)
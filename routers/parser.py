@@ -1,15 +1,25 @@
 import os
-import json
-import re
-from fastapi import APIRouter, UploadFile, File
+from contextlib import nullcontext
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Query
 from fastapi.responses import JSONResponse
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
-from docx import Document
-import pytesseract
+from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
+from services.extraction import extractor_for
+from services.llm import invoke_llm, INTERACTIVE
+from services.routing import get_routed_llm, track_backends, answered_by_primary
+from services.cache import ResultCache, result_cache, prompt_version, cache_headers
+from services.uploads import read_upload, upload_kind, UploadRejected, UNSUPPORTED_FILE_TYPE
+from services.batch import expand_batch, ndjson_batch_response
+from services.compression import compress_resume_text, COMPRESSION_VERSION
+from services.docx_text import DOCX_TEXT_VERSION
+from services.contacts import (
+    extract_contact_fields, confident_fields, merge_contact_fields, RULES as CONTACT_RULES, CONTACT_RULES_VERSION,
+)
+from services.streaming import stream_llm_events, sse_response, sse_event
+from services.json_repair import clean_json_output
+from services.validation import reask_fields, present_fields
+from services.metrics import run_extraction, timed, record_cache_lookup, record_prompt_compression
 
 # ----------------------------
 # Load environment variables
@@ -18,60 +28,19 @@ load_dotenv()
 
 router = APIRouter()
 
-# ----------------------------
-# Initialize LLM
-# ----------------------------
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
-
-# ----------------------------
-# PDF TEXT EXTRACTION (with OCR fallback)
-# ----------------------------
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    try:
-        reader = PdfReader(file_path)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
-    except Exception:
-        pass
-
-    if not text.strip():
-        try:
-            images = convert_from_path(file_path)
-            ocr_text = "\n".join(pytesseract.image_to_string(img) for img in images)
-            text += ocr_text
-        except Exception as e:
-            print("OCR failed:", e)
-    return text.strip()
-
-# ----------------------------
-# DOCX TEXT EXTRACTION
-# ----------------------------
-def extract_text_from_docx(file_path: str) -> str:
-    try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
-    except Exception as e:
-        print("DOCX extraction failed:", e)
-        return ""
+# Extraction stops once it has MAX_RESUME_CHARS of raw text; compression then
+# fits the cleaned text into MAX_PROMPT_TOKENS for the LLM
+MAX_RESUME_CHARS = 10000
+MAX_PROMPT_TOKENS = 1500
+# The rule-based contact mode only needs the top of the resume
+MAX_CONTACT_CHARS = 3000
 
 # ----------------------------
-# CLEAN JSON OUTPUT
+# Initialize LLM
 # ----------------------------
-def clean_json_output(text: str):
-    text = text.replace("```json", "").replace("```", "").strip()
-    text = re.sub(r'^[^{]*', '', text)
-    text = re.sub(r'[^}]*$', '', text)
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON output from LLM", "raw_output": text}
+MODEL_NAME = "llama-3.1-8b-instant"
+# Groq, with failover / hedging to a local model per services/routing.py
+llm = get_routed_llm("parse-resume", MODEL_NAME, temperature=0)
 
 # ----------------------------
 # NORMALIZE RESUME DATA
@@ -148,24 +117,54 @@ def normalize_resume(data: dict):
 # ----------------------------
 # PROMPT TEMPLATE
 # ----------------------------
+# Fields asked from the LLM, in prompt order, with the shape of their value
+# ("" string, [""] list of strings, [{...}] list of objects). The prompt's
+# field list and the answer's validation (services/validation.py) both come
+# from it. Contact fields the rules in services/contacts.py already found
+# with high confidence are left out.
+SCHEMA = {
+    "name": "",
+    "email": "",
+    "phone": "",
+    "skills": [""],
+    "summary": "",
+    "education": [{"degree": "", "institution": "", "year": ""}],
+    "experience": [{"role": "", "company": "", "years": ""}],
+    "projects": [{"name": "", "domain": "", "description": "", "link": ""}],
+    "certifications": [{"name": ""}],
+    "location": "",
+    "github": "",
+    "linkedin": "",
+    "title": "",
+}
+PROMPT_FIELDS = {
+    field: f"{field} ({', '.join(shape[0])})" if shape and isinstance(shape[0], dict) else field
+    for field, shape in SCHEMA.items()
+}
+CONTACT_FIELDS = tuple(field for field in PROMPT_FIELDS if field in CONTACT_RULES)
+# Resume sections (services/sections.py) each field is read from; a missing or
+# empty field is only re-asked when its section exists. Others come from the header.
+FIELD_SECTIONS = {
+    "skills": ("skills",),
+    "summary": ("summary",),
+    "education": ("education",),
+    "experience": ("experience",),
+    "projects": ("projects",),
+    "certifications": ("certifications",),
+}
+REASK_TASK = "Extract these fields from the resume text below."
+
+
+def field_list(skip=()) -> str:
+    return "\n".join(f"- {description}" for field, description in PROMPT_FIELDS.items() if field not in skip)
+
+
 template = PromptTemplate(
-    input_variables=["resume_text"],
+    input_variables=["field_list", "resume_text"],
     template="""
 Extract the following structured information from the resume below:
 
-- name
-- email
-- phone
-- skills
-- summary
-- education (degree, institution, year)
-- experience (role, company, years)
-- projects (name, domain, description, link)
-- certifications (name)
-- location
-- github
-- linkedin
-- title
+{field_list}
 
 Return ONLY valid JSON format (no explanations, no extra text).
 
@@ -173,37 +172,189 @@ Resume Text:
 {resume_text}
 """
 )
+TEMPLATE_VERSION = (
+    f"{prompt_version(template, field_list())}-c{COMPRESSION_VERSION}-{MAX_PROMPT_TOKENS}-r{CONTACT_RULES_VERSION}-d{DOCX_TEXT_VERSION}"
+)
 
 # ----------------------------
-# PARSING ENDPOINT
+# PARSING PIPELINE
 # ----------------------------
-@router.post("/parse-resume")
-async def parse_resume(file: UploadFile = File(...)):
-    try:
-        if not (file.filename.lower().endswith(".pdf") or file.filename.lower().endswith(".docx")):
-            return JSONResponse(content={"error": "Unsupported file type. Please upload PDF or DOCX only."}, status_code=400)
+async def prepare_parse(filename: str, file_bytes: bytes):
+    """
+    Everything before the LLM call: cache lookup, extraction, contact rules
+    and compression. Returns (early, request): `early` is the final
+    (content, status_code, cache_tier) when no LLM call is needed (cache hit,
+    no text), otherwise None and `request` holds the prompt inputs.
+    """
+    # Same file + same prompt + same model -> skip extraction and LLM entirely
+    cache_key = ResultCache.make_key(file_bytes, "parse-resume", TEMPLATE_VERSION, MODEL_NAME)
+    cached, tier = await result_cache.aget(cache_key)
+    record_cache_lookup(tier)
+    if cached is not None:
+        return (cached, 200, tier), None
 
-        temp_path = f"temp_{file.filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
+    # Extraction reads straight from the uploaded bytes (no temp files)
+    resume_text = await run_extraction(extractor_for(filename), file_bytes, MAX_RESUME_CHARS)
 
-        if file.filename.lower().endswith(".pdf"):
-            resume_text = extract_text_from_pdf(temp_path)
-        else:
-            resume_text = extract_text_from_docx(temp_path)
+    if not resume_text.strip():
+        return ({"error": "No readable text found. Try uploading a text-based resume."}, 400, None), None
 
-        os.remove(temp_path)
+    with timed("extract"):
+        # Contact fields the rules are sure about are not asked from the LLM
+        contacts = extract_contact_fields(resume_text, CONTACT_FIELDS)
+        # Drop layout noise and fit each section into the prompt's token budget
+        resume_text, compression = compress_resume_text(resume_text, MAX_PROMPT_TOKENS)
+    record_prompt_compression(compression)
 
-        if not resume_text.strip():
-            return JSONResponse(content={"error": "No readable text found. Try uploading a text-based resume."}, status_code=400)
+    inputs = {"field_list": field_list(confident_fields(contacts)), "resume_text": resume_text}
+    return None, {"cache_key": cache_key, "contacts": contacts, "inputs": inputs, "backends": track_backends()}
 
-        resume_text = resume_text[:6000]  # limit for LLM
-        chain = template | llm
-        structured_response = chain.invoke({"resume_text": resume_text}).content
+
+async def finish_parse(structured_response: str, request: dict, priority: int = INTERACTIVE) -> dict:
+    """
+    JSON cleanup of the LLM's answer, a re-ask for fields that are missing or
+    malformed, then contact merge and normalization; caches good results.
+    """
+    with timed("postprocess"):
         raw_data = clean_json_output(structured_response)
+        resume_text = request["inputs"]["resume_text"]
+        required = present_fields(resume_text, FIELD_SECTIONS)
+
+    raw_data = await reask_fields(
+        llm, raw_data, SCHEMA, resume_text, REASK_TASK,
+        FIELD_SECTIONS, required, skip=confident_fields(request["contacts"]), priority=priority,
+    )
+
+    with timed("postprocess"):
+        if "error" not in raw_data:
+            merge_contact_fields(raw_data, request["contacts"])
         structured_data = normalize_resume(raw_data)
 
-        return JSONResponse(content=structured_data)
+        # Incomplete answers and answers from the fallback backend are served, not cached
+        complete = "error" not in raw_data and "incomplete_fields" not in raw_data
+        if complete and answered_by_primary(request["backends"]):
+            await result_cache.aset(request["cache_key"], structured_data)
+    return structured_data
+
+
+async def run_parse_pipeline(filename: str, file_bytes: bytes, llm_slot=None, priority: int = INTERACTIVE):
+    """
+    Cache lookup -> extraction -> LLM -> JSON cleanup for one upload that has
+    already been read and validated. Shared by the single and batch endpoints.
+    Returns (content, status_code, cache_tier).
+    """
+    early, request = await prepare_parse(filename, file_bytes)
+    if early is not None:
+        return early
+
+    chain = template | llm
+    with timed("llm"):
+        async with llm_slot or nullcontext():
+            structured_response = (await invoke_llm(chain, request["inputs"], priority)).content
+    structured_data = await finish_parse(structured_response, request, priority)
+    return structured_data, 200, None
+
+
+async def run_contact_pipeline(filename: str, file_bytes: bytes, llm_slot=None, priority: int = INTERACTIVE):
+    """
+    Rule-based "no-LLM" parse: contact fields only (with confidences), read
+    from the top of the resume. Same signature and return value as
+    run_parse_pipeline, so both endpoints can use either.
+    """
+    cache_key = ResultCache.make_key(file_bytes, "parse-resume-contact", f"{CONTACT_RULES_VERSION}-d{DOCX_TEXT_VERSION}", "rules")
+    cached, tier = await result_cache.aget(cache_key)
+    record_cache_lookup(tier)
+    if cached is not None:
+        return cached, 200, tier
+
+    resume_text = await run_extraction(extractor_for(filename), file_bytes, MAX_CONTACT_CHARS)
+
+    if not resume_text.strip():
+        return {"error": "No readable text found. Try uploading a text-based resume."}, 400, None
+
+    with timed("postprocess"):
+        data = merge_contact_fields({}, extract_contact_fields(resume_text, tuple(CONTACT_RULES)))
+        for field in CONTACT_RULES:
+            data.setdefault(field, "")
+
+    await result_cache.aset(cache_key, data)
+    return data, 200, None
+
+
+PIPELINES = {"full": run_parse_pipeline, "contact": run_contact_pipeline}
+
+
+# ----------------------------
+# PARSING ENDPOINTS
+# ----------------------------
+@router.post("/parse-resume")
+async def parse_resume(file: UploadFile = File(...), mode: str = Query("full", pattern="^(full|contact)$")):
+    """`mode=contact` skips the LLM and returns only rule-extracted contact fields."""
+    try:
+        kind = upload_kind(file.filename)
+        if kind is None:
+            return JSONResponse(content={"error": UNSUPPORTED_FILE_TYPE}, status_code=400)
+
+        # Stream the upload in chunks: wrong magic bytes -> 415, over size/page limits -> 413
+        try:
+            file_bytes = await read_upload(file, kind)
+        except UploadRejected as e:
+            return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+
+        content, status_code, tier = await PIPELINES[mode](file.filename, file_bytes)
+        headers = cache_headers(tier) if status_code == 200 else None
+        return JSONResponse(content=content, status_code=status_code, headers=headers)
 
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.post("/parse-resume/stream")
+async def parse_resume_stream(file: UploadFile = File(...)):
+    """
+    Streaming /parse-resume: server-sent events for each field (and each
+    array entry) as the model writes it, then a `result` event with the same
+    body as /parse-resume. Upload and extraction errors are plain JSON errors.
+    """
+    try:
+        kind = upload_kind(file.filename)
+        if kind is None:
+            return JSONResponse(content={"error": UNSUPPORTED_FILE_TYPE}, status_code=400)
+
+        try:
+            file_bytes = await read_upload(file, kind)
+        except UploadRejected as e:
+            return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+
+        early, request = await prepare_parse(file.filename, file_bytes)
+        if early is not None:
+            content, status_code, tier = early
+            if status_code != 200:
+                return JSONResponse(content=content, status_code=status_code)
+            return sse_response(iter([sse_event("result", content)]), headers=cache_headers(tier))
+
+        events = stream_llm_events(
+            template | llm,
+            request["inputs"],
+            lambda text: finish_parse(text, request),
+            initial=confident_fields(request["contacts"]),
+        )
+        return sse_response(events, headers=cache_headers(None))
+
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.post("/parse-resume/batch")
+async def parse_resume_batch(
+    files: List[UploadFile] = File(...), mode: str = Query("full", pattern="^(full|contact)$")
+):
+    """
+    Parses many PDF/DOCX files (or ZIP archives of them) in one request.
+    Streams one NDJSON line per file, in completion order.
+    """
+    try:
+        items = await expand_batch(files)
+    except UploadRejected as e:
+        return JSONResponse(content={"error": e.message}, status_code=e.status_code)
+    return ndjson_batch_response(items, PIPELINES[mode])
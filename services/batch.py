@@ -0,0 +1,141 @@
+import os
+import json
+import asyncio
+import zipfile
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+from services.llm import BATCH
+from services.uploads import (
+    MAX_UPLOAD_BYTES,
+    UploadRejected,
+    read_upload,
+    check_upload_bytes,
+    matches_magic,
+    format_size,
+    upload_kind,
+    UNSUPPORTED_FILE_TYPE,
+)
+
+load_dotenv()
+
+# ----------------------------
+# Batch limits (override via .env)
+# ----------------------------
+# BATCH_FILE_CONCURRENCY: files of one batch in flight at once (bounds memory;
+#                         extraction itself is capped by EXTRACTION_WORKERS)
+# BATCH_LLM_CONCURRENCY:  LLM calls in flight for one batch
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "500"))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(200 * 1024 * 1024)))
+BATCH_FILE_CONCURRENCY = int(os.getenv("BATCH_FILE_CONCURRENCY", "8"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+def _rejected(status_code: int, message: str):
+    async def load():
+        raise UploadRejected(status_code, message)
+    return load
+
+
+def _upload_loader(file, kind: str):
+    async def load():
+        return await read_upload(file, kind)
+    return load
+
+
+def _zip_entry_loader(archive: zipfile.ZipFile, info: zipfile.ZipInfo, kind: str):
+    async def load():
+        # Declared size is checked before anything is decompressed
+        if info.file_size > MAX_UPLOAD_BYTES:
+            raise UploadRejected(413, f"File too large. Maximum size is {format_size(MAX_UPLOAD_BYTES)}.")
+        return check_upload_bytes(archive.read(info), kind)
+    return load
+
+
+# ----------------------------
+# INPUT EXPANSION
+# ----------------------------
+async def expand_batch(files) -> list:
+    """
+    Turns the uploaded files (PDF, DOCX, images or ZIP archives of those)
+    into a flat list of (filename, loader) pairs. Loaders read lazily, so
+    only the files currently being processed are held in memory.
+    """
+    items = []
+    for file in files:
+        name = file.filename or "upload"
+        if name.lower().endswith(".zip"):
+            head = await file.read(4)
+            await file.seek(0)
+            if not matches_magic(head, "zip"):
+                items.append((name, _rejected(415, "File content is not a valid ZIP archive.")))
+                continue
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                items.append((name, _rejected(415, "File content is not a valid ZIP archive.")))
+                continue
+            for info in archive.infolist():
+                entry_name = info.filename
+                if info.is_dir() or entry_name.startswith("__MACOSX/") or os.path.basename(entry_name).startswith("."):
+                    continue
+                kind = upload_kind(entry_name)
+                if kind is None:
+                    items.append((f"{name}/{entry_name}", _rejected(400, UNSUPPORTED_FILE_TYPE)))
+                else:
+                    items.append((f"{name}/{entry_name}", _zip_entry_loader(archive, info, kind)))
+        else:
+            kind = upload_kind(name)
+            if kind is None:
+                items.append((name, _rejected(400, UNSUPPORTED_FILE_TYPE)))
+            else:
+                items.append((name, _upload_loader(file, kind)))
+
+    if len(items) > MAX_BATCH_FILES:
+        raise UploadRejected(413, f"Too many files. Maximum is {MAX_BATCH_FILES} per batch.")
+    return items
+
+
+# ----------------------------
+# NDJSON STREAMING
+# ----------------------------
+async def run_batch(items: list, pipeline):
+    """
+    Runs `pipeline(filename, file_bytes, llm_slot, priority)` for every item
+    with bounded fan-out and yields one NDJSON line per file as soon as it
+    finishes. LLM calls go out at batch priority, behind interactive parses.
+    Each line's "result" is exactly what the single-file endpoint returns.
+    """
+    file_slots = asyncio.Semaphore(BATCH_FILE_CONCURRENCY)
+    llm_slot = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+
+    async def run_one(index: int, filename: str, load):
+        async with file_slots:
+            try:
+                file_bytes = await load()
+                content, status_code, tier = await pipeline(filename, file_bytes, llm_slot, BATCH)
+            except UploadRejected as e:
+                content, status_code, tier = {"error": e.message}, e.status_code, None
+            except Exception as e:
+                print("❌ Batch item failed:", filename, e)
+                content, status_code, tier = {"error": str(e)}, 500, None
+
+        line = {
+            "index": index,
+            "filename": filename,
+            "status_code": status_code,
+            "cached": tier is not None,
+            "result": content,
+        }
+        return json.dumps(line, ensure_ascii=False) + "\n"
+
+    tasks = [asyncio.create_task(run_one(i, name, load)) for i, (name, load) in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away (or we're done): don't leave work running
+        for task in tasks:
+            task.cancel()
+
+
+def ndjson_batch_response(items: list, pipeline) -> StreamingResponse:
+    return StreamingResponse(run_batch(items, pipeline), media_type="application/x-ndjson")
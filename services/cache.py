@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------
+# Cache settings (override via .env)
+# ----------------------------
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", os.path.join(".cache", "results.sqlite3"))
+RESULT_CACHE_MEMORY_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "256"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+
+
+def prompt_version(template, *parts: str) -> str:
+    """
+    Short fingerprint of a PromptTemplate (plus any text filled into it, such
+    as a field list), so editing a prompt invalidates old entries.
+    """
+    return hashlib.sha256("\n".join((template.template,) + parts).encode("utf-8")).hexdigest()[:12]
+
+
+class ResultCache:
+    """
+    Two-tier, content-addressed cache for parse results.
+
+    - Tier 1: in-process LRU of serialized JSON (fast, per worker)
+    - Tier 2: SQLite file shared by all workers, evicted by total size
+      (least recently used entries go first)
+
+    Request handlers use aget()/aset(): a memory hit is answered on the event
+    loop, SQLite reads and writes run in a thread (a busy database can block
+    for up to the SQLite timeout). get()/set() are the blocking equivalents.
+    """
+
+    def __init__(self, db_path: str, memory_items: int, max_bytes: int, enabled: bool = True):
+        self.enabled = enabled
+        self.db_path = db_path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # SQLite tier, held across slow database calls
+        self._db = None
+        self.stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0}
+
+    # ----------------------------
+    # KEYS
+    # ----------------------------
+    @staticmethod
+    def make_key(data: bytes, route: str, template_version: str, model: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{route}:{model}:{template_version}:{digest}"
+
+    # ----------------------------
+    # STORAGE
+    # ----------------------------
+    def _connect(self):
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, payload: str):
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        while total > self.max_bytes:
+            row = db.execute("SELECT key, size FROM results ORDER BY accessed LIMIT 1").fetchone()
+            if row is None:
+                break
+            db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+            with self._lock:
+                self._memory.pop(row[0], None)
+                self.stats["evictions"] += 1
+            total -= row[1]
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is None:
+                return None
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["memory_hits"] += 1
+        return json.loads(payload), "memory"
+
+    def _get_disk(self, key: str):
+        with self._db_lock:
+            try:
+                db = self._connect()
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+            except sqlite3.Error as e:
+                print("⚠️ Result cache read failed:", e)
+                row = None
+
+        if row is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None, None
+
+        self._remember(key, row[0])
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+        return json.loads(row[0]), "disk"
+
+    def _put_disk(self, key: str, payload: str):
+        with self._db_lock:
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, payload, len(payload.encode("utf-8")), time.time()),
+                )
+                self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                print("⚠️ Result cache write failed:", e)
+
+    # ----------------------------
+    # PUBLIC API
+    # ----------------------------
+    def get(self, key: str):
+        """Returns (value, tier) on a hit, (None, None) on a miss."""
+        if not self.enabled:
+            return None, None
+        return self._get_memory(key) or self._get_disk(key)
+
+    def set(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        self._remember(key, payload)
+        self._put_disk(key, payload)
+
+    async def aget(self, key: str):
+        """get() without blocking the event loop on the SQLite tier."""
+        if not self.enabled:
+            return None, None
+        return self._get_memory(key) or await asyncio.to_thread(self._get_disk, key)
+
+    async def aset(self, key: str, value: dict):
+        """set() without blocking the event loop on the SQLite tier."""
+        if not self.enabled:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        self._remember(key, payload)
+        await asyncio.to_thread(self._put_disk, key, payload)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "memory_items": len(self._memory)}
+
+
+class TTLCache:
+    """
+    In-process LRU with a time-to-live, for small values derived from a
+    request's parameters rather than from an upload (e.g. /enrich's
+    per-context guidance). Expired entries are dropped when read.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: float, enabled: bool = True):
+        self.enabled = enabled
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._items[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: str, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "items": len(self._items)}
+
+
+# Shared by /parse-resume and /employee-parser
+result_cache = ResultCache(
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_MEMORY_ITEMS,
+    RESULT_CACHE_MAX_BYTES,
+    enabled=RESULT_CACHE_ENABLED,
+)
+
+
+def cache_headers(tier) -> dict:
+    """Response headers telling the client whether the result came from cache."""
+    if tier is None:
+        return {"X-Cache": "MISS"}
+    return {"X-Cache": "HIT", "X-Cache-Tier": tier}
@@ -0,0 +1,99 @@
+import re
+from services.llm import estimate_tokens
+from services.sections import SectionIndex
+
+# ----------------------------
+# MAP-REDUCE CHUNKING
+# ----------------------------
+# Long documents are split by section into groups (e.g. all publication
+# sections together), and each group into token windows that overlap by a few
+# lines. Every chunk gets its own LLM call; the JSON results are merged back
+# in chunk order, so the merge is deterministic, and list items that appear
+# in more than one chunk (the overlap) are kept once.
+CHUNK_OVERLAP_LINES = 2  # lines repeated at the start of the next window of a group
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def plan_chunks(text: str, section_groups: dict, max_tokens: int, default_group: str) -> list:
+    """
+    Splits `text` into [(group, chunk_text)]. `section_groups` maps section
+    names of services.sections to a group; other sections (and the text
+    before the first heading) go to `default_group`. Groups come in order of
+    first appearance; windows after the first repeat the section heading.
+    """
+    grouped = {}  # group -> [(heading, line)]
+    for section, segment in SectionIndex(text).segments():
+        lines = [line.strip() for line in segment.splitlines() if line.strip()]
+        heading = lines[0][:80] if section is not None else None
+        group = section_groups.get(section, default_group)
+        grouped.setdefault(group, []).extend((heading, line) for line in lines)
+
+    return [(group, window) for group, lines in grouped.items() for window in _windows(lines, max_tokens)]
+
+
+def _windows(lines: list, max_tokens: int) -> list:
+    windows = []
+    current = []
+    used = 0
+    for item in lines:
+        tokens = estimate_tokens(item[1]) + 1
+        if current and used + tokens > max_tokens:
+            windows.append(current)
+            current = current[-CHUNK_OVERLAP_LINES:] if CHUNK_OVERLAP_LINES else []
+            used = sum(estimate_tokens(line) + 1 for _, line in current)
+        current.append(item)
+        used += tokens
+    if current:
+        windows.append(current)
+    return [_window_text(window) for window in windows]
+
+
+def _window_text(window: list) -> str:
+    heading, first = window[0]
+    lines = [line for _, line in window]
+    if heading is not None and not first.startswith(heading):
+        lines.insert(0, f"{heading} (continued)")
+    return "\n".join(lines)
+
+
+def _normalize(value) -> str:
+    return _NON_ALNUM.sub("", str(value).lower())
+
+
+def _identity(item, fields: tuple) -> str:
+    """Dedupe key of a list item: its `fields` if set, else all its values."""
+    if isinstance(item, dict):
+        if fields:
+            key = "|".join(_normalize(item.get(field, "")) for field in fields)
+            if key.strip("|"):
+                return key
+        return _normalize(" ".join(str(item[key]) for key in sorted(item)))
+    return _normalize(item)
+
+
+def merge_chunk_results(results: list, dedupe_by: dict = None) -> dict:
+    """
+    Reduces per-chunk JSON objects into one: lists are concatenated in chunk
+    order without duplicates (compared on `dedupe_by[key]` fields, or the whole
+    item) and without empty placeholder items; scalars keep the first
+    non-empty value.
+    """
+    dedupe_by = dedupe_by or {}
+    merged = {}
+    seen = {}
+    for result in results:
+        for key, value in result.items():
+            if isinstance(value, list):
+                if not isinstance(merged.get(key), list):
+                    merged[key] = []
+                identities = seen.setdefault(key, set())
+                for item in value:
+                    identity = _identity(item, dedupe_by.get(key, ()))
+                    if not identity or identity in identities:
+                        continue
+                    identities.add(identity)
+                    merged[key].append(item)
+            elif key not in merged or (value not in ("", None) and merged[key] in ("", None)):
+                merged[key] = value
+    return merged
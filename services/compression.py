@@ -0,0 +1,166 @@
+import re
+from collections import Counter
+from services.extraction import PAGE_BREAK
+from services.llm import estimate_tokens
+from services.sections import heading_of
+
+# ----------------------------
+# PROMPT COMPRESSION
+# ----------------------------
+# Runs between extraction and the prompt. Cleans the text line by line
+# (whitespace, bullet glyphs, page numbers, running headers/footers,
+# duplicate lines), then fits it into a token budget section by section,
+# so one long section (e.g. publications) can't push the others out of the
+# prompt the way a blind `text[:N]` cut does.
+COMPRESSION_VERSION = "3"   # bump when the output changes, so cached parses are redone
+HEADER_FOOTER_LINES = 2     # lines at the top/bottom of a page checked for running headers/footers
+DEDUPE_MIN_CHARS = 40       # non-adjacent duplicates are only dropped for lines at least this long
+
+_BULLET_START = re.compile(r"^\s*[•●▪◦■□➢►▶✓✔❖◆○·*\-–—]+\s*(?=\S)")
+_BULLET_INLINE = re.compile(r"\s*[•●▪◦■➢►▶❖◆]\s*")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_PAGE_NUMBER = re.compile(r"^(?:page\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|[-–]\s*\d{1,4}\s*[-–])$", re.IGNORECASE)
+# Only removed at a page edge: elsewhere these are dates ("09/2019", "2015 / 2019", a year)
+_PAGE_FRACTION = re.compile(r"^(\d{1,3})\s*(?:of|/)\s*(\d{1,3})$", re.IGNORECASE)
+_BARE_NUMBER = re.compile(r"^\d{1,3}$")
+_DIGITS = re.compile(r"\d+")
+
+def _clean_line(line: str) -> str:
+    line = _BULLET_START.sub("- ", line)
+    line = _BULLET_INLINE.sub(", ", line)
+    return _SPACES.sub(" ", line).strip()
+
+
+def _edge_key(line: str) -> str:
+    return _DIGITS.sub("#", line.lower())
+
+
+def _is_edge_page_number(line: str) -> bool:
+    """A bare "3", "3/12" or "3 of 12" (page n of m, so n <= m) on a page's first/last lines."""
+    if _BARE_NUMBER.match(line):
+        return True
+    fraction = _PAGE_FRACTION.match(line)
+    return bool(fraction) and 0 < int(fraction.group(1)) <= int(fraction.group(2))
+
+
+def _clean_pages(text: str) -> list:
+    """Returns the cleaned lines of the whole document, without per-page noise."""
+    pages = [[_clean_line(line) for line in page.splitlines()] for page in text.split(PAGE_BREAK)]
+    pages = [[line for line in page if line] for page in pages]
+
+    # Running headers/footers: the same edge line (ignoring digits) on most pages
+    edge_counts = Counter()
+    for page in pages:
+        edges = page[:HEADER_FOOTER_LINES] + page[-HEADER_FOOTER_LINES:]
+        edge_counts.update({_edge_key(line) for line in edges})
+    min_pages = max(2, (len(pages) + 1) // 2)
+    running = {key for key, count in edge_counts.items() if count >= min_pages} if len(pages) > 1 else set()
+
+    lines = []
+    seen_running = set()
+    for page in pages:
+        last = len(page) - 1
+        for i, line in enumerate(page):
+            at_edge = i < HEADER_FOOTER_LINES or i > last - HEADER_FOOTER_LINES
+            if _PAGE_NUMBER.match(line) or (at_edge and _is_edge_page_number(line)):
+                continue
+            if at_edge and _edge_key(line) in running:
+                # Keep the first copy: a running header is often the candidate's name
+                if _edge_key(line) in seen_running:
+                    continue
+                seen_running.add(_edge_key(line))
+            lines.append(line)
+    return lines
+
+
+def _dedupe(lines: list) -> list:
+    out = []
+    seen = set()
+    for line in lines:
+        if out and line == out[-1]:
+            continue
+        if len(line) >= DEDUPE_MIN_CHARS:
+            if line in seen:
+                continue
+            seen.add(line)
+        out.append(line)
+    return out
+
+
+def _split_sections(lines: list) -> list:
+    """Groups lines into sections; the part before the first heading (contact details) is its own section."""
+    sections = [[]]
+    for line in lines:
+        if heading_of(line) is not None and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return [section for section in sections if section]
+
+
+def allocate_budget(sizes: list, budget: int) -> list:
+    """
+    Water-filling split of `budget` tokens: sections smaller than an even
+    share keep everything, and what they leave over is shared by the rest.
+    """
+    allocation = [0] * len(sizes)
+    pending = list(range(len(sizes)))
+    remaining = budget
+    while pending:
+        share = remaining // len(pending)
+        fits = [i for i in pending if sizes[i] <= share]
+        if not fits:
+            for i in pending:
+                allocation[i] = share
+            break
+        for i in fits:
+            allocation[i] = sizes[i]
+            remaining -= sizes[i]
+        pending = [i for i in pending if sizes[i] > share]
+    return allocation
+
+
+def _truncate_section(lines: list, line_tokens: list, budget: int) -> list:
+    kept = []
+    used = 0
+    for line, tokens in zip(lines, line_tokens):
+        if used + tokens <= budget:
+            kept.append(line)
+            used += tokens
+            continue
+        left = budget - used
+        if left >= 8:
+            # Cut the line proportionally rather than dropping it
+            kept.append(line[: max(1, len(line) * left // tokens)].rstrip() + " …")
+        break
+    return kept
+
+
+def compress_resume_text(text: str, max_tokens: int):
+    """
+    Cleans extracted resume text and fits it into `max_tokens` (estimated
+    with services.llm.estimate_tokens). Returns (compressed_text, stats) where
+    stats reports the token counts before and after.
+    """
+    tokens_before = estimate_tokens(text)
+    sections = _split_sections(_dedupe(_clean_pages(text)))
+
+    line_tokens = [[estimate_tokens(line) + 1 for line in section] for section in sections]
+    sizes = [sum(tokens) for tokens in line_tokens]
+    truncated = 0
+    if sum(sizes) > max_tokens:
+        allocation = allocate_budget(sizes, max_tokens)
+        for i, budget in enumerate(allocation):
+            if budget < sizes[i]:
+                sections[i] = _truncate_section(sections[i], line_tokens[i], budget)
+                truncated += 1
+
+    compressed = "\n".join(line for section in sections for line in section)
+    tokens_after = estimate_tokens(compressed)
+    stats = {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(tokens_before - tokens_after, 0),
+        "sections": len(sections),
+        "sections_truncated": truncated,
+    }
+    return compressed, stats
@@ -0,0 +1,43 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------
+# Concurrency limits (override via .env)
+# ----------------------------
+# EXTRACTION_WORKERS: processes used for PyPDF2 / OCR / DOCX work
+# (LLM call limits live in services/llm.py)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+
+_process_pool = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Returns the shared extraction pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+# ----------------------------
+# OFF-LOOP HELPERS
+# ----------------------------
+async def run_in_process(func, *args):
+    """
+    Runs a blocking, CPU-bound function (text extraction, OCR) in the
+    extraction process pool so the event loop keeps serving other requests.
+    `func` and its arguments must be picklable (module-level functions).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
@@ -0,0 +1,177 @@
+import os
+import re
+from dotenv import load_dotenv
+from services.sections import SectionIndex, heading_of
+
+load_dotenv()
+
+# ----------------------------
+# RULE-BASED CONTACT FIELDS
+# ----------------------------
+# Contact details have exact shapes, so regexes find them in microseconds.
+# Each field comes back with a confidence; fields at or above
+# CONTACT_MIN_CONFIDENCE are filled by the rules and left out of the LLM
+# prompt, the rest are still asked from the LLM (the rule value is kept as a
+# fallback if the LLM leaves them empty).
+#
+# Email and phone are looked for in the header block (the text before the
+# first section heading) first; one found further down is only a fallback,
+# and nothing is taken from the references section, whose contact details
+# belong to the referees.
+CONTACT_MIN_CONFIDENCE = float(os.getenv("CONTACT_MIN_CONFIDENCE", "0.8"))
+CONTACT_RULES_VERSION = "3"  # bump when rules change, so cached parses are redone
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Spaces and tabs only: a number never continues on the next line (e.g. a "2015 - 2019" below it)
+_PHONE = re.compile(r"(?<![\w+])\+?\(?\d[\d \t().-]{7,}\d(?!\w)")
+_PHONE_LABEL = re.compile(r"(?:phone|tel|mobile|cell|contact|ph|mob)\b\.?\s*(?:no\.?|#|number)?\s*:?\s*$", re.IGNORECASE)
+_YEAR_RANGE = re.compile(r"^(?:19|20)\d\d\s*[-–]\s*(?:19|20)\d\d$")
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9-]+(?:/[A-Za-z0-9_.-]+)?", re.IGNORECASE)
+_LINKEDIN = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+_SCHOLAR = re.compile(r"(?:https?://)?scholar\.google\.[a-z.]+/citations\?\S*?user=[A-Za-z0-9_-]+\S*", re.IGNORECASE)
+_NAME_WORD = re.compile(r"(?:Dr\.|Prof\.|Engr\.|Mr\.|Ms\.|Mrs\.|[A-Z][A-Za-z'’-]*\.?)")
+_TITLE_LINE = re.compile(r"(?:curriculum\s+vitae|resume|résumé|cv)\s*:?", re.IGNORECASE)
+_NOT_A_NAME = re.compile(r"curriculum|vitae|resume|résumé|\bcv\b|page|contact|address", re.IGNORECASE)
+# Words that make a title-case line a job title or a location rather than a name
+_TITLE_OR_PLACE_WORDS = frozenset((
+    "senior", "junior", "lead", "principal", "head", "chief", "assistant", "associate", "intern", "trainee",
+    "software", "engineer", "engineering", "developer", "programmer", "manager", "director", "officer",
+    "consultant", "analyst", "designer", "architect", "scientist", "specialist", "administrator",
+    "coordinator", "executive", "technician", "researcher", "professor", "lecturer", "teacher",
+    "student", "scholar", "fellow", "full", "stack", "backend", "frontend", "data", "web", "mobile",
+    "street", "road", "avenue", "lane", "block", "sector", "phase", "town", "city", "colony", "district",
+    "province", "state", "country", "pakistan", "india", "usa", "uk", "uae", "united", "kingdom", "states",
+    "punjab", "sindh", "lahore", "karachi", "islamabad", "rawalpindi", "peshawar", "faisalabad", "multan",
+    "quetta", "london", "dubai",
+))
+_HONORIFIC = re.compile(r"^(?:dr|prof|engr|mr|ms|mrs)\.$", re.IGNORECASE)
+
+
+def _email(text: str):
+    match = _EMAIL.search(text)
+    return (match.group(0).rstrip("."), 0.99) if match else None
+
+
+def _phone(text: str):
+    best = None
+    for match in _PHONE.finditer(text):
+        value = match.group(0).strip()
+        digits = sum(ch.isdigit() for ch in value)
+        if not 10 <= digits <= 15 or _YEAR_RANGE.match(value):
+            continue
+        labelled = _PHONE_LABEL.search(text, max(0, match.start() - 20), match.start())
+        confidence = 0.95 if labelled or value.startswith("+") else 0.75
+        if best is None or confidence > best[1]:
+            best = (value, confidence)
+        if confidence >= 0.95:
+            break
+    return best
+
+
+def _link(pattern):
+    def find(text: str):
+        match = pattern.search(text)
+        return (match.group(0).rstrip(".,;)/"), 0.99) if match else None
+    return find
+
+
+def _corroborates(words: list, text: str) -> bool:
+    """Whether a first or last name (3+ letters) appears in the email's local part or the LinkedIn slug."""
+    handles = []
+    email = _EMAIL.search(text)
+    if email:
+        handles.append(email.group(0).split("@")[0])
+    linkedin = _LINKEDIN.search(text)
+    if linkedin:
+        handles.append(linkedin.group(0).rstrip("/").rsplit("/", 1)[-1])
+    handles = [re.sub(r"[^a-z]", "", handle.lower()) for handle in handles]
+    names = [re.sub(r"[^a-z]", "", word.lower()) for word in words if not _HONORIFIC.match(word)]
+    names = [name for name in (names[0], names[-1]) if len(name) >= 3] if names else []
+    return any(name in handle for name in names for handle in handles)
+
+
+def _name(text: str):
+    """
+    First short title-case line before the first section heading. On its
+    own that is only a guess (it could be a job title or a city), kept below
+    CONTACT_MIN_CONFIDENCE; it becomes confident when the email address or
+    LinkedIn profile contains the first or last name.
+    """
+    position = 0
+    for line in text.splitlines()[:8]:
+        line = line.strip().strip("|,").strip()
+        if not line or _TITLE_LINE.fullmatch(line):
+            continue
+        if heading_of(line) is not None:
+            break
+        words = line.split()
+        if (
+            2 <= len(words) <= 5
+            and not any(ch.isdigit() for ch in line)
+            and "@" not in line and "/" not in line
+            and not _NOT_A_NAME.search(line)
+            and all(_NAME_WORD.fullmatch(word) for word in words)
+            and not any(word.lower().strip(".,") in _TITLE_OR_PLACE_WORDS for word in words)
+        ):
+            corroborated = _corroborates(words, text)
+            if position == 0:
+                return line, 0.9 if corroborated else 0.7
+            return line, 0.7 if corroborated else 0.5
+        position += 1
+    return None
+
+
+RULES = {
+    "name": _name,
+    "email": _email,
+    "phone": _phone,
+    "github": _link(_GITHUB),
+    "linkedin": _link(_LINKEDIN),
+    "scholar": _link(_SCHOLAR),
+}
+
+
+# Fields looked for in the header block before the rest of the text
+HEADER_FIELDS = ("email", "phone")
+# Confidence of a header field found outside the header: kept as a fallback only
+BODY_CONFIDENCE = 0.75
+
+
+def extract_contact_fields(text: str, fields: tuple) -> dict:
+    """Runs the rules for `fields`; returns {field: (value, confidence)} for those found."""
+    index = SectionIndex(text)
+    header = index.header()
+    body = index.without("references", collapse=False)
+    found = {}
+    for field in fields:
+        if field in HEADER_FIELDS:
+            result = RULES[field](header)
+            if result is None:
+                result = RULES[field](body)
+                if result is not None:
+                    result = (result[0], min(result[1], BODY_CONFIDENCE))
+        else:
+            result = RULES[field](body)
+        if result is not None:
+            found[field] = result
+    return found
+
+
+def confident_fields(found: dict) -> dict:
+    """{field: value} for the fields the rules are sure enough about to skip the LLM."""
+    return {field: value for field, (value, confidence) in found.items() if confidence >= CONTACT_MIN_CONFIDENCE}
+
+
+def merge_contact_fields(data: dict, found: dict) -> dict:
+    """
+    Puts rule values into the parsed result: confident ones always win (the
+    LLM was not asked for them), the others only fill fields the LLM left
+    empty. Confidences are reported under "contact_confidence".
+    """
+    confidence = {}
+    for field, (value, score) in found.items():
+        if score >= CONTACT_MIN_CONFIDENCE or not data.get(field):
+            data[field] = value
+            confidence[field] = score
+    data["contact_confidence"] = confidence
+    return data
@@ -0,0 +1,150 @@
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+# ----------------------------
+# STREAMING DOCX TEXT
+# ----------------------------
+# A DOCX is a zip of WordprocessingML parts. Instead of building python-docx's
+# full object model (and reading only `doc.paragraphs`), each text part is
+# iterparsed straight out of the zip and every element is dropped as soon as
+# its text has been taken, so memory stays flat however long the CV is.
+#
+# Reading order is the order of the XML:
+#   headers      first (name and contact details often live there)
+#   body         paragraphs and tables as they appear, nested tables included
+#   footers      last
+# Header/footer lines repeated across parts (first/even/default) are kept once.
+#
+# Tables: a row whose cells are one line each becomes "cell | cell | cell"
+# (skills grids, date/role tables); otherwise the cells are emitted one after
+# the other, so a two-column layout table reads left column then right column
+# and its section headings stay on lines of their own (services/sections.py).
+# Text boxes (w:txbxContent) are read where they are anchored; the VML copy
+# Word stores in mc:Fallback is skipped so they are not read twice.
+#
+# Parsing stops once `max_chars` is collected, like the PDF path.
+DOCX_TEXT_VERSION = "2"  # bump when the output changes, so cached parses are redone
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_P, _TR, _TC, _T = _W + "p", _W + "tr", _W + "tc", _W + "t"
+_FRAMES = (_P, _TR, _TC)
+_SKIPPED = (_FALLBACK, _W + "moveFrom")  # duplicate text box copy, moved-away text
+_CHARACTERS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+_PART_ROOTS = (_W + "body", _W + "hdr", _W + "ftr")
+
+
+def _relationships(archive: zipfile.ZipFile, names: set, part: str) -> list:
+    """(type, part name) of the internal relationships of `part` ("" for the package)."""
+    folder, name = posixpath.split(part)
+    rels = posixpath.join(folder, "_rels", name + ".rels")
+    if rels not in names:
+        return []
+    out = []
+    for rel in ET.fromstring(archive.read(rels)).iter(_RELATIONSHIP):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        out.append((rel.get("Type", "").rsplit("/", 1)[-1], path))
+    return out
+
+
+def text_parts(archive: zipfile.ZipFile) -> list:
+    """(kind, part name) of the headers, main document and footers, in reading order."""
+    names = set(archive.namelist())
+    document = next(
+        (path for kind, path in _relationships(archive, names, "") if kind == "officeDocument"),
+        "word/document.xml",
+    )
+    related = _relationships(archive, names, document)
+    parts = [("header", path) for kind, path in related if kind == "header"]
+    parts.append(("document", document))
+    parts += [("footer", path) for kind, path in related if kind == "footer"]
+    return [(kind, path) for kind, path in parts if path in names]
+
+
+def _sink(stack: list):
+    """Where a finished line goes: the innermost open table cell, or None for the top level."""
+    for tag, items in reversed(stack):
+        if tag == _TC:
+            return items
+    return None
+
+
+def iter_lines(stream):
+    """Yields the non-empty text lines of one WordprocessingML part in reading order."""
+    stack = []  # open paragraphs / rows / cells: (tag, runs | cells | lines)
+    skipped = 0
+    part_root = None
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if tag in _SKIPPED:
+            skipped += 1 if event == "start" else -1
+            elem.clear()
+            continue
+        if skipped:
+            continue
+        if event == "start":
+            if tag in _FRAMES:
+                stack.append((tag, []))
+            elif tag in _PART_ROOTS:
+                part_root = elem
+            continue
+
+        if tag == _T:
+            if stack and stack[-1][0] == _P:
+                stack[-1][1].append(elem.text or "")
+        elif tag in _CHARACTERS:
+            if stack and stack[-1][0] == _P:
+                stack[-1][1].append(_CHARACTERS[tag])
+        elif tag in _FRAMES:
+            _, items = stack.pop()
+            if tag == _P:
+                lines = [line for line in "".join(items).split("\n") if line.strip()]
+            elif tag == _TC:
+                if stack and stack[-1][0] == _TR:
+                    stack[-1][1].append(items)
+                    lines = []
+                else:
+                    lines = items
+            elif all(len(cell) <= 1 for cell in items):
+                cells = [cell[0].strip() for cell in items if cell]
+                lines = [" | ".join(cells)] if cells else []
+            else:
+                lines = [line for cell in items for line in cell]
+
+            sink = _sink(stack)
+            if sink is not None:
+                sink.extend(lines)
+            else:
+                yield from lines
+        else:
+            continue
+
+        elem.clear()
+        if not stack and part_root is not None:
+            # Finished a top-level block: let go of it (and the empty shells of earlier ones)
+            part_root.clear()
+
+
+def extract_docx_text(source, max_chars: int = None) -> str:
+    """Text of a DOCX (a path or binary file object), stopping after `max_chars` characters."""
+    lines, size, seen = [], 0, set()
+    with zipfile.ZipFile(source) as archive:
+        for kind, part in text_parts(archive):
+            with archive.open(part) as stream:
+                for line in iter_lines(stream):
+                    if kind != "document":
+                        if line in seen:
+                            continue
+                        seen.add(line)
+                    lines.append(line)
+                    size += len(line) + 1
+                    if max_chars and size >= max_chars:
+                        return "\n".join(lines)[:max_chars]
+    return "\n".join(lines)
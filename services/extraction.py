@@ -0,0 +1,341 @@
+import os
+import io
+import time
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from services.uploads import upload_kind
+from services.concurrency import EXTRACTION_WORKERS
+from services.docx_text import extract_docx_text
+
+load_dotenv()
+
+# ----------------------------
+# PDF TEXT EXTRACTION (hybrid text layer / OCR)
+# ----------------------------
+# These run inside the extraction process pool (see services/concurrency.py),
+# so keep this module free of FastAPI / LangChain imports.
+#
+# `max_chars` is the LLM character budget of the calling endpoint. Once that
+# much text is collected we stop reading (or rasterizing) further pages, so a
+# book-sized upload costs a page or two instead of the whole document.
+#
+# The OCR decision is made per page: pages whose text layer looks usable are
+# kept as-is, and only empty / garbage pages are rasterized and OCR'd.
+#
+# `source` is either the uploaded bytes (the normal API path) or a file path.
+# Bytes are parsed straight from memory; a temp file is only written when
+# pdf2image has to rasterize pages, and it is always removed afterwards.
+#
+# Pages are separated by PAGE_BREAK so prompt compression can spot running
+# headers, footers and page numbers (services/compression.py).
+#
+# PyPDF2, pdf2image and pytesseract are imported where they are
+# used, so importing this module (the API does, at startup) stays cheap.
+# load_extractors() imports them ahead of time, e.g. in a fresh pool worker.
+PAGE_BREAK = "\f"
+
+
+def load_extractors() -> int:
+    """Imports the extraction libraries now instead of on the first upload; returns the worker's pid."""
+    import PyPDF2  # noqa: F401
+    import pdf2image  # noqa: F401
+    import pytesseract  # noqa: F401
+    import services.imaging  # noqa: F401  (NumPy, Pillow)
+    return os.getpid()
+
+
+def extract_text_from_pdf(source, max_chars: int = None) -> str:
+    from PyPDF2 import PdfReader
+
+    try:
+        reader = PdfReader(_as_stream(source))
+        page_count = len(reader.pages)
+    except Exception:
+        # Unreadable structure: OCR is the only option
+        with pdf_path(source) as file_path, _ocr_timer(pages=0):
+            text = ocr_pdf(file_path, 0, max_chars).strip()
+        return text[:max_chars] if max_chars else text
+
+    page_texts = {}
+    needs_ocr = []
+    collected = 0
+    last_page = 0
+    for last_page in range(1, page_count + 1):
+        try:
+            page_text = reader.pages[last_page - 1].extract_text() or ""
+        except Exception:
+            page_text = ""
+
+        if is_usable_page_text(page_text):
+            page_texts[last_page] = page_text
+            collected += len(page_text.strip())
+        else:
+            needs_ocr.append(last_page)
+
+        if max_chars and collected >= max_chars:
+            break
+
+    if needs_ocr:
+        try:
+            with pdf_path(source) as file_path, _ocr_timer(pages=len(needs_ocr)):
+                for window_texts in iter_ocr_windows(file_path, needs_ocr):
+                    page_texts.update(window_texts)
+                    if max_chars and _ordered_prefix_chars(page_texts, last_page) >= max_chars:
+                        break
+        except Exception as e:
+            print("⚠️ OCR failed:", e)
+
+    text = PAGE_BREAK.join(page_texts[n] for n in sorted(page_texts)).strip()
+    return text[:max_chars] if max_chars else text
+
+
+def _as_stream(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+# Time spent on OCR in this process since the last extract_with_usage()
+# call; lets the server split "extract" from "ocr" and count fallbacks.
+ocr_usage = {"seconds": 0.0, "pages": 0, "fallbacks": 0}
+
+
+@contextmanager
+def _ocr_timer(pages: int):
+    ocr_usage["fallbacks"] += 1
+    ocr_usage["pages"] += pages
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ocr_usage["seconds"] += time.perf_counter() - started
+
+
+@contextmanager
+def pdf_path(source):
+    """
+    Yields a filesystem path for `source`, for tools that only take paths
+    (poppler via pdf2image). In-memory uploads are written to a private temp
+    file that is deleted on exit, even if OCR raises.
+    """
+    if not isinstance(source, (bytes, bytearray, memoryview)):
+        yield source
+        return
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        tmp.write(source)
+        tmp.flush()
+        yield tmp.name
+
+
+# ----------------------------
+# PAGE QUALITY HEURISTIC
+# ----------------------------
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "25"))
+_GARBAGE_MARKERS = ("(cid:", "�")
+
+
+def is_usable_page_text(text: str) -> bool:
+    """
+    Decides whether a page's text layer can be used without OCR.
+    Rejects empty pages, pages with almost no text (scans with a stray
+    caption) and pages whose text is mostly broken glyphs.
+    """
+    stripped = text.strip()
+    if len(stripped) < OCR_MIN_PAGE_CHARS:
+        return False
+
+    if sum(stripped.count(marker) for marker in _GARBAGE_MARKERS) * 10 > len(stripped):
+        return False
+
+    visible = [ch for ch in stripped if not ch.isspace()]
+    alnum = sum(ch.isalnum() for ch in visible)
+    printable = sum(ch.isprintable() for ch in visible)
+    if alnum < 0.5 * len(visible) or printable < 0.95 * len(visible):
+        return False
+
+    # Text layers with missing spacing come out as one giant "word"
+    return len(visible) / len(stripped.split()) <= 25
+
+
+def _ordered_prefix_chars(page_texts: dict, last_page: int) -> int:
+    """Characters available in page order before the first page still waiting for OCR."""
+    total = 0
+    for page_number in range(1, last_page + 1):
+        if page_number not in page_texts:
+            break
+        total += len(page_texts[page_number].strip())
+    return total
+
+
+# ----------------------------
+# STREAMING OCR
+# ----------------------------
+# Pages are rendered a small window at a time (never the whole document) and
+# each window is OCR'd in parallel. Tesseract runs as a subprocess, so plain
+# threads are enough to use several cores. Every extraction worker OCRs
+# on its own, so by default the cores are split between them: at most
+# EXTRACTION_WORKERS x OCR_THREADS tesseract processes run at once.
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "1") != "0"
+OCR_THREADS = int(os.getenv("OCR_THREADS", str(max(1, (os.cpu_count() or 2) // EXTRACTION_WORKERS))))
+OCR_MAX_MEMORY_MB = int(os.getenv("OCR_MAX_MEMORY_MB", "256"))
+
+# One OpenMP thread per tesseract process; we parallelize across pages instead.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def plan_ocr_window(page_width_pts: float, page_height_pts: float, dpi: int, grayscale: bool, max_memory_mb: int):
+    """
+    Picks (dpi, pages_per_window) so that one window stays under
+    `max_memory_mb`: its rendered pages plus, with OCR_PREPROCESS, the
+    clean-up working set of each page being OCR'd in parallel. If a single
+    page would not fit, the DPI is lowered.
+    """
+    from services.imaging import preprocess_bytes, OCR_PREPROCESS
+
+    bytes_per_pixel = 1 if grayscale else 3
+    budget = max_memory_mb * 1024 * 1024
+
+    def page_bytes(at_dpi):
+        width, height = page_width_pts / 72 * at_dpi, page_height_pts / 72 * at_dpi
+        rendered = width * height * bytes_per_pixel
+        return rendered + (preprocess_bytes(width, height, at_dpi) if OCR_PREPROCESS else 0)
+
+    while dpi > 72 and page_bytes(dpi) > budget:
+        dpi -= 25
+    window = int(budget // max(page_bytes(dpi), 1))
+    return dpi, max(1, min(window, OCR_THREADS))
+
+
+def _page_size(info: dict):
+    # pdfinfo reports e.g. "595.276 x 841.89 pts (A4)"
+    try:
+        width, _, height = info["Page size"].split()[:3]
+        return float(width), float(height)
+    except (KeyError, ValueError):
+        return 612.0, 792.0  # US Letter
+
+
+def _page_runs(page_numbers: list):
+    """Groups sorted page numbers into (first, last) runs for pdf2image."""
+    runs = []
+    for number in page_numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return runs
+
+
+def iter_ocr_windows(file_path: str, page_numbers: list, info: dict = None):
+    """Yields {page_number: text} for each rendered-and-OCR'd window of pages."""
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    info = info or pdfinfo_from_path(file_path)
+    dpi, window = plan_ocr_window(*_page_size(info), OCR_DPI, OCR_GRAYSCALE, OCR_MAX_MEMORY_MB)
+
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        for start in range(0, len(page_numbers), window):
+            batch = page_numbers[start:start + window]
+            images = []
+            for first_page, last_page in _page_runs(batch):
+                images += convert_from_path(
+                    file_path,
+                    dpi=dpi,
+                    first_page=first_page,
+                    last_page=last_page,
+                    grayscale=OCR_GRAYSCALE,
+                )
+            page_texts = list(pool.map(lambda image: ocr_image(image, dpi), images))
+            del images
+            yield dict(zip(batch, page_texts))
+
+
+def ocr_image(image, dpi: float = None) -> str:
+    """Tesseract on one page image, cleaned up first (services/imaging.py) unless OCR_PREPROCESS is off."""
+    import pytesseract
+    from services.imaging import preprocess_for_ocr, OCR_PREPROCESS
+
+    if OCR_PREPROCESS:
+        image = preprocess_for_ocr(image, dpi)
+        dpi = image.info["dpi"][0]
+    return pytesseract.image_to_string(image, config=f"--dpi {round(dpi)}" if dpi else "")
+
+
+def ocr_pdf(file_path: str, page_count: int = 0, max_chars: int = None) -> str:
+    """OCRs a whole scanned PDF window by window, stopping once `max_chars` is reached."""
+    from pdf2image import pdfinfo_from_path
+
+    chunks = []
+    collected = 0
+    try:
+        info = pdfinfo_from_path(file_path)
+        page_count = page_count or info["Pages"]
+        for window_texts in iter_ocr_windows(file_path, list(range(1, page_count + 1)), info):
+            for page_text in window_texts.values():
+                chunks.append(page_text)
+                collected += len(page_text.strip())
+            if max_chars and collected >= max_chars:
+                break
+    except Exception as e:
+        print("⚠️ OCR failed:", e)
+    return PAGE_BREAK.join(chunks)
+
+
+def extract_with_usage(func, *args):
+    """
+    Runs an extractor and returns (text, usage): total seconds plus the OCR
+    seconds, pages and fallbacks it needed. Submitted to the extraction pool
+    in place of `func` itself.
+    """
+    ocr_usage.update(seconds=0.0, pages=0, fallbacks=0)
+    started = time.perf_counter()
+    text = func(*args)
+    usage = {
+        "seconds": time.perf_counter() - started,
+        "ocr_seconds": ocr_usage["seconds"],
+        "ocr_pages": ocr_usage["pages"],
+        "ocr_fallbacks": ocr_usage["fallbacks"],
+    }
+    return text, usage
+
+
+# ----------------------------
+# IMAGE UPLOADS (JPG / PNG / WebP photos of CVs)
+# ----------------------------
+def extract_text_from_image(source, max_chars: int = None) -> str:
+    """OCRs a photo or scan of a CV (uploaded bytes or a file path)."""
+    from services.imaging import open_image
+
+    with _ocr_timer(pages=1):
+        try:
+            text = ocr_image(open_image(source)).strip()
+        except Exception as e:
+            print("⚠️ Image OCR failed:", e)
+            text = ""
+    return text[:max_chars] if max_chars else text
+
+
+# ----------------------------
+# DOCX TEXT EXTRACTION
+# ----------------------------
+def extract_text_from_docx(source, max_chars: int = None) -> str:
+    """
+    Extracts text from DOCX resumes (uploaded bytes or a file path), tables,
+    headers, footers and text boxes included (see services/docx_text.py).
+    """
+    try:
+        return extract_docx_text(_as_stream(source), max_chars)
+    except Exception as e:
+        print("⚠️ DOCX extraction failed:", e)
+        return ""
+
+
+EXTRACTORS = {"pdf": extract_text_from_pdf, "docx": extract_text_from_docx, "image": extract_text_from_image}
+
+
+def extractor_for(filename: str):
+    """The extraction function for an upload, by its file type (see services/uploads.py)."""
+    return EXTRACTORS[upload_kind(filename)]
@@ -0,0 +1,185 @@
+import io
+import os
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------
+# OCR IMAGE PREPROCESSING
+# ----------------------------
+# Phone photos of CVs are large, colored, unevenly lit and slightly rotated;
+# Tesseract does best on a ~200-300 DPI black-on-white page with level text
+# lines. Each step below is a handful of whole-array NumPy operations:
+#
+#   grayscale   uint8 luminance (ITU-R 601 weights)
+#   downscale   to OCR_IMAGE_DPI, assuming the photo shows a whole page
+#               (a 12 MP photo of an A4 page is ~350 DPI)
+#   binarize    Bradley adaptive threshold: a pixel is ink when it is
+#               BINARIZE_THRESHOLD darker than the mean of its neighbourhood
+#               (from an integral image), so shadows and gradients drop out
+#   deskew      the angle whose row projection of the ink is sharpest
+#
+# These run inside the extraction process pool, like services/extraction.py,
+# on up to OCR_THREADS pages at once. To keep that within OCR_MAX_MEMORY_MB,
+# whole pages are only ever held as uint8/bool arrays and the integral image
+# is built BINARIZE_STRIP_ROWS rows at a time in reused int32 buffers;
+# preprocess_bytes() is the resulting working set, which the OCR window
+# planner counts per page.
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") != "0"
+OCR_IMAGE_DPI = int(os.getenv("OCR_IMAGE_DPI", os.getenv("OCR_DPI", "200")))
+OCR_MAX_SKEW = float(os.getenv("OCR_MAX_SKEW", "5"))  # degrees searched either way
+
+PAGE_LONG_SIDE_INCHES = 11.69  # A4; Letter (11in) is close enough
+BINARIZE_WINDOW_INCHES = 0.25
+BINARIZE_THRESHOLD = 0.15
+SKEW_STEP = 0.2  # degrees
+SKEW_MAX_POINTS = 40_000  # ink pixels sampled for the skew search
+BINARIZE_STRIP_ROWS = 256
+# Whole-page arrays alive at the peak of preprocess_for_ocr: the uint8 gray
+# copy, the bool ink mask and the 0/255 page, then the rotated page
+PREPROCESS_BYTES_PER_PIXEL = 4
+
+
+def open_image(source) -> Image.Image:
+    """
+    Opens an uploaded photo (bytes or path) upright, per its EXIF
+    orientation. Large JPEGs are decoded straight to grayscale at a reduced
+    scale (libjpeg's DCT scaling) when that still leaves OCR_IMAGE_DPI.
+    """
+    from PIL import ImageOps
+
+    image = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+    if image.format == "JPEG":
+        scale = min(OCR_IMAGE_DPI / page_dpi(image.size), 1)
+        image.draft("L", (round(image.width * scale), round(image.height * scale)))
+    return ImageOps.exif_transpose(image)
+
+
+def to_grayscale(image: Image.Image) -> np.ndarray:
+    """Uint8 luminance; transparent areas count as white paper."""
+    if image.mode in ("RGBA", "LA", "P", "PA"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, rgba)
+    return np.asarray(image if image.mode == "L" else image.convert("L"))
+
+
+def page_dpi(shape) -> float:
+    """Resolution of an image that shows a whole page."""
+    return max(shape) / PAGE_LONG_SIDE_INCHES
+
+
+def downscale(gray: np.ndarray, dpi: float, target_dpi: int = OCR_IMAGE_DPI):
+    """Returns (gray, dpi) resized down to `target_dpi`; smaller images are left alone."""
+    if dpi <= target_dpi * 1.05:
+        return gray, dpi
+    scale = target_dpi / dpi
+    height, width = gray.shape
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resized = Image.fromarray(gray).resize(size, Image.Resampling.BOX)
+    return np.asarray(resized), target_dpi
+
+
+def _binarize_half(dpi: float) -> int:
+    return max(7, int(dpi * BINARIZE_WINDOW_INCHES) // 2)
+
+
+def binarize(gray: np.ndarray, dpi: float) -> np.ndarray:
+    """Boolean ink mask (True = dark) from Bradley's adaptive threshold."""
+    height, width = gray.shape
+    half = _binarize_half(dpi)
+    cols = np.arange(width)
+    left, right = np.clip(cols - half, 0, width), np.clip(cols + half + 1, 0, width)
+    widths = (right - left).astype(np.float32)
+    keep = np.float32(1 - BINARIZE_THRESHOLD)
+
+    # Box sums from running sums with a zero in front, one axis at a time:
+    # each window sum is then two subtractions (an integral image, separably).
+    # A strip only needs `half` rows of context either side, and the running
+    # sums of a window (<= (2 * half + 1) * 255 * width) fit in int32.
+    ink = np.empty((height, width), dtype=bool)
+    column_running = np.zeros((BINARIZE_STRIP_ROWS + 2 * half + 1, width), dtype=np.int32)
+    row_running = np.zeros((BINARIZE_STRIP_ROWS, width + 1), dtype=np.int32)
+    for start in range(0, height, BINARIZE_STRIP_ROWS):
+        stop = min(start + BINARIZE_STRIP_ROWS, height)
+        first, last = max(0, start - half), min(height, stop + half)
+        np.cumsum(gray[first:last], axis=0, dtype=np.int32, out=column_running[1:last - first + 1])
+
+        rows = np.arange(start, stop)
+        top, bottom = np.clip(rows - half, 0, height) - first, np.clip(rows + half + 1, 0, height) - first
+        column_sums = column_running[bottom]
+        column_sums -= column_running[top]
+        rows_out = row_running[:stop - start]
+        np.cumsum(column_sums, axis=1, out=rows_out[:, 1:])
+        window_sum = rows_out[:, right].astype(np.float32)
+        window_sum -= rows_out[:, left]
+        window_sum *= keep
+        area = (bottom - top).astype(np.float32)[:, None] * widths
+        area *= gray[start:stop]
+        np.less(area, window_sum, out=ink[start:stop])
+    return ink
+
+
+def _sample_ink(ink: np.ndarray, max_points: int):
+    """(ys, xs) of at most about `max_points` ink pixels, gathered strip by strip."""
+    count = int(np.count_nonzero(ink))
+    step = count // max_points + 1
+    width = ink.shape[1]
+    samples = [
+        np.flatnonzero(ink[start:start + BINARIZE_STRIP_ROWS])[::step] + start * width
+        for start in range(0, ink.shape[0], BINARIZE_STRIP_ROWS)
+    ]
+    ys, xs = np.divmod(np.concatenate(samples), width)
+    return ys.astype(np.float32), xs.astype(np.float32)
+
+
+def estimate_skew(ink: np.ndarray, max_skew: float = OCR_MAX_SKEW) -> float:
+    """
+    Degrees to rotate the page counter-clockwise so text lines are level:
+    the angle whose row histogram of ink pixels has the largest squared
+    differences (sharp text lines vs blank gaps), over a sample of at most
+    SKEW_MAX_POINTS ink pixels.
+    """
+    if np.count_nonzero(ink) < 100:
+        return 0.0
+    ys, xs = _sample_ink(ink, SKEW_MAX_POINTS)
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_skew, max_skew + SKEW_STEP / 2, SKEW_STEP):
+        radians = np.deg2rad(angle)
+        rows = np.rint(ys * np.cos(radians) - xs * np.sin(radians)).astype(np.int32)
+        histogram = np.bincount(rows - rows.min())
+        score = float((np.diff(histogram).astype(np.float64) ** 2).sum())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return round(best_angle, 2)
+
+
+def preprocess_bytes(width: float, height: float, dpi: float) -> int:
+    """Peak working memory of preprocess_for_ocr on a width x height page already at `dpi`."""
+    strip_rows = BINARIZE_STRIP_ROWS + 2 * _binarize_half(dpi) + 1
+    # Strip buffers: the int32 running sums, column sums and float32 window sums / areas
+    strips = strip_rows * (width + 1) * 4 + BINARIZE_STRIP_ROWS * (width + 1) * 4 * 4
+    skew = SKEW_MAX_POINTS * 8 * 4
+    return int(width * height * PREPROCESS_BYTES_PER_PIXEL + strips + skew)
+
+
+def preprocess_for_ocr(image: Image.Image, dpi: float = None) -> Image.Image:
+    """
+    Black-on-white, level, OCR_IMAGE_DPI version of a photo or scan (see
+    above). `dpi` is the image's resolution when known (rendered PDF pages);
+    photos are assumed to show a whole page.
+    """
+    gray = to_grayscale(image)
+    gray, dpi = downscale(gray, dpi or page_dpi(gray.shape))
+    ink = binarize(gray, dpi)
+    del gray
+    angle = estimate_skew(ink)
+    page = Image.fromarray(np.where(ink, np.uint8(0), np.uint8(255)))
+    del ink
+    if abs(angle) >= SKEW_STEP:
+        page = page.rotate(angle, resample=Image.Resampling.NEAREST, expand=True, fillcolor=255)
+    page.info["dpi"] = (round(dpi), round(dpi))
+    return page
@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import threading
+from dotenv import load_dotenv
+from services.llm import BATCH
+
+load_dotenv()
+
+# ----------------------------
+# Job queue settings (override via .env)
+# ----------------------------
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(".cache", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "4"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+JOB_PURGE_INTERVAL = float(os.getenv("JOB_PURGE_INTERVAL", "3600"))
+
+FINISHED_STATES = ("succeeded", "failed")
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by every server process on the host.
+
+    A worker claims a job by taking a time-limited lease on it and renews the
+    lease while it runs. If the process dies, the lease runs out and another
+    worker picks the job up again, so in-flight jobs survive crashes and
+    restarts.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " filename TEXT NOT NULL,"
+                " input BLOB,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " available_at REAL NOT NULL,"
+                " lease_owner TEXT,"
+                " lease_expires REAL,"
+                " status_code INTEGER,"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(status, available_at)")
+        return self._db
+
+    def submit(self, kind: str, filename: str, data: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, kind, filename, input, status, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, filename, data, now, now, now),
+            )
+        return job_id
+
+    def claim(self, owner: str):
+        """Leases the next runnable job (queued, or running with an expired lease)."""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE"
+                    " (status = 'queued' AND available_at <= ?)"
+                    " OR (status = 'running' AND lease_expires < ?)"
+                    " ORDER BY available_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                        " lease_owner = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                        (owner, now + JOB_LEASE_SECONDS, now, row["id"]),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(row)
+        job["attempts"] += 1
+        job["lease_owner"] = owner
+        return job
+
+    def renew(self, job_id: str, owner: str):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                " WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now + JOB_LEASE_SECONDS, now, job_id, owner),
+            )
+
+    def finish(self, job_id: str, owner: str, status: str, status_code: int, result=None, error: str = None):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, status_code = ?, result = ?, error = ?, input = NULL,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_owner = ?",
+                (status, status_code, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, now, job_id, owner),
+            )
+
+    def retry_later(self, job_id: str, owner: str, delay: float, error: str):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, error = ?,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_owner = ?",
+                (now + delay, error, now, job_id, owner),
+            )
+
+    def release(self, job_id: str, owner: str):
+        """Hands a job back to the queue untouched (graceful shutdown)."""
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, attempts = attempts - 1,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now, now, job_id, owner),
+            )
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, kind, filename, status, attempts, status_code, result, error, created_at, updated_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def purge_finished(self, older_than: float):
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (time.time() - older_than,),
+            )
+
+
+job_store = JobStore(JOBS_DB_PATH)
+
+
+# ----------------------------
+# WORKER POOL
+# ----------------------------
+class JobWorkers:
+    """
+    Runs queued jobs on `count` asyncio workers inside the server process.
+    `pipelines` maps a job kind to one of the routers' parse pipelines
+    (returning (content, status_code, cache_tier)); jobs run at batch LLM
+    priority so they never delay interactive requests.
+
+    Exceptions from a pipeline (LLM timeouts, 429s, network errors) are
+    retried with exponential backoff up to JOB_MAX_ATTEMPTS; a non-200 result
+    (e.g. no readable text) is final.
+
+    Store calls run in a thread (a locked database can block for up to the
+    SQLite timeout) and a failing one is logged without stopping the worker
+    or the lease heartbeat; a job whose final write failed is picked up again
+    once its lease runs out.
+    """
+
+    def __init__(self, store: JobStore, pipelines: dict, count: int):
+        self.store = store
+        self.pipelines = pipelines
+        self.count = count
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks = []
+        self._finished = {}  # job id -> asyncio.Event, for long-polls in this process
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.count)]
+        self._tasks.append(asyncio.create_task(self._purge()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _purge(self):
+        # Finished jobs older than JOB_RETENTION_SECONDS go at start-up and every JOB_PURGE_INTERVAL
+        while True:
+            try:
+                await asyncio.to_thread(self.store.purge_finished, JOB_RETENTION_SECONDS)
+            except sqlite3.Error as e:
+                print("⚠️ Purging finished jobs failed:", e)
+            await asyncio.sleep(JOB_PURGE_INTERVAL)
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, self.owner)
+            except sqlite3.Error as e:
+                print("⚠️ Job claim failed:", e)
+                job = None
+            if job is None:
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the result could not be stored; the lease expiry hands the job back
+                print(f"⚠️ Job {job['id']} worker error:", e)
+
+    async def _keep_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                await asyncio.to_thread(self.store.renew, job_id, self.owner)
+            except sqlite3.Error as e:
+                # Keep beating: two more tries before the lease runs out
+                print(f"⚠️ Lease renewal for job {job_id} failed:", e)
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+        pipeline = self.pipelines.get(job["kind"])
+        if pipeline is None:
+            await asyncio.to_thread(
+                self.store.finish, job_id, self.owner, "failed", 400, error=f"Unknown job kind: {job['kind']}"
+            )
+            self._notify(job_id)
+            return
+
+        # A job whose lease keeps expiring is crashing its worker; stop resuming it
+        if job["attempts"] > JOB_MAX_ATTEMPTS:
+            await asyncio.to_thread(
+                self.store.finish, job_id, self.owner, "failed", 500, error="Job exceeded the maximum number of attempts."
+            )
+            self._notify(job_id)
+            return
+
+        heartbeat = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            content, status_code, _ = await pipeline(job["filename"], job["input"], None, BATCH)
+        except asyncio.CancelledError:
+            # Shutting down: put the job back so the next worker resumes it
+            try:
+                await asyncio.to_thread(self.store.release, job_id, self.owner)
+            except sqlite3.Error as e:
+                print(f"⚠️ Releasing job {job_id} failed, it resumes once its lease expires:", e)
+            raise
+        except Exception as e:
+            if job["attempts"] >= JOB_MAX_ATTEMPTS:
+                print(f"❌ Job {job_id} failed after {job['attempts']} attempts:", e)
+                await asyncio.to_thread(self.store.finish, job_id, self.owner, "failed", 500, error=str(e))
+                self._notify(job_id)
+            else:
+                delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                print(f"⚠️ Job {job_id} attempt {job['attempts']} failed, retrying in {delay:.1f}s:", e)
+                await asyncio.to_thread(self.store.retry_later, job_id, self.owner, delay, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        status = "succeeded" if status_code == 200 else "failed"
+        error = content.get("error") if status == "failed" and isinstance(content, dict) else None
+        await asyncio.to_thread(self.store.finish, job_id, self.owner, status, status_code, result=content, error=error)
+        self._notify(job_id)
+
+    def _notify(self, job_id: str):
+        event = self._finished.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for(self, job_id: str, timeout: float):
+        """
+        Long-poll helper: returns the job once it is finished or `timeout`
+        seconds have passed. Jobs finished by this process wake the waiter
+        immediately; jobs finished elsewhere are picked up by polling.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED_STATES or remaining <= 0:
+                self._finished.pop(job_id, None)
+                return job
+            event = self._finished.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, JOB_POLL_INTERVAL * 4))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,233 @@
+import re
+import json
+from services.metrics import record_json_repair
+
+# ----------------------------
+# TOLERANT JSON PARSING
+# ----------------------------
+# LLM output is usually valid JSON wrapped in a ```json fence, so the fast
+# path is one slice + json.loads. Anything else goes through repair_json():
+# one left-to-right scan that writes valid JSON while it reads, fixing
+#   - fences / prose around the object (ignored)
+#   - smart quotes and single quotes used as string delimiters
+#   - trailing, doubled and missing commas, missing colons
+#   - raw newlines / control characters and bad escapes inside strings
+#   - unescaped quotes inside strings (a quote only closes a string when
+#     what follows looks like JSON structure)
+#   - Python literals (True / False / None), unquoted keys, comments
+#   - truncated output: open strings, keys and brackets are closed
+# Every character is visited once; regexes skip over runs of plain string
+# content and whitespace, so the work stays linear in the output size.
+_TOKEN = re.compile(
+    r"""[\s\ufeff]*(?:
+        (?P<punct>[{}\[\],:])
+      | (?P<quote>["'“”‘’])
+      | (?P<number>-?\.?\d[\w.+-]*)
+      | (?P<word>[A-Za-z_$][\w$-]*)
+      | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+      | (?P<other>.)
+    )""",
+    re.VERBOSE | re.DOTALL,
+)
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_WORDS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null",
+          "NaN": "null", "Infinity": "null", "undefined": "null"}
+
+# opening delimiter -> characters that may close it
+_CLOSERS = {'"': '"', "'": "'", "“": '”"', "”": '”"', "‘": "’'", "’": "’'"}
+# runs of characters that can be copied as they are inside each kind of string
+_PLAIN = {
+    '"': re.compile(r'[^"\\\x00-\x1f]+'),
+    "'": re.compile(r"""[^'"\\\x00-\x1f]+"""),
+    "“": re.compile(r'[^”"\\\x00-\x1f]+'),
+    "‘": re.compile(r"""[^’'"\\\x00-\x1f]+"""),
+}
+_PLAIN["”"] = _PLAIN["“"]
+_PLAIN["’"] = _PLAIN["‘"]
+# a closing quote must be followed by structure (or whitespace and the next token)
+_AFTER_STRING = re.compile(r"""[ \t\r\n]*(?:[,:}\]]|\Z)|[ \t\r\n]+["'“‘{\[\d-]""")
+_ESCAPES = set('"\\/bfnrt')
+_HEX4 = re.compile(r"[0-9a-fA-F]{4}")
+_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+KEY, COLON, VALUE = 0, 1, 2  # object phases: expecting a key, a colon, a value
+
+
+def _read_string(text: str, pos: int, opener: str, out: list) -> int:
+    """Copies the string starting after `opener` at `pos` into `out` as a JSON string; returns the end position."""
+    closers = _CLOSERS[opener]
+    plain = _PLAIN[opener]
+    out.append('"')
+    end = len(text)
+    while pos < end:
+        run = plain.match(text, pos)
+        if run:
+            out.append(run.group())
+            pos = run.end()
+            if pos >= end:
+                break
+        ch = text[pos]
+        if ch in closers and _AFTER_STRING.match(text, pos + 1):
+            pos += 1
+            break
+        if ch == "\\":
+            following = text[pos + 1:pos + 2]
+            if following in _ESCAPES and following:
+                out.append("\\" + following)
+                pos += 2
+            elif following == "u" and _HEX4.match(text, pos + 2):
+                out.append(text[pos:pos + 6])
+                pos += 6
+            elif following == "'":
+                out.append("'")
+                pos += 2
+            else:
+                out.append("\\\\")
+                pos += 1
+            continue
+        if ch == '"':
+            out.append('\\"')
+        elif ch < " ":
+            out.append(_CONTROL.get(ch) or f"\\u{ord(ch):04x}")
+        else:
+            out.append(ch)  # a quote that didn't close the string
+        pos += 1
+    out.append('"')
+    return pos
+
+
+def _begin(stack: list, out: list) -> bool:
+    """Writes the separator a new value needs in the current container; True if it is an object key."""
+    if not stack:
+        return False
+    top = stack[-1]
+    if top[0] == "]":
+        if top[1]:
+            out.append(",")
+        top[1] += 1
+        return False
+    if top[2] == KEY:
+        if top[1]:
+            out.append(",")
+        top[1] += 1
+        top[2] = COLON
+        return True
+    if top[2] == COLON:
+        out.append(":")
+    top[2] = KEY
+    return False
+
+
+def _close(entry: list, out: list):
+    if entry[0] == "}":
+        if entry[2] == COLON:
+            out.append(":null")
+        elif entry[2] == VALUE:
+            out.append("null")
+    out.append(entry[0])
+
+
+def repair_json(text: str, start: int = 0) -> str:
+    """
+    Rewrites the first JSON value at or after `start` as valid JSON text
+    (see the notes at the top of this module). Never raises; what can't be
+    repaired is left for json.loads to reject.
+    """
+    out = []
+    stack = []  # [closer, items so far, object phase]
+    pos = start
+    end = len(text)
+    while pos < end:
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+
+        if kind == "punct":
+            if token in "{[":
+                if _begin(stack, out):
+                    out.append('"":')  # a container where a key should be
+                    stack[-1][2] = KEY
+                stack.append(["}" if token == "{" else "]", 0, KEY])
+                out.append(token)
+                continue
+            if not stack:
+                continue
+            top = stack[-1]
+            if token == ":":
+                if top[0] == "}" and top[2] == COLON:
+                    out.append(":")
+                    top[2] = VALUE
+            elif token == ",":
+                if top[0] == "}" and top[2] != KEY:
+                    out.append(":null" if top[2] == COLON else "null")
+                    top[2] = KEY
+            else:
+                # A "]" for "}" (or the reverse) is a typo: it closes the innermost container
+                _close(stack.pop(), out)
+                if not stack:
+                    return "".join(out)
+            continue
+
+        if kind in ("comment", "other"):
+            continue
+
+        key = _begin(stack, out)
+        if kind == "quote":
+            pos = _read_string(text, pos, token, out)
+        elif kind == "number":
+            out.append(token if _NUMBER.fullmatch(token) and not key else json.dumps(token))
+        else:
+            word = _WORDS.get(token)
+            out.append(word if word and not key else json.dumps(token))
+        if not stack:
+            return "".join(out)  # a scalar at the top level
+
+    # Truncated: close whatever is still open
+    while stack:
+        _close(stack.pop(), out)
+    return "".join(out)
+
+
+def _root_start(text: str) -> int:
+    start = text.find("{")
+    return start if start >= 0 else text.find("[")
+
+
+def parse_llm_json(text: str):
+    """
+    Parses the JSON object (or array) in an LLM answer. Returns
+    (value, repaired); raises ValueError when nothing JSON-like is found.
+    """
+    start = _root_start(text)
+    if start < 0:
+        raise ValueError("No JSON object in the model output.")
+
+    # Fast path: valid JSON inside a fence or prose
+    end = text.rfind("}" if text[start] == "{" else "]")
+    if end > start:
+        try:
+            return json.loads(text[start:end + 1]), False
+        except json.JSONDecodeError:
+            pass
+    return json.loads(repair_json(text, start)), True
+
+
+def clean_json_output(text: str):
+    """
+    Turns an LLM answer into a dict with parse_llm_json, counting repaired and
+    failed outputs. Returns {"error", "raw_output"} when no object can be recovered.
+    """
+    try:
+        data, repaired = parse_llm_json(text)
+    except ValueError as e:
+        data, repaired = None, False
+        print("⚠️ JSON repair failed:", e)
+    if not isinstance(data, dict):
+        record_json_repair("failed")
+        return {"error": "Invalid JSON output from LLM", "raw_output": text}
+    if repaired:
+        record_json_repair("repaired")
+    return data
@@ -0,0 +1,327 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------
+# Gateway settings (override via .env)
+# ----------------------------
+# GROQ_RPM / GROQ_TPM: the account's requests- and tokens-per-minute limits
+# LLM_CONCURRENCY:     max in-flight LLM calls per server worker
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "800"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+# Priority classes: lower runs first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+# ----------------------------
+# SHARED CLIENTS (keep-alive pooling)
+# ----------------------------
+_limits = httpx.Limits(
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    keepalive_expiry=60,
+)
+_http_client = None
+_http_async_client = None
+_clients = {}
+
+
+def _shared_http_clients():
+    global _http_client, _http_async_client
+    if _http_client is None:
+        _http_client = httpx.Client(limits=_limits, timeout=LLM_TIMEOUT)
+        _http_async_client = httpx.AsyncClient(limits=_limits, timeout=LLM_TIMEOUT)
+    return _http_client, _http_async_client
+
+
+def get_llm(model: str, temperature: float = 0):
+    """
+    Returns the shared ChatGroq client for (model, temperature). All clients
+    share one keep-alive connection pool, and SDK-level retries are off:
+    retries are handled by the gateway so 429s don't turn into retry storms.
+    langchain-groq is imported on the first call, not at startup.
+    """
+    key = (model, temperature)
+    if key not in _clients:
+        from langchain_groq import ChatGroq
+
+        http_client, http_async_client = _shared_http_clients()
+        _clients[key] = ChatGroq(
+            model=model,
+            temperature=temperature,
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            max_retries=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+    return _clients[key]
+
+
+# ----------------------------
+# TOKEN ESTIMATION
+# ----------------------------
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Prompt token estimate. Uses tiktoken's cl100k_base when it is available
+    (close enough to Llama's tokenizer for budgeting); otherwise ~4 chars/token.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _prompt_text(chain, inputs: dict) -> str:
+    # `template | llm` chains: format the prompt the same way the chain will
+    prompt = getattr(chain, "first", None)
+    if prompt is not None and hasattr(prompt, "format"):
+        try:
+            return prompt.format(**inputs)
+        except Exception:
+            pass
+    return " ".join(str(value) for value in inputs.values())
+
+
+# ----------------------------
+# RATE-LIMIT-AWARE SCHEDULER
+# ----------------------------
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (requests bigger than the bucket wait for a full one)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount  # may go negative: the debt is paid back by waiting
+
+
+class LLMGateway:
+    """
+    Single entry point for every LLM call in the app.
+
+    Requests wait in a priority queue (interactive before batch) until a
+    concurrency slot is free and both the requests-per-minute and
+    tokens-per-minute buckets can cover their estimated cost. A 429 pauses
+    the whole gateway for the server's Retry-After instead of letting every
+    caller retry at once.
+    """
+
+    def __init__(self, max_in_flight: int, rpm: int, tpm: int):
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self._timer = None
+        self._paused_until = 0.0
+        self.stats = {
+            name: {"calls": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "rate_limited": 0, "errors": 0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    # ----------------------------
+    # QUEUE
+    # ----------------------------
+    def _dispatch(self):
+        self._timer = None
+        while self._queue and self.in_flight < self.max_in_flight:
+            _, _, future, cost = self._queue[0]
+            if future.done():  # caller cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+
+            delay = max(
+                self.requests.wait_time(1),
+                self.tokens.wait_time(cost),
+                self._paused_until - time.monotonic(),
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(cost)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _schedule(self):
+        if self._timer is None:
+            self._dispatch()
+
+    async def _acquire(self, cost: int, priority: int):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future, cost))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled right after being granted a slot: hand it back
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def pause(self, seconds: float):
+        """Holds back every queued call for `seconds`, e.g. a 429's Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # ----------------------------
+    # CALLS
+    # ----------------------------
+    async def ainvoke(self, chain, inputs: dict, priority: int = INTERACTIVE):
+        stats = self.stats[PRIORITY_NAMES[priority]]
+        estimated = estimate_tokens(_prompt_text(chain, inputs)) + LLM_EXPECTED_COMPLETION_TOKENS
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            queued_at = time.monotonic()
+            await self._acquire(estimated, priority)
+            waited = time.monotonic() - queued_at
+            stats["calls"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+            try:
+                response = await chain.ainvoke(inputs)
+            except Exception as e:
+                retry_after = _rate_limit_retry_after(e)
+                if retry_after is None or attempt == LLM_MAX_RETRIES:
+                    stats["errors"] += 1
+                    raise
+                stats["rate_limited"] += 1
+                self.pause(retry_after)
+                continue
+            finally:
+                self._release()
+
+            # Settle the token bucket with the real usage when the API reports it
+            usage = getattr(response, "usage_metadata", None) or {}
+            if usage.get("total_tokens"):
+                self.tokens.take(usage["total_tokens"] - estimated)
+            return response
+
+    async def astream(self, chain, inputs: dict, priority: int = INTERACTIVE):
+        """
+        Like ainvoke, but yields the response text as the model generates it.
+        The slot is held until the stream ends; only errors raised before the
+        first chunk (e.g. a 429) are retried.
+        """
+        stats = self.stats[PRIORITY_NAMES[priority]]
+        estimated = estimate_tokens(_prompt_text(chain, inputs)) + LLM_EXPECTED_COMPLETION_TOKENS
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            queued_at = time.monotonic()
+            await self._acquire(estimated, priority)
+            waited = time.monotonic() - queued_at
+            stats["calls"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+            started = False
+            usage = {}
+            try:
+                async for chunk in chain.astream(inputs):
+                    started = True
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    yield chunk.content
+            except Exception as e:
+                retry_after = _rate_limit_retry_after(e)
+                if started or retry_after is None or attempt == LLM_MAX_RETRIES:
+                    stats["errors"] += 1
+                    raise
+                stats["rate_limited"] += 1
+                self.pause(retry_after)
+                continue
+            finally:
+                self._release()
+
+            if usage.get("total_tokens"):
+                self.tokens.take(usage["total_tokens"] - estimated)
+            return
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(1 for _, _, future, _ in self._queue if not future.done()),
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "priorities": {
+                name: {
+                    **stats,
+                    "wait_seconds_total": round(stats["wait_seconds_total"], 4),
+                    "wait_seconds_max": round(stats["wait_seconds_max"], 4),
+                    "wait_seconds_avg": round(stats["wait_seconds_total"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                }
+                for name, stats in self.stats.items()
+            },
+        }
+
+
+def _rate_limit_retry_after(error: Exception):
+    """Seconds to back off if `error` is a 429, else None."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+    try:
+        return max(float(response.headers.get("retry-after", "1")), 0.5)
+    except (AttributeError, ValueError):
+        return 1.0
+
+
+llm_gateway = LLMGateway(LLM_CONCURRENCY, GROQ_RPM, GROQ_TPM)
+
+
+async def invoke_llm(chain, inputs: dict, priority: int = INTERACTIVE):
+    """Runs `chain.ainvoke(inputs)` through the shared, rate-limited gateway."""
+    return await llm_gateway.ainvoke(chain, inputs, priority)
+
+
+def stream_llm(chain, inputs: dict, priority: int = INTERACTIVE):
+    """Runs `chain.astream(inputs)` through the gateway; an async iterator of response text."""
+    return llm_gateway.astream(chain, inputs, priority)
@@ -0,0 +1,288 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from services.concurrency import run_in_process
+from services.extraction import extract_with_usage
+
+# ----------------------------
+# Stage timing + Prometheus metrics
+# ----------------------------
+# Every request gets its own stage timings (extract / ocr / llm / postprocess)
+# through a context variable, so tasks spawned by a request (batch items)
+# report into it too. The timings go out as a `Server-Timing` header and
+# into per-route, per-stage histograms served by /metrics.
+STAGES = ("extract", "ocr", "llm", "postprocess")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Pipelines running outside a request (job workers) are labelled with this route
+BACKGROUND_ROUTE = "background"
+
+
+# ----------------------------
+# METRIC TYPES
+# ----------------------------
+def _label_text(names, values) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_text(names, key + (bound,))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(names, key + ('+Inf',))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {series[-1]}")
+        return lines
+
+
+# ----------------------------
+# REGISTRY
+# ----------------------------
+request_duration = Histogram(
+    "resume_parser_request_duration_seconds", "Time until the response starts, per route.", ("route", "method", "status")
+)
+stage_duration = Histogram(
+    "resume_parser_stage_duration_seconds", "Time spent per pipeline stage, per route.", ("route", "stage")
+)
+ocr_fallbacks = Counter(
+    "resume_parser_ocr_fallbacks_total", "PDFs that needed OCR for at least one page.", ("route",)
+)
+ocr_pages = Counter(
+    "resume_parser_ocr_pages_total", "Pages sent to OCR because their text layer was unusable.", ("route",)
+)
+json_repair_fallbacks = Counter(
+    "resume_parser_json_repair_fallbacks_total",
+    "LLM outputs that were not valid JSON after cleanup (outcome: repaired or failed).",
+    ("route", "outcome"),
+)
+prompt_tokens = Counter(
+    "resume_parser_prompt_tokens_total",
+    "Estimated resume-text tokens before and after prompt compression (stage: raw or sent).",
+    ("route", "stage"),
+)
+reask_fields = Counter(
+    "resume_parser_reask_fields_total",
+    "Fields re-asked after failing schema validation (outcome: fixed or failed).",
+    ("route", "outcome"),
+)
+llm_routing = Counter(
+    "resume_parser_llm_routing_total",
+    "LLM calls re-routed to the secondary backend (event: failover, hedged or hedge_won).",
+    ("route", "endpoint", "event"),
+)
+cache_lookups = Counter(
+    "resume_parser_cache_lookups_total", "Result cache lookups (result: hit or miss; tier on hits).", ("route", "result", "tier")
+)
+chunked_parse_chunks = Histogram(
+    "resume_parser_chunked_parse_chunks", "Chunks (LLM calls) per chunked parse.", ("route",), buckets=(1, 2, 4, 8, 16, 32)
+)
+
+METRICS = (
+    request_duration, stage_duration, ocr_fallbacks, ocr_pages, json_repair_fallbacks, prompt_tokens, reask_fields,
+    llm_routing, cache_lookups, chunked_parse_chunks,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# PER-REQUEST TIMINGS
+# ----------------------------
+class RequestTimings:
+    def __init__(self, scope: dict = None):
+        self.scope = scope
+        self.stages = {}
+        self.prompt = None  # compression stats of the request's prompt, if any
+
+    @property
+    def route(self) -> str:
+        if self.scope is None:
+            return BACKGROUND_ROUTE
+        # The router stores the matched route in the scope: label by its
+        # template (/jobs/{job_id}), not the raw path
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"{stage};dur={self.stages[stage] * 1000:.1f}" for stage in STAGES if stage in self.stages]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_route() -> str:
+    timings = _current.get()
+    return timings.route if timings is not None else BACKGROUND_ROUTE
+
+
+def record_stage(stage: str, seconds: float):
+    timings = _current.get()
+    route = BACKGROUND_ROUTE
+    if timings is not None:
+        timings.stages[stage] = timings.stages.get(stage, 0.0) + seconds
+        route = timings.route
+    stage_duration.observe(seconds, route=route, stage=stage)
+
+
+@contextmanager
+def timed(stage: str):
+    """Adds the wrapped block's wall time to `stage` for the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+async def run_extraction(func, *args) -> str:
+    """
+    `run_in_process(func, *args)` that also records the "extract" and "ocr"
+    stages (measured inside the worker, so queueing for a process isn't
+    counted) and the OCR fallback counters.
+    """
+    text, usage = await run_in_process(extract_with_usage, func, *args)
+    record_stage("extract", max(usage["seconds"] - usage["ocr_seconds"], 0.0))
+    if usage["ocr_fallbacks"]:
+        route = current_route()
+        record_stage("ocr", usage["ocr_seconds"])
+        ocr_fallbacks.inc(route=route)
+        ocr_pages.inc(usage["ocr_pages"], route=route)
+    return text
+
+
+def record_cache_lookup(tier):
+    if tier is None:
+        cache_lookups.inc(route=current_route(), result="miss")
+    else:
+        cache_lookups.inc(route=current_route(), result="hit", tier=tier)
+
+
+def record_json_repair(outcome: str):
+    json_repair_fallbacks.inc(route=current_route(), outcome=outcome)
+
+
+def record_reask(fixed: int, failed: int):
+    route = current_route()
+    if fixed:
+        reask_fields.inc(fixed, route=route, outcome="fixed")
+    if failed:
+        reask_fields.inc(failed, route=route, outcome="failed")
+
+
+def record_llm_routing(endpoint: str, event: str):
+    llm_routing.inc(route=current_route(), endpoint=endpoint, event=event)
+
+
+def record_chunked_parse(chunks: int):
+    chunked_parse_chunks.observe(chunks, route=current_route())
+
+
+def record_prompt_compression(stats: dict):
+    """Counts tokens saved by services.compression and reports them on the response."""
+    route = current_route()
+    prompt_tokens.inc(stats["tokens_before"], route=route, stage="raw")
+    prompt_tokens.inc(stats["tokens_after"], route=route, stage="sent")
+    timings = _current.get()
+    if timings is not None:
+        timings.prompt = stats
+
+
+# ----------------------------
+# MIDDLEWARE
+# ----------------------------
+class MetricsMiddleware:
+    """
+    Starts a fresh set of stage timings for every HTTP request, adds the
+    `Server-Timing` header (plus `X-Prompt-Tokens` / `X-Prompt-Tokens-Saved`
+    when a prompt was compressed) when the response starts and records the
+    request duration histogram. Streaming responses start before their work is done,
+    so their header only carries what ran before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(total).encode("latin-1")))
+                if timings.prompt is not None:
+                    headers.append((b"x-prompt-tokens", str(timings.prompt["tokens_after"]).encode()))
+                    headers.append((b"x-prompt-tokens-saved", str(timings.prompt["tokens_saved"]).encode()))
+                message = {**message, "headers": headers}
+                request_duration.observe(
+                    total, route=timings.route, method=scope.get("method", ""), status=message["status"]
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
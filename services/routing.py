@@ -0,0 +1,442 @@
+import os
+import math
+import time
+import asyncio
+import contextvars
+import importlib.util
+from collections import deque
+from langchain_core.runnables import Runnable
+from services.llm import get_llm, llm_gateway, _rate_limit_retry_after, LLM_TIMEOUT
+from services.json_repair import parse_llm_json
+from services.metrics import record_llm_routing
+
+# ----------------------------
+# Routing settings (override via .env)
+# ----------------------------
+# LLM_ROUTING: how each endpoint uses its backends (per endpoint:
+# LLM_ROUTING_PARSE_RESUME, LLM_ROUTING_EMPLOYEE_PARSER, LLM_ROUTING_ENRICH)
+#   primary   Groq only (default)
+#   fallback  Groq; a failed call (error, 429, outage) is re-sent to the secondary
+#             (a 429 still pauses the LLM gateway for its Retry-After)
+#   hedged    fallback, plus a duplicate request to the secondary when Groq hasn't
+#             answered within its LLM_HEDGE_PERCENTILE latency; the first valid
+#             answer wins and the other call is cancelled
+# LLM_SECONDARY: the secondary backend, "ollama:<model>", "groq:<model>" or "none"
+# (per endpoint: LLM_SECONDARY_PARSE_RESUME, ...)
+# Answers from the secondary are returned but never cached as the primary
+# model's result (see track_backends).
+LLM_ROUTING = os.getenv("LLM_ROUTING", "primary")
+LLM_SECONDARY = os.getenv("LLM_SECONDARY", "ollama:llama3.1:8b")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))  # Ollama's 2048 default would cut our prompts
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "10"))  # seconds, until MIN_SAMPLES latencies are known
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+ROUTING_MODES = ("primary", "fallback", "hedged")
+
+
+def _endpoint_setting(name: str, endpoint: str, default: str) -> str:
+    return os.getenv(f"{name}_{endpoint.upper().replace('-', '_')}", default)
+
+
+# ----------------------------
+# WHICH BACKEND ANSWERED
+# ----------------------------
+# A set per request: RoutedLLM adds "primary" or "secondary" for every answer
+# it returns. Tasks started from the request (gathers, streaming responses)
+# copy the context and so share the same set.
+_answered_by = contextvars.ContextVar("llm_answered_by", default=None)
+
+
+def track_backends() -> set:
+    """Starts recording which backends answer this request's LLM calls; returns the (live) set."""
+    answered = set()
+    _answered_by.set(answered)
+    return answered
+
+
+def answered_by_primary(answered: set) -> bool:
+    """True when no call of the request was answered by the secondary, i.e. the result may be cached."""
+    return "secondary" not in answered
+
+
+def _answered(backend: str):
+    answered = _answered_by.get()
+    if answered is not None:
+        answered.add(backend)
+
+
+# ----------------------------
+# LATENCY WINDOW
+# ----------------------------
+class LatencyWindow:
+    """The last `size` latencies of a backend, for percentile thresholds."""
+
+    def __init__(self, size: int = LLM_LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(math.ceil(p / 100 * len(ordered)) - 1, 0))]
+
+
+def _note_rate_limit(error: Exception):
+    """
+    A primary 429 that is answered by the secondary never reaches the
+    gateway's retry loop; pause the gateway for its Retry-After anyway, so
+    the rate-limited primary isn't hit again straight away.
+    """
+    retry_after = _rate_limit_retry_after(error)
+    if retry_after is not None:
+        llm_gateway.pause(retry_after)
+
+
+def _is_valid(message) -> bool:
+    """An answer counts when it holds a JSON object (every prompt here asks for one)."""
+    try:
+        parse_llm_json(getattr(message, "content", message))
+        return True
+    except ValueError:
+        return False
+
+
+async def _first_chunk(iterator):
+    try:
+        return True, await iterator.__anext__()
+    except StopAsyncIteration:
+        return False, None
+
+
+async def _close(tasks, iterators=None):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for task in tasks:
+        if iterators and task in iterators:
+            try:
+                await iterators[task].aclose()
+            except Exception:
+                pass
+
+
+class LazyBackend:
+    """
+    A backend built on first use: ChatGroq / ChatOllama and their SDKs take
+    about a second to import, which the server shouldn't pay before it can
+    answer its first request.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._backend = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._backend is not None
+
+    def get(self):
+        if self._backend is None:
+            self._backend = self.factory()
+        return self._backend
+
+
+# ----------------------------
+# ROUTED CHAT MODEL
+# ----------------------------
+class RoutedLLM(Runnable):
+    """
+    A chat model for `template | llm` chains that routes each call between a
+    primary and a secondary backend (any Runnables: ChatGroq, ChatOllama or
+    a fake). In "fallback" mode errors go to the secondary; in "hedged" mode
+    a slow primary also gets a duplicate request on the secondary after its
+    hedge delay (the LLM_HEDGE_PERCENTILE of its recent latencies, or
+    LLM_HEDGE_AFTER until enough are known) and the first valid answer wins.
+    Streams race to the first chunk; after that they can't switch backends.
+    Either backend may be a LazyBackend, built on its first call (or load()).
+    Each answer is recorded as the primary's or the secondary's for the
+    request's track_backends() set.
+    """
+
+    def __init__(
+        self,
+        primary,
+        secondary=None,
+        mode: str = "fallback",
+        endpoint: str = "llm",
+        hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        hedge_after: float = LLM_HEDGE_AFTER,
+    ):
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown LLM routing mode {mode!r} (use one of {', '.join(ROUTING_MODES)}).")
+        self._primary = primary
+        self._secondary = secondary
+        self.mode = mode if secondary is not None else "primary"
+        self.endpoint = endpoint
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.hedge_after = hedge_after
+        self.latency = LatencyWindow()      # primary: whole answers
+        self.first_chunk = LatencyWindow()  # primary: time to first streamed chunk
+        self.stats = {"calls": 0, "failovers": 0, "hedges": 0, "hedges_won": 0, "errors": 0}
+
+    @property
+    def primary(self):
+        return self._primary.get() if isinstance(self._primary, LazyBackend) else self._primary
+
+    @property
+    def secondary(self):
+        return self._secondary.get() if isinstance(self._secondary, LazyBackend) else self._secondary
+
+    @property
+    def loaded(self) -> bool:
+        return all(
+            not isinstance(backend, LazyBackend) or backend.loaded for backend in (self._primary, self._secondary)
+        )
+
+    def load(self):
+        """Builds lazy backends now (startup warm-up) instead of on the first call."""
+        for backend in (self._primary, self._secondary):
+            if isinstance(backend, LazyBackend):
+                backend.get()
+
+    def hedge_delay(self, window: LatencyWindow = None) -> float:
+        window = self.latency if window is None else window
+        if len(window) < self.min_samples:
+            return self.hedge_after
+        return window.percentile(self.hedge_percentile)
+
+    def _record(self, event: str):
+        self.stats[{"failover": "failovers", "hedged": "hedges", "hedge_won": "hedges_won"}[event]] += 1
+        record_llm_routing(self.endpoint, event)
+
+    # ----------------------------
+    # CALLS
+    # ----------------------------
+    def invoke(self, input, config=None, **kwargs):
+        self.stats["calls"] += 1
+        try:
+            answer = self.primary.invoke(input, config, **kwargs)
+            _answered("primary")
+            return answer
+        except Exception as e:
+            if self.mode == "primary":
+                self.stats["errors"] += 1
+                raise
+            _note_rate_limit(e)
+            print(f"⚠️ LLM failover ({self.endpoint}):", e)
+            self._record("failover")
+            answer = self.secondary.invoke(input, config, **kwargs)
+            _answered("secondary")
+            return answer
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.primary.ainvoke(input, config, **kwargs))
+        secondary = None
+        tasks = {primary}
+        errors = {}
+        unparsed = None  # (task, answer) without JSON, returned if nothing better arrives
+        try:
+            while True:
+                timeout = None
+                if self.mode == "hedged" and secondary is None:
+                    timeout = max(self.hedge_delay() - (time.monotonic() - started), 0)
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # The primary is slower than usual: race a duplicate on the secondary
+                    secondary = asyncio.ensure_future(self.secondary.ainvoke(input, config, **kwargs))
+                    tasks.add(secondary)
+                    self._record("hedged")
+                    continue
+
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is not None:
+                        errors[task] = task.exception()
+                        if task is primary and self.mode != "primary":
+                            _note_rate_limit(errors[task])
+                        continue
+                    if task is primary:
+                        self.latency.add(time.monotonic() - started)
+                    if _is_valid(task.result()):
+                        if task is secondary and primary not in errors:
+                            self._record("hedge_won")
+                        _answered("primary" if task is primary else "secondary")
+                        return task.result()
+                    unparsed = unparsed or (task, task.result())
+
+                if tasks:
+                    continue
+                if secondary is None and primary in errors and self.mode != "primary":
+                    print(f"⚠️ LLM failover ({self.endpoint}):", errors[primary])
+                    secondary = asyncio.ensure_future(self.secondary.ainvoke(input, config, **kwargs))
+                    tasks.add(secondary)
+                    self._record("failover")
+                    continue
+                if unparsed is not None:
+                    _answered("primary" if unparsed[0] is primary else "secondary")
+                    return unparsed[1]
+                self.stats["errors"] += 1
+                raise errors.get(primary) or errors[secondary]
+        finally:
+            # A primary cancelled after losing a hedge isn't sampled: its
+            # elapsed time would push the threshold up after every hedge
+            await _close(tasks)
+
+    async def astream(self, input, config=None, **kwargs):
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        iterators = {}
+
+        def start(backend):
+            iterator = backend.astream(input, config, **kwargs).__aiter__()
+            task = asyncio.ensure_future(_first_chunk(iterator))
+            iterators[task] = iterator
+            return task
+
+        primary = start(self.primary)
+        secondary = None
+        tasks = {primary}
+        errors = {}
+        winner = None
+        try:
+            while winner is None:
+                timeout = None
+                if self.mode == "hedged" and secondary is None:
+                    timeout = max(self.hedge_delay(self.first_chunk) - (time.monotonic() - started), 0)
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    secondary = start(self.secondary)
+                    tasks.add(secondary)
+                    self._record("hedged")
+                    continue
+
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is not None:
+                        errors[task] = task.exception()
+                        if task is primary and self.mode != "primary":
+                            _note_rate_limit(errors[task])
+                        continue
+                    if task is primary:
+                        self.first_chunk.add(time.monotonic() - started)
+                    if winner is None:
+                        winner = task
+
+                if winner is not None or tasks:
+                    continue
+                if secondary is None and self.mode != "primary":
+                    print(f"⚠️ LLM failover ({self.endpoint}):", errors[primary])
+                    secondary = start(self.secondary)
+                    tasks.add(secondary)
+                    self._record("failover")
+                    continue
+                self.stats["errors"] += 1
+                raise errors.get(primary) or errors[secondary]
+        finally:
+            await _close(tasks, iterators)
+
+        if winner is secondary and primary not in errors:
+            self._record("hedge_won")
+        _answered("primary" if winner is primary else "secondary")
+        got_chunk, chunk = winner.result()
+        if not got_chunk:
+            return
+        iterator = iterators[winner]
+        try:
+            yield chunk
+            async for chunk in iterator:
+                yield chunk
+        finally:
+            await iterator.aclose()
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": self.mode,
+            "hedge_after_seconds": round(self.hedge_delay(), 3) if self.mode == "hedged" else None,
+            "latency_samples": len(self.latency),
+            "loaded": self.loaded,
+            **self.stats,
+        }
+
+
+# ----------------------------
+# BACKENDS + PER-ENDPOINT ROUTES
+# ----------------------------
+ROUTES = {}
+
+
+def make_backend(spec: str, temperature: float = 0):
+    """A chat model from a backend spec ("ollama:<model>", "groq:<model>"); None for "none"."""
+    kind, _, model = spec.partition(":")
+    if kind == "groq":
+        return get_llm(model, temperature)
+    if kind == "ollama":
+        try:
+            from langchain_ollama import ChatOllama
+        except ImportError:
+            print("⚠️ langchain-ollama is not installed; running without a local LLM backend")
+            return None
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
+            base_url=OLLAMA_BASE_URL,
+            num_ctx=OLLAMA_NUM_CTX,
+            client_kwargs={"timeout": LLM_TIMEOUT},
+        )
+    if kind != "none":
+        print(f"⚠️ Unknown LLM backend {spec!r}; running without a secondary backend")
+    return None
+
+
+def backend_available(spec: str) -> bool:
+    """Whether make_backend(spec) can build a backend, checked without importing its SDK."""
+    kind = spec.partition(":")[0]
+    if kind == "groq":
+        return True
+    if kind == "ollama":
+        if importlib.util.find_spec("langchain_ollama") is None:
+            print("⚠️ langchain-ollama is not installed; running without a local LLM backend")
+            return False
+        return True
+    if kind != "none":
+        print(f"⚠️ Unknown LLM backend {spec!r}; running without a secondary backend")
+    return False
+
+
+def get_routed_llm(endpoint: str, model: str, temperature: float = 0) -> RoutedLLM:
+    """
+    The endpoint's Groq model behind a RoutedLLM configured by its
+    LLM_ROUTING / LLM_SECONDARY settings. The clients are built lazily.
+    """
+    mode = _endpoint_setting("LLM_ROUTING", endpoint, LLM_ROUTING)
+    secondary = None
+    if mode != "primary":
+        spec = _endpoint_setting("LLM_SECONDARY", endpoint, LLM_SECONDARY)
+        if backend_available(spec):
+            secondary = LazyBackend(lambda: make_backend(spec, temperature))
+    primary = LazyBackend(lambda: get_llm(model, temperature))
+    ROUTES[endpoint] = RoutedLLM(primary, secondary, mode, endpoint)
+    return ROUTES[endpoint]
+
+
+def load_routes():
+    """Builds every route's LLM clients (startup warm-up)."""
+    for route in ROUTES.values():
+        route.load()
+
+
+def routing_snapshot() -> dict:
+    return {endpoint: route.snapshot() for endpoint, route in ROUTES.items()}
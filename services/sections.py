@@ -0,0 +1,155 @@
+import re
+
+# ----------------------------
+# SECTION INDEX
+# ----------------------------
+# One pass over the resume text records where every known section heading
+# starts. Section-aware preprocessing (removing publications, pulling out
+# supervision lists, prompt compression) then works on slices of that index
+# instead of re-running whole-text regexes.
+#
+# Multi-word academic headings ("RESEARCH PUBLICATIONS", "M.S. STUDENTS
+# SUPERVISED", ...) are matched anywhere, as the old preprocessors did.
+# Generic one- or two-word headings ("PROJECTS", "REFERENCES", ...) only count
+# when they are a line of their own, so prose like "led three projects" is
+# never mistaken for a heading.
+#
+# Patterns are lowercase and run case-sensitively over `text.lower()`:
+# IGNORECASE alternations defeat the regex engine's literal-prefix search and
+# are several times slower on long CVs.
+INLINE_HEADINGS = (
+    ("publications", r"research\s*publications"),
+    ("ms_supervised", r"\bm\.?\s?s\.?\s*students?\s*supervised"),
+    ("phd_supervised", r"\bph\.?\s?d\.?\s*students?\s*supervised"),
+)
+LINE_HEADINGS = (
+    ("summary", r"(?:professional\s+)?summary|profile|about\s+me|(?:career\s+)?objective"),
+    ("experience", r"(?:work\s+|professional\s+|teaching\s+)?experience|employment(?:\s+history)?|work\s+history"),
+    ("education", r"education|academic\s+qualifications?|qualifications"),
+    ("skills", r"(?:technical\s+|key\s+)?skills|core\s+competencies"),
+    ("projects", r"(?:research\s+)?projects"),
+    ("publications", r"(?:journal\s+)?publications"),
+    ("conferences", r"conferences?(?:\s+papers)?"),
+    ("books", r"books?(?:\s+authorship|\s+chapters)?"),
+    ("guest_editor", r"(?:journal\s+)?guest\s+editor\w*"),
+    ("certifications", r"certifications?|certificates|licenses"),
+    ("awards", r"awards|achievements|honou?rs(?:\s+(?:and|&)\s+awards)?"),
+    ("activities", r"(?:professional\s+)?activities|volunteer(?:ing)?"),
+    ("training", r"(?:professional\s+)?trainings?"),
+    ("memberships", r"memberships?(?:\s+(?:and|&)\s+other\s+associations)?"),
+    ("supervision", r"(?:students?\s+)?supervision"),
+    ("languages", r"languages"),
+    ("interests", r"interests|hobbies"),
+    ("references", r"references?|referees"),
+)
+
+_HEADINGS = INLINE_HEADINGS + LINE_HEADINGS
+_GROUPS = {f"h{i}": section for i, (section, _) in enumerate(_HEADINGS)}
+
+
+def _named(start: int, headings: tuple) -> str:
+    return "|".join(f"(?P<h{start + i}>{pattern})" for i, (_, pattern) in enumerate(headings))
+
+
+# Scan patterns (over lowercased text)
+_PUBLICATIONS = re.compile(INLINE_HEADINGS[0][1])
+_SUPERVISED = re.compile(r"students?\s*supervised")
+_DEGREE_BEFORE = re.compile(r"(?<![a-z0-9])(?:(?P<ms_supervised>m\.?\s?s\.?)|(?P<phd_supervised>ph\.?\s?d\.?))\s*$")
+_LINE_HEADING = re.compile(
+    rf"^[ \t]*(?:[-•][ \t]*)?(?:{_named(len(INLINE_HEADINGS), LINE_HEADINGS)})[ \t]*:?[ \t]*$",
+    re.MULTILINE,
+)
+# Slow path for text whose lowercase form changes length (rare non-ASCII case mappings)
+_ANY_HEADING = re.compile(
+    _named(0, INLINE_HEADINGS) + rf"|^[ \t]*(?:[-•][ \t]*)?(?:{_named(len(INLINE_HEADINGS), LINE_HEADINGS)})[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Whole-line check used by heading_of()
+_HEADING_LINE = re.compile(rf"(?:{_named(0, _HEADINGS)})[ \t]*:?", re.IGNORECASE)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def collapse_whitespace(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def heading_of(line: str):
+    """Section name if the whole (cleaned) line is a known heading, else None."""
+    if len(line) > 60:
+        return None
+    match = _HEADING_LINE.fullmatch(line.strip().lstrip("-•").strip())
+    return _GROUPS[match.lastgroup] if match else None
+
+
+def _scan(text: str) -> list:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return [
+            (match.start(match.lastgroup), match.end(match.lastgroup), _GROUPS[match.lastgroup])
+            for match in _ANY_HEADING.finditer(text)
+        ]
+
+    headings = [(match.start(), match.end(), "publications") for match in _PUBLICATIONS.finditer(lowered)]
+
+    # "students supervised" is a cheap literal to find; the degree is checked just before it
+    for match in _SUPERVISED.finditer(lowered):
+        degree = _DEGREE_BEFORE.search(lowered, max(0, match.start() - 16), match.start())
+        if degree:
+            headings.append((degree.start(), match.end(), degree.lastgroup))
+
+    for match in _LINE_HEADING.finditer(lowered):
+        headings.append((match.start(match.lastgroup), match.end(match.lastgroup), _GROUPS[match.lastgroup]))
+
+    headings.sort()
+    return headings
+
+
+class SectionIndex:
+    """
+    Heading offsets of one resume text: `headings` is a list of
+    (start, end, section) in document order. A section runs from its heading
+    to the next indexed heading (or the end of the text).
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.headings = _scan(text)
+
+    def spans(self, section: str) -> list:
+        """(start, end) of every occurrence of `section`, heading included."""
+        result = []
+        for i, (start, _, name) in enumerate(self.headings):
+            if name == section:
+                end = self.headings[i + 1][0] if i + 1 < len(self.headings) else len(self.text)
+                result.append((start, end))
+        return result
+
+    def section(self, section: str) -> str:
+        """Text of every occurrence of `section`, whitespace collapsed ("" if absent)."""
+        return " ".join(collapse_whitespace(self.text[start:end]) for start, end in self.spans(section))
+
+    def segments(self) -> list:
+        """(section, text) for every indexed section in document order; the text before the first heading has section None."""
+        bounds = [0] + [start for start, _, _ in self.headings] + [len(self.text)]
+        names = [None] + [name for _, _, name in self.headings]
+        return [
+            (name, self.text[bounds[i]:bounds[i + 1]])
+            for i, name in enumerate(names)
+            if self.text[bounds[i]:bounds[i + 1]].strip()
+        ]
+
+    def header(self) -> str:
+        """The text before the first indexed heading (name and contact details)."""
+        return self.text[:self.headings[0][0]] if self.headings else self.text
+
+    def without(self, *sections: str, collapse: bool = True) -> str:
+        """The whole text minus the given sections, whitespace collapsed unless `collapse` is False."""
+        removed = sorted(span for section in sections for span in self.spans(section))
+        kept = []
+        position = 0
+        for start, end in removed:
+            kept.append(self.text[position:start])
+            position = max(position, end)
+        kept.append(self.text[position:])
+        return collapse_whitespace(" ".join(kept)) if collapse else "\n".join(kept)
@@ -0,0 +1,174 @@
+import json
+from fastapi.responses import StreamingResponse
+from services.llm import stream_llm, INTERACTIVE
+from services.json_repair import repair_json
+from services.metrics import timed
+
+# ----------------------------
+# INCREMENTAL JSON PARSER
+# ----------------------------
+class IncrementalJSONParser:
+    """
+    Watches a JSON object arrive in pieces and reports each top-level field as
+    soon as its value is complete, plus each element of a top-level array
+    (every experience entry, every skill...) as soon as that element is.
+
+    Every character is scanned once; a finished value is decoded from its own
+    slice of the buffer, so the total work stays linear in the output size.
+    Text before the first "{" (a ```json fence) and after the object is
+    ignored. Values that aren't valid JSON go through services.json_repair;
+    any that still fail are skipped (the endpoint parses the full text at the end).
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._array = False     # current top-level value is an array
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, text: str) -> list:
+        """Adds `text`; returns the events it completed as (event, data) pairs."""
+        self.buffer += text
+        events = []
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            if self._done:
+                break
+            ch = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        try:
+                            self._key = self._decode(self._key_start, i + 1)
+                        except json.JSONDecodeError:
+                            self._key = buffer[self._key_start + 1:i]
+                        self._key_start = None
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if ch in " \t\r\n":
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+                    continue
+            if ch == ":" and self._depth == 1:
+                self._expect_key = False
+                continue
+
+            if ch in ",}]":
+                if self._depth == 2 and self._array and ch in ",]":
+                    self._finish_item(i, events)
+                if ch in "}]":
+                    self._depth -= 1
+                if self._depth == 1 and ch == ",":
+                    self._finish_value(i, events)
+                elif self._depth == 0:
+                    self._finish_value(i, events)
+                    self._done = True
+                continue
+
+            # Start of a value (string, number, literal, object or array)
+            if self._depth == 1 and self._value_start is None and not self._expect_key:
+                self._value_start = i
+                self._array = ch == "["
+                self._item_index = 0
+            elif self._depth == 2 and self._array and self._item_start is None:
+                self._item_start = i
+            if ch in "{[":
+                self._depth += 1
+
+        self._pos = len(buffer)
+        return events
+
+    def _decode(self, start: int, end: int):
+        text = self.buffer[start:end]
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return json.loads(repair_json(text))
+
+    def _finish_item(self, end: int, events: list):
+        if self._item_start is None:
+            return
+        try:
+            value = self._decode(self._item_start, end)
+            events.append(("item", {"field": self._key, "index": self._item_index, "value": value}))
+        except json.JSONDecodeError:
+            pass
+        self._item_start = None
+        self._item_index += 1
+
+    def _finish_value(self, end: int, events: list):
+        if self._value_start is not None and self._key is not None:
+            try:
+                events.append(("field", {"field": self._key, "value": self._decode(self._value_start, end)}))
+            except json.JSONDecodeError:
+                pass
+        self._key = None
+        self._value_start = None
+        self._array = False
+        self._expect_key = True
+
+
+# ----------------------------
+# SERVER-SENT EVENTS
+# ----------------------------
+# Event stream of the /stream endpoints:
+#   field   {"field", "value"}           a top-level field is complete
+#   item    {"field", "index", "value"}  one element of a top-level array is complete
+#   result  <final JSON>                 same body as the blocking endpoint
+#   error   {"error"}                    the LLM call failed mid-stream
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events, headers: dict = None) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+    )
+
+
+async def stream_llm_events(chain, inputs: dict, finish, initial: dict = None, priority: int = INTERACTIVE):
+    """
+    Streams the LLM's answer as SSE events: `initial` fields first (values
+    known before the call, e.g. rule-extracted contacts), then fields and
+    array items as the JSON arrives, then `await finish(full_text)` as the result.
+    """
+    for field, value in (initial or {}).items():
+        yield sse_event("field", {"field": field, "value": value})
+
+    parser = IncrementalJSONParser()
+    try:
+        with timed("llm"):
+            async for text in stream_llm(chain, inputs, priority):
+                for event, data in parser.feed(text):
+                    yield sse_event(event, data)
+        result = await finish(parser.buffer)
+    except Exception as e:
+        print("⚠️ Streaming failed:", e)
+        yield sse_event("error", {"error": str(e)})
+        return
+    yield sse_event("result", result)
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------
+# Upload limits (override via .env)
+# ----------------------------
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+
+# Room for multipart boundaries / headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+MAGIC_BYTES = {
+    "pdf": (b"%PDF-",),
+    "docx": (b"PK\x03\x04",),  # DOCX is a zip container
+    "zip": (b"PK\x03\x04",),
+    "image": (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"RIFF"),  # JPEG, PNG, WebP (RIFF....WEBP)
+}
+
+# Accepted uploads by extension -> the kind their content is checked and extracted as
+UPLOAD_KINDS = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".png": "image",
+    ".webp": "image",
+}
+UNSUPPORTED_FILE_TYPE = "Unsupported file type. Please upload PDF, DOCX or an image (JPG, PNG, WebP) only."
+
+# Page objects are "/Type /Page" (the tree nodes are "/Type /Pages")
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PAGE_PATTERN_TAIL = 32
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def format_size(num_bytes: int) -> str:
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.0f} MB"
+    return f"{num_bytes / 1024:.0f} KB"
+
+
+def matches_magic(first_chunk: bytes, kind: str) -> bool:
+    if kind == "image" and first_chunk.startswith(b"RIFF"):
+        return first_chunk[8:12] == b"WEBP"
+    return any(first_chunk.startswith(signature) for signature in MAGIC_BYTES[kind])
+
+
+def upload_kind(filename: str):
+    """"pdf", "docx" or "image" for a supported upload, by extension; None otherwise."""
+    return UPLOAD_KINDS.get(os.path.splitext((filename or "").lower())[1])
+
+
+# ----------------------------
+# CHUNKED INGESTION
+# ----------------------------
+class UploadScanner:
+    """
+    Checks an upload incrementally as chunks arrive:
+    - 415 if the first chunk's magic bytes don't match `expected_kind`
+    - 413 as soon as the running size passes `max_bytes`
+    - 413 as soon as the running PDF page count passes `max_pages`
+
+    The page count is a streaming scan for page objects; PDFs that hide
+    their page tree in compressed object streams are not counted, and for
+    those the extraction character budget is the remaining safeguard.
+    """
+
+    def __init__(self, expected_kind: str, max_bytes: int = None, max_pages: int = None):
+        self.expected_kind = expected_kind
+        self.max_bytes = max_bytes or MAX_UPLOAD_BYTES
+        self.max_pages = max_pages or MAX_PDF_PAGES
+        self.size = 0
+        self.pages = 0
+        self._counted_upto = 0  # absolute offset up to which page markers are counted
+        self._tail = b""
+
+    def feed(self, chunk: bytes):
+        if self.size == 0 and not matches_magic(chunk, self.expected_kind):
+            label = "JPG, PNG or WebP image" if self.expected_kind == "image" else f"{self.expected_kind.upper()} document"
+            raise UploadRejected(415, f"File content is not a valid {label}.")
+
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected(413, f"File too large. Maximum size is {format_size(self.max_bytes)}.")
+
+        if self.expected_kind == "pdf":
+            # Scan the new chunk plus a short tail of the previous one, so a
+            # marker split across chunks is still seen exactly once. A marker
+            # touching the end of the data waits for the next chunk, which
+            # decides whether it is "/Page" or "/Pages".
+            window = self._tail + chunk
+            window_start = self.size - len(window)
+            for match in _PAGE_OBJECT.finditer(window):
+                end = window_start + match.end()
+                if self._counted_upto < end < self.size:
+                    self.pages += 1
+            self._counted_upto = self.size - 1
+            self._tail = window[-_PAGE_PATTERN_TAIL:]
+            if self.pages > self.max_pages:
+                raise UploadRejected(413, f"Too many pages. Maximum is {self.max_pages} pages.")
+
+
+async def read_upload(file, expected_kind: str, max_bytes: int = None, max_pages: int = None) -> bytes:
+    """Reads an UploadFile chunk by chunk, rejecting it as early as possible (see UploadScanner)."""
+    scanner = UploadScanner(expected_kind, max_bytes, max_pages)
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        scanner.feed(chunk)
+        buffer += chunk
+
+    if not buffer:
+        raise UploadRejected(400, "Uploaded file is empty.")
+    return bytes(buffer)
+
+
+def check_upload_bytes(data: bytes, expected_kind: str, max_bytes: int = None, max_pages: int = None) -> bytes:
+    """Same checks as read_upload() for data that is already in memory (e.g. ZIP entries)."""
+    if not data:
+        raise UploadRejected(400, "Uploaded file is empty.")
+    UploadScanner(expected_kind, max_bytes, max_pages).feed(data)
+    return data
+
+
+# ----------------------------
+# REQUEST SIZE GATE (ASGI middleware)
+# ----------------------------
+class UploadSizeLimitMiddleware:
+    """
+    Rejects uploads whose declared Content-Length is over the limit for their
+    route with a 413, before the body is received or spooled by the
+    multipart parser. Requests without a Content-Length are still capped by
+    read_upload() while reading.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits  # {path: max request body bytes}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.limits:
+            limit = self.limits[scope["path"]]
+            headers = dict(scope["headers"])
+            content_length = headers.get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > limit:
+                body = json.dumps({"error": f"Request too large. Maximum size is {format_size(limit)}."}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 413,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
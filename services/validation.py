@@ -0,0 +1,176 @@
+import os
+import json
+from langchain_core.prompts import PromptTemplate
+from services.llm import invoke_llm, estimate_tokens, INTERACTIVE
+from services.sections import SectionIndex
+from services.json_repair import parse_llm_json
+from services.metrics import timed, record_reask
+
+# ----------------------------
+# SCHEMA VALIDATION + TARGETED RE-ASK
+# ----------------------------
+# A schema is the JSON shape a prompt asks for, written as an example value:
+#   ""                      a string
+#   [""]                    a list of strings
+#   [{"role": "", ...}]     a list of objects with those keys
+# When an answer misses fields or has them in the wrong shape, one small
+# follow-up call asks for just those fields, with an excerpt of the sections
+# they come from, and the answer is merged back. The rest of the first
+# answer is kept, so a bad field no longer costs a whole new request.
+REASK_ENABLED = os.getenv("REASK_ENABLED", "1") == "1"
+REASK_CONTEXT_TOKENS = int(os.getenv("REASK_CONTEXT_TOKENS", "800"))
+
+reask_template = PromptTemplate(
+    input_variables=["task", "problems", "json_structure", "context"],
+    template="""
+Your previous answer had missing or invalid values for these fields:
+{problems}
+
+{task} Answer for these fields only.
+
+Return **only valid JSON** with exactly this structure:
+
+{json_structure}
+
+Context:
+{context}
+"""
+)
+
+
+def _describe(shape) -> str:
+    if isinstance(shape, list):
+        if shape and isinstance(shape[0], dict):
+            return "a list of objects with " + ", ".join(f'"{key}"' for key in shape[0])
+        return "a list of strings"
+    return "a string"
+
+
+def field_problem(value, shape):
+    """Why `value` doesn't fit `shape`, or None if it does."""
+    if not isinstance(shape, list):
+        return None if isinstance(value, (str, int, float)) else f"expected {_describe(shape)}"
+    if not isinstance(value, list):
+        return f"expected {_describe(shape)}"
+    item_shape = shape[0] if shape else ""
+    for item in value:
+        if isinstance(item_shape, dict):
+            # A plain string is fine for one-key objects ("certifications (name)"): normalization wraps it
+            if isinstance(item, dict) or (isinstance(item, str) and len(item_shape) == 1):
+                continue
+        elif isinstance(item, (str, int, float)):
+            continue
+        return f"expected {_describe(shape)}"
+    return None
+
+
+def _is_empty(value) -> bool:
+    return value in ("", None, [], {})
+
+
+def schema_problems(data: dict, schema: dict, required=(), skip=(), allow_empty: bool = False) -> dict:
+    """
+    {field: reason} for every schema field of `data` that has the wrong
+    shape, plus `required` fields that are absent (or empty, unless
+    `allow_empty`). Fields in `skip` (already known, e.g. rule-extracted
+    contacts) are not checked.
+    """
+    problems = {}
+    for field, shape in schema.items():
+        if field in skip:
+            continue
+        if field not in data or data[field] is None:
+            if field in required:
+                problems[field] = "missing"
+            continue
+        problem = field_problem(data[field], shape)
+        if problem:
+            problems[field] = problem
+        elif field in required and not allow_empty and _is_empty(data[field]):
+            problems[field] = "empty, but the text has this section"
+    return problems
+
+
+def present_fields(text: str, field_sections: dict) -> set:
+    """Fields whose source sections (field -> section names) have a heading in `text`."""
+    found = {section for _, _, section in SectionIndex(text).headings}
+    return {field for field, sections in field_sections.items() if found.intersection(sections)}
+
+
+def excerpt(text: str, fields, field_sections: dict, max_tokens: int = REASK_CONTEXT_TOKENS) -> str:
+    """
+    The parts of `text` the given fields come from: their sections, plus the
+    text before the first heading for fields without one (name, contacts...).
+    Cut to `max_tokens`.
+    """
+    wanted = set()
+    for field in fields:
+        wanted.update(field_sections.get(field) or (None,))
+    parts = [segment for section, segment in SectionIndex(text).segments() if section in wanted]
+    context = "\n".join(part.strip() for part in parts) or text
+    if estimate_tokens(context) > max_tokens:
+        context = context[: max_tokens * 4]
+    return context
+
+
+async def reask_fields(
+    llm, data: dict, schema: dict, text: str, task: str,
+    field_sections: dict = None, required=(), skip=(), priority: int = INTERACTIVE, allow_empty: bool = False,
+) -> dict:
+    """
+    Validates `data` (a parsed answer, or clean_json_output's {"error", ...}
+    when nothing could be parsed) against `schema` and, if anything is
+    wrong, re-asks once for the broken fields and merges the fixes into it.
+    `text` is the prompt's source text; `field_sections` maps fields to the
+    sections their excerpt is cut from; `required` fields must be present
+    (and non-empty unless `allow_empty`). Returns the (possibly fixed) data;
+    fields still broken after the re-ask are listed under "incomplete_fields"
+    so callers serve the answer but don't cache it.
+    """
+    failed = "error" in data
+    problems = (
+        {field: "missing" for field in schema if field not in skip}
+        if failed else schema_problems(data, schema, required, skip, allow_empty)
+    )
+    if not problems or not REASK_ENABLED:
+        return data
+
+    # After a total failure every field is asked again, so the whole text is needed
+    context = text if failed else excerpt(text, problems, field_sections or {})
+    inputs = {
+        "task": task,
+        "problems": "\n".join(f"- {field}: {reason}" for field, reason in problems.items()),
+        "json_structure": json.dumps({field: schema[field] for field in problems}, indent=2),
+        "context": context,
+    }
+    try:
+        with timed("llm"):
+            response = await invoke_llm(reask_template | llm, inputs, priority)
+        answer, _ = parse_llm_json(response.content)
+    except Exception as e:
+        print("⚠️ Re-ask failed:", e)
+        record_reask(0, len(problems))
+        if not failed:
+            data["incomplete_fields"] = sorted(problems)
+        return data
+    if not isinstance(answer, dict):
+        answer = {}
+
+    # A field counts as fixed when the new value passes the same checks
+    remaining = schema_problems(answer, {field: schema[field] for field in problems}, required, skip, allow_empty)
+    fixed = {
+        field: answer[field] for field in problems
+        if answer.get(field) is not None and field not in remaining
+    }
+    record_reask(len(fixed), len(problems) - len(fixed))
+    if failed:
+        if not fixed:
+            return data
+        data = fixed
+    else:
+        data.update(fixed)
+
+    unresolved = schema_problems(data, {field: schema[field] for field in problems}, required, skip, allow_empty)
+    if unresolved:
+        data["incomplete_fields"] = sorted(unresolved)
+    return data
@@ -0,0 +1,85 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+from services.concurrency import get_process_pool, EXTRACTION_WORKERS
+from services.extraction import load_extractors
+from services.llm import estimate_tokens
+from services.routing import load_routes
+
+load_dotenv()
+
+# ----------------------------
+# STARTUP WARM-UP + READINESS
+# ----------------------------
+# Heavy modules (PyPDF2, pdf2image, pytesseract, langchain-groq,
+# langchain-ollama) and LLM clients are loaded on first use, so the server
+# accepts connections within a second of starting. With WARMUP_ENABLED the
+# same work is done right after startup in the background; /readyz reports
+# 503 until it has finished, while /healthz (liveness) answers at once.
+# With it off, the first requests pay the loading and /readyz is always 200.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") != "0"
+
+
+class Warmup:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.steps = {}  # step -> seconds, or "failed: <error>"
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return not WARMUP_ENABLED or self.finished is not None
+
+    async def _step(self, name: str, work):
+        started = time.monotonic()
+        try:
+            await work()
+            self.steps[name] = round(time.monotonic() - started, 3)
+        except Exception as e:
+            # Still ready: the lazy path retries this on the first request that needs it
+            print(f"⚠️ Warm-up step {name} failed:", e)
+            self.steps[name] = f"failed: {e}"
+
+    async def _extraction(self):
+        await asyncio.to_thread(load_extractors)
+        # Forked after the imports above, so the workers start with them loaded
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, load_extractors) for _ in range(EXTRACTION_WORKERS)))
+
+    async def _llm_clients(self):
+        await asyncio.to_thread(load_routes)
+
+    async def _tokenizer(self):
+        await asyncio.to_thread(estimate_tokens, "warm-up")
+
+    async def run(self):
+        await self._step("extraction", self._extraction)
+        await self._step("llm_clients", self._llm_clients)
+        await self._step("tokenizer", self._tokenizer)
+        self.finished = time.monotonic()
+        print(f"✅ Warm-up finished in {self.finished - self.started:.2f}s")
+
+    def start(self):
+        """Schedules the warm-up on the running loop without waiting for it."""
+        if WARMUP_ENABLED and self._task is None:
+            self.started = time.monotonic()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "warmup_enabled": WARMUP_ENABLED,
+            "warmup_seconds": round(self.finished - self.started, 3) if self.finished else None,
+            "steps": self.steps,
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,7 @@
+import os
+
+# Routers build their LLM clients at import time; tests replace them with fakes
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("GROQ_RPM", "100000")
+os.environ.setdefault("GROQ_TPM", "100000000")
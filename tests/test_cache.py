@@ -0,0 +1,38 @@
+import time
+import asyncio
+from services.cache import ResultCache
+
+
+def make_cache(tmp_path) -> ResultCache:
+    return ResultCache(str(tmp_path / "results.sqlite3"), memory_items=8, max_bytes=1 << 20)
+
+
+def test_async_round_trip_through_both_tiers(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def run():
+        assert await cache.aget("k") == (None, None)
+        await cache.aset("k", {"name": "Jane Roe"})
+        memory = await cache.aget("k")
+        cache._memory.clear()
+        return memory, await cache.aget("k")
+
+    memory, disk = asyncio.run(run())
+    assert memory == ({"name": "Jane Roe"}, "memory")
+    assert disk == ({"name": "Jane Roe"}, "disk")
+
+
+def test_busy_database_does_not_block_the_event_loop(tmp_path):
+    cache = make_cache(tmp_path)
+    cache._db_lock.acquire()  # stands in for a slow SQLite call in another thread
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.3, cache._db_lock.release)
+        lookup = asyncio.create_task(cache.aget("k"))
+        started = time.perf_counter()
+        await asyncio.sleep(0.05)
+        ticked = time.perf_counter() - started
+        await lookup
+        return ticked
+
+    assert asyncio.run(run()) < 0.2
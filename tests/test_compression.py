@@ -0,0 +1,36 @@
+from services.compression import _clean_pages, compress_resume_text
+from services.extraction import PAGE_BREAK
+
+DATE_LINES = ["09/2019", "03/2023", "2015 / 2019", "2011 - 2015", "2019"]
+
+
+def test_date_only_lines_are_kept():
+    text = "\n".join(["Jane Roe", "EXPERIENCE", "Engineer, Acme", *DATE_LINES, "Lead, Initech", "01/2024"])
+    lines = _clean_pages(text)
+    for date in DATE_LINES + ["01/2024"]:
+        assert date in lines
+
+
+def test_date_lines_at_a_page_edge_are_kept():
+    page = "\n".join(["09/2019", "Engineer, Acme", "Built APIs", "2015 / 2019"])
+    lines = _clean_pages(page + PAGE_BREAK + page)
+    assert "09/2019" in lines
+    assert "2015 / 2019" in lines
+
+
+def test_page_numbers_are_removed():
+    pages = [
+        "\n".join(["Jane Roe", "EXPERIENCE", "Engineer, Acme", "1 of 3"]),
+        "\n".join(["2/3", "Lead, Initech", "Built APIs"]),
+        "\n".join(["Page 3 of 3", "SKILLS", "Python", "3"]),
+    ]
+    lines = _clean_pages(PAGE_BREAK.join(pages))
+    assert not {"1 of 3", "2/3", "Page 3 of 3", "3"} & set(lines)
+    assert "Lead, Initech" in lines
+
+
+def test_dates_survive_compression():
+    text = "\n".join(["Jane Roe", "EXPERIENCE", "Engineer, Acme", "09/2019", "03/2023"])
+    compressed, _ = compress_resume_text(text, 1000)
+    assert "09/2019" in compressed
+    assert "03/2023" in compressed
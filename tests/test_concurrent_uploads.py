@@ -0,0 +1,48 @@
+import time
+import asyncio
+import httpx
+from benchmarks.fakes import make_fake_llm
+from services import concurrency, extraction
+
+UPLOADS = 4
+EXTRACT_SECONDS = 0.5
+
+
+def slow_extract(source, max_chars: int = None) -> str:
+    # Blocking on purpose: stands in for PyPDF2 / OCR holding a core
+    time.sleep(EXTRACT_SECONDS)
+    return "Jane Roe\njane.roe@example.com\nSKILLS\nPython, FastAPI"
+
+
+async def post_all(route: str) -> tuple:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        async def one(i):
+            files = {"file": (f"cv_{i}.pdf", f"%PDF-1.4 cv {i}".encode(), "application/pdf")}
+            return (await client.post(route, files=files)).status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(one(i) for i in range(UPLOADS)))
+        return statuses, time.perf_counter() - started
+
+
+def test_concurrent_uploads_finish_in_about_one_extraction(monkeypatch):
+    from routers import parser, employeeParser
+
+    monkeypatch.setitem(extraction.EXTRACTORS, "pdf", slow_extract)
+    monkeypatch.setattr(concurrency, "EXTRACTION_WORKERS", UPLOADS)
+    for module in (parser, employeeParser):
+        monkeypatch.setattr(module, "llm", make_fake_llm(0.05))
+
+    concurrency.shutdown_process_pool()
+    try:
+        # Start the workers first, so process start-up isn't part of the timing
+        list(concurrency.get_process_pool().map(time.sleep, [0.1] * UPLOADS))
+        for route in ("/parse-resume", "/employee-parser"):
+            statuses, seconds = asyncio.run(post_all(route))
+            assert statuses == [200] * UPLOADS
+            assert seconds < EXTRACT_SECONDS * 2, f"{route}: {UPLOADS} uploads took {seconds:.2f}s"
+    finally:
+        concurrency.shutdown_process_pool()
@@ -0,0 +1,55 @@
+from services.contacts import extract_contact_fields, confident_fields, RULES
+
+FIELDS = tuple(RULES)
+
+
+def test_phone_followed_by_a_date_line():
+    text = "Jane Roe\njane.roe@example.com\n0300 1234567\n2015 - 2019\nEXPERIENCE"
+    assert extract_contact_fields(text, FIELDS)["phone"][0] == "0300 1234567"
+
+
+def test_labelled_phone_followed_by_a_date_line():
+    text = "Jane Roe\nPhone: +92 300 1234567\n2015 - 2019"
+    assert extract_contact_fields(text, FIELDS)["phone"] == ("+92 300 1234567", 0.95)
+
+
+def test_job_title_and_location_are_not_names():
+    for first_line in ("Senior Software Engineer", "Lahore Pakistan", "Full Stack Developer"):
+        found = extract_contact_fields(f"{first_line}\nsomeone@example.com", FIELDS)
+        assert "name" not in found
+
+
+def test_uncorroborated_name_is_left_to_the_llm():
+    found = extract_contact_fields("Ayesha Siddiqui\ninfo@company.com", FIELDS)
+    assert found["name"][0] == "Ayesha Siddiqui"
+    assert "name" not in confident_fields(found)
+
+
+def test_name_confirmed_by_email_or_linkedin():
+    for text in ("Jane Roe\njane.roe@example.com", "Jane Roe\nlinkedin.com/in/jane-roe-123"):
+        assert confident_fields(extract_contact_fields(text, FIELDS))["name"] == "Jane Roe"
+
+
+def test_referee_contacts_are_not_the_candidates():
+    text = "\n".join([
+        "Jane Roe", "0300 1234567", "jane.roe@example.com",
+        "EXPERIENCE", "Engineer, Acme",
+        "REFERENCES", "Dr. John Smith, Acme", "Phone: +92 321 7654321", "john.smith@acme.com",
+    ])
+    found = extract_contact_fields(text, FIELDS)
+    assert found["phone"] == ("0300 1234567", 0.75)
+    assert found["email"] == ("jane.roe@example.com", 0.99)
+
+
+def test_contacts_only_in_the_references_are_ignored():
+    text = "Jane Roe\nEXPERIENCE\nEngineer, Acme\nREFERENCES\nPhone: +92 321 7654321\njohn.smith@acme.com"
+    found = extract_contact_fields(text, FIELDS)
+    assert "phone" not in found
+    assert "email" not in found
+
+
+def test_contacts_below_the_header_are_only_a_fallback():
+    text = "Jane Roe\nSUMMARY\nEngineer\nPhone: +92 300 1234567\njane.roe@example.com"
+    found = extract_contact_fields(text, FIELDS)
+    assert found["phone"] == ("+92 300 1234567", 0.75)
+    assert not {"phone", "email"} & set(confident_fields(found))
@@ -0,0 +1,63 @@
+import json
+import asyncio
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from routers import employeeParser
+
+CV = "\n".join([
+    "Jane Roe", "jane.roe@example.com",
+    "EDUCATION", "PhD Computer Science, State University, 2015",
+    "EXPERIENCE", "Professor, State University, 2016 - 2024",
+    "SKILLS", "Python, Machine Learning",
+])
+FIRST_ANSWER = {
+    "experience": [{"role": "Professor", "company": "State University", "years": "2016 - 2024"}],
+    "technicalSkills": [{"category": "Programming", "details": "Python"}],
+}
+EDUCATION = [{"degree": "PhD Computer Science", "institution": "State University", "year": "2015"}]
+
+
+def run(monkeypatch, prompts: list) -> dict:
+    async def extract(extractor, file_bytes, max_chars):
+        return CV
+
+    def answer(prompt):
+        prompts.append(prompt.to_string())
+        return AIMessage(content=json.dumps({"education": EDUCATION}))
+
+    monkeypatch.setattr(employeeParser, "run_extraction", extract)
+    monkeypatch.setattr(employeeParser, "llm", RunnableLambda(answer))
+
+    async def parse():
+        early, request = await employeeParser.prepare_employee("cv.docx", CV.encode())
+        assert early is None
+        return request, await employeeParser.finish_employee(json.dumps(FIRST_ANSWER), request)
+
+    return asyncio.run(parse())
+
+
+def test_section_headings_are_found_in_the_checked_text(monkeypatch):
+    request, _ = run(monkeypatch, [])
+    found = employeeParser.present_fields(request["resume_text"], employeeParser.FIELD_SECTIONS)
+    assert {"education", "experience", "technicalSkills"} <= found
+
+
+def test_missing_section_is_reasked_with_its_excerpt(monkeypatch):
+    prompts = []
+    _, result = run(monkeypatch, prompts)
+    assert result["education"] == EDUCATION
+    assert "incomplete_fields" not in result
+    context = prompts[0].split("Context:", 1)[1]
+    assert "PhD Computer Science" in context
+    assert "Professor, State University" not in context
+
+
+def test_chunked_parse_with_every_chunk_failed_is_an_error(monkeypatch):
+    async def extract(extractor, file_bytes, max_chars):
+        return CV
+
+    monkeypatch.setattr(employeeParser, "run_extraction", extract)
+    monkeypatch.setattr(employeeParser, "llm", RunnableLambda(lambda _: AIMessage(content="not json")))
+    content, status_code, _ = asyncio.run(employeeParser.run_chunked_pipeline("cv.docx", CV.encode()))
+    assert status_code == 502
+    assert "error" in content
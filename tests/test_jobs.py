@@ -0,0 +1,29 @@
+import asyncio
+from services import jobs
+
+
+async def parsed(filename, data, llm_slot, priority):
+    return {"name": "Jane Roe"}, 200, None
+
+
+def test_finished_jobs_are_purged_while_the_server_runs(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs, "JOB_RETENTION_SECONDS", 0.2)
+    monkeypatch.setattr(jobs, "JOB_PURGE_INTERVAL", 0.05)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    store = jobs.JobStore(str(tmp_path / "jobs.sqlite3"))
+    workers = jobs.JobWorkers(store, {"parse-resume": parsed}, 1)
+
+    async def run():
+        workers.start()
+        try:
+            # Submitted after the start-up purge: only a later one can remove it
+            await asyncio.sleep(0.1)
+            job_id = store.submit("parse-resume", "cv.pdf", b"%PDF-1.4")
+            await asyncio.sleep(0.1)
+            assert store.get(job_id)["status"] == "succeeded"
+            await asyncio.sleep(0.4)
+            return store.get(job_id)
+        finally:
+            await workers.stop()
+
+    assert asyncio.run(run()) is None
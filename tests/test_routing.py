@@ -0,0 +1,34 @@
+import asyncio
+from types import SimpleNamespace
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from services.llm import llm_gateway
+from services.routing import RoutedLLM
+
+
+class RateLimited(Exception):
+    status_code = 429
+    response = SimpleNamespace(headers={"retry-after": "5"})
+
+
+def rate_limited(_):
+    raise RateLimited("429 Too Many Requests")
+
+
+def test_primary_429_pauses_the_gateway_before_falling_back(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_paused_until", 0.0)
+    secondary = RunnableLambda(lambda _: AIMessage(content='{"name": "Jane Roe"}'))
+    llm = RoutedLLM(RunnableLambda(rate_limited), secondary, mode="fallback")
+
+    async def stream():
+        return "".join([chunk.content async for chunk in llm.astream("prompt")])
+
+    calls = (
+        lambda: llm.invoke("prompt").content,
+        lambda: asyncio.run(llm.ainvoke("prompt")).content,
+        lambda: asyncio.run(stream()),
+    )
+    for call in calls:
+        llm_gateway._paused_until = 0.0
+        assert call() == '{"name": "Jane Roe"}'
+        assert llm_gateway.snapshot()["paused_for_seconds"] > 4
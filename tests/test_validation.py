@@ -0,0 +1,31 @@
+import json
+import asyncio
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from services.validation import reask_fields
+
+SCHEMA = {"name": "", "skills": [""], "experience": [{"role": ""}]}
+REQUIRED = {"name", "skills"}
+
+
+def fake_llm(answer: dict):
+    return RunnableLambda(lambda _: AIMessage(content=json.dumps(answer)))
+
+
+def reask(answer: dict, data: dict) -> dict:
+    return asyncio.run(reask_fields(fake_llm(answer), data, SCHEMA, "text", "task", required=REQUIRED))
+
+
+def test_partial_fix_after_total_failure_is_marked_incomplete():
+    result = reask({"name": "Jane Roe", "skills": "not a list"}, {"error": "Model returned invalid JSON."})
+    assert result == {"name": "Jane Roe", "incomplete_fields": ["skills"]}
+
+
+def test_unfixed_field_is_marked_incomplete():
+    result = reask({"name": None}, {"name": None, "skills": ["Go"], "experience": []})
+    assert result["incomplete_fields"] == ["name"]
+
+
+def test_fixed_answer_is_complete():
+    result = reask({"name": "Jane Roe"}, {"name": None, "skills": ["Go"], "experience": []})
+    assert result == {"name": "Jane Roe", "skills": ["Go"], "experience": []}